@@ -0,0 +1,185 @@
+import math
+import re
+import zlib
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence
+from app.models.evidence import Evidence
+
+# --- Token counting ---
+# Gemini has no offline tokenizer; ~4 chars/token holds well for English web text.
+CHARS_PER_TOKEN = 4
+
+def estimate_tokens(text: str) -> int:
+    return max(1, (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN)
+
+# --- Near-duplicate detection (word shingles + MinHash/LSH) ---
+SHINGLE_WORDS = 4
+NUM_HASHES = 64
+LSH_BANDS = 16 # 16 bands x 4 rows: pairs above ~0.6 Jaccard become candidates
+DUPLICATE_JACCARD = 0.8
+_MERSENNE = (1 << 61) - 1
+_PERMUTATIONS = [
+    ((i * 0x9E3779B97F4A7C15 + 1) % _MERSENNE | 1, (i * 0xBF58476D1CE4E5B9 + 7) % _MERSENNE)
+    for i in range(NUM_HASHES)
+]
+_WORD = re.compile(r"[a-z0-9]+")
+
+def _words(text: str) -> List[str]:
+    return _WORD.findall(text.lower())
+
+def shingles(text: str) -> set:
+    words = _words(text)
+    if len(words) <= SHINGLE_WORDS:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+def minhash(text: str) -> List[int]:
+    """Stable (cross-process) MinHash signature of the text's word shingles."""
+    hashes = [zlib.crc32(s.encode()) for s in shingles(text)] or [0]
+    return [min((a * h + b) % _MERSENNE for h in hashes) for a, b in _PERMUTATIONS]
+
+def estimated_jaccard(sig_a: Sequence[int], sig_b: Sequence[int]) -> float:
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+# --- Relevance ---
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it", "of",
+    "on", "or", "that", "the", "their", "to", "we", "with", "who", "our", "your", "you",
+}
+
+@dataclass
+class Passage:
+    evidence_id: str
+    source_type: str
+    url: str
+    text: str
+    position: int # Order within its source, first passages usually carry the summary
+    score: float = 0.0
+    tokens: int = 0
+
+@dataclass
+class PackedEvidence:
+    text: str
+    evidence_ids: List[str] = field(default_factory=list)
+    tokens: int = 0
+    passages_total: int = 0
+    passages_used: int = 0
+    duplicates_dropped: int = 0
+
+def split_passages(item: Evidence, seen_lines: set, target_chars: int = 600) -> List[Passage]:
+    """
+    Groups an excerpt's lines into passages of roughly target_chars.
+    Lines already seen (in this or an earlier source) are skipped: repeated banners, footers, CTAs.
+    """
+    passages, current = [], []
+    size = 0
+    for line in (item.excerpt or "").splitlines():
+        line = line.strip()
+        if not line or line in seen_lines:
+            continue
+        seen_lines.add(line)
+        current.append(line)
+        size += len(line)
+        if size >= target_chars:
+            passages.append(" ".join(current))
+            current, size = [], 0
+    if current:
+        passages.append(" ".join(current))
+    return [
+        Passage(item.evidence_id, item.source_type, item.url, text, position=i, tokens=estimate_tokens(text))
+        for i, text in enumerate(passages)
+    ]
+
+def _score_passages(passages: List[Passage], query: str):
+    """BM25-style relevance of each passage to the query (proposition + persona)."""
+    terms = [t for t in set(_words(query)) if t not in STOPWORDS]
+    tfs = [Counter(_words(p.text)) for p in passages]
+    avg_len = sum(sum(tf.values()) for tf in tfs) / max(1, len(tfs)) or 1.0
+    n = len(passages)
+    idf = {}
+    for t in terms:
+        df = sum(1 for tf in tfs if t in tf)
+        idf[t] = math.log(1 + (n - df + 0.5) / (df + 0.5))
+    for p, tf in zip(passages, tfs):
+        length = sum(tf.values()) or 1
+        score = 0.0
+        for t in terms:
+            if tf[t]:
+                score += idf[t] * tf[t] * 2.2 / (tf[t] + 1.2 * (0.25 + 0.75 * length / avg_len))
+        # Small bias towards the start of a page (headline, summary)
+        p.score = score + 0.1 / (1 + p.position)
+
+def _drop_near_duplicates(passages: List[Passage]) -> List[Passage]:
+    """Keeps the first of each group of near-duplicate passages (same boilerplate across pages)."""
+    kept: List[Passage] = []
+    signatures: List[List[int]] = []
+    buckets: Dict[tuple, List[int]] = defaultdict(list)
+    rows = NUM_HASHES // LSH_BANDS
+    for p in passages:
+        sig = minhash(p.text)
+        bands = [(b, tuple(sig[b * rows:(b + 1) * rows])) for b in range(LSH_BANDS)]
+        candidates = {i for band in bands for i in buckets.get(band, [])}
+        if any(estimated_jaccard(sig, signatures[i]) >= DUPLICATE_JACCARD for i in candidates):
+            continue
+        for band in bands:
+            buckets[band].append(len(kept))
+        kept.append(p)
+        signatures.append(sig)
+    return kept
+
+def pack_evidence(items: List[Evidence], query: str, token_budget: int) -> PackedEvidence:
+    """
+    Builds the evidence block for the fit-scoring prompt within token_budget:
+    split into passages -> drop near-duplicates -> rank by relevance to the query -> fill the budget.
+    Every source first gets its best passage so one long page cannot crowd out the others.
+    """
+    usable = [
+        e for e in items
+        if e.excerpt and not (e.reliability == "LOW" and e.excerpt.startswith("Failed to fetch"))
+    ]
+    seen_lines: set = set()
+    passages = [p for e in usable for p in split_passages(e, seen_lines)]
+    total = len(passages)
+    passages = _drop_near_duplicates(passages)
+    duplicates = total - len(passages)
+    if not passages:
+        return PackedEvidence(text="", passages_total=total, duplicates_dropped=duplicates)
+    _score_passages(passages, query)
+
+    ranked = sorted(passages, key=lambda p: p.score, reverse=True)
+    best_per_source = {}
+    for p in ranked:
+        best_per_source.setdefault(p.evidence_id, p)
+    order = list(best_per_source.values()) + [p for p in ranked if best_per_source[p.evidence_id] is not p]
+
+    chosen, used = [], 0
+    opened = set()
+    for p in order:
+        header = 0 if p.evidence_id in opened else estimate_tokens(f"SOURCE ({p.source_type} - {p.url}):\n")
+        if used + p.tokens + header > token_budget:
+            continue
+        chosen.append(p)
+        opened.add(p.evidence_id)
+        used += p.tokens + header
+
+    # Render grouped by source, passages back in page order
+    by_source: Dict[str, List[Passage]] = defaultdict(list)
+    for p in chosen:
+        by_source[p.evidence_id].append(p)
+    blocks = []
+    for group in by_source.values():
+        group.sort(key=lambda p: p.position)
+        head = group[0]
+        body = "\n".join(p.text for p in group)
+        # No evidence ids in the text: the prompt depends on content only (LLM cache key)
+        blocks.append(f"SOURCE ({head.source_type} - {head.url}):\n{body}")
+
+    return PackedEvidence(
+        text="\n\n".join(blocks),
+        evidence_ids=list(by_source),
+        tokens=used,
+        passages_total=total,
+        passages_used=len(chosen),
+        duplicates_dropped=duplicates,
+    )
@@ -1,89 +1,383 @@
-from datetime import datetime
+import asyncio
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from urllib.parse import urlparse
+from langgraph.config import get_stream_writer
 from langgraph.graph import StateGraph, END
-from app.models.contracts import ResearcherState, EvidenceItem, AccountDossier
+from app.core.concurrency import ProviderLimits
+from app.core.executor import CPUExecutor
+from app.core.metrics import llm_usage, record_cache, record_llm_usage, span
+from app.core.rate_limit import Upstream
+from app.models.contracts import ResearcherState, AccountDossier, Firmographics, GTMDiagnosis, Signal
+from app.models.evidence import Evidence
 from app.services.fetcher import Fetcher
 from app.services.search_provider import TavilySearchProvider
+from app.services.dossier_cache import evidence_fingerprint
+from app.services.llm_cache import LLMCache, prompt_fingerprint
+from app.services.evidence_store import evidence_id, is_material, material_ids
+from app.agents.evidence_packer import estimate_tokens, pack_evidence
+from app.agents.rules import prescore, ruleset_for
+from app.agents.signals import chunk_excerpt, extraction_input, merge_signals, parse_signals, render_signals
+from app.agents.scoring import BatchScorer, ScoringError, diagnosis_from_json, parse_llm_json
+
+# Search plan: each query feeds one evidence category (Evidence.source_type)
+SOURCE_QUERIES = [
+    ('site:{domain} "careers" OR "jobs"', "CAREERS"),
+    ('site:{domain} "pricing"', "DOC"),
+    ('"{domain}" funding news', "NEWS"),
+    ('"{domain}" tech stack', "TECH_DETECT"),
+]
+
+# Which evidence categories a signal type is read from (used by RefreshPolicy.force_refresh_signals)
+SIGNAL_SOURCE_TYPES = {
+    "EXEC_HIRE": ["CAREERS"],
+    "EXPANSION": ["CAREERS", "NEWS"],
+    "FUNDING": ["NEWS"],
+    "PARTNER": ["NEWS"],
+    "PRODUCT_LAUNCH": ["NEWS", "HOMEPAGE"],
+    "TECH_STACK": ["TECH_DETECT", "HOMEPAGE"],
+    "GTM_TOOLING": ["TECH_DETECT"],
+    "COMPLIANCE": ["DOC"],
+}
+
+def source_types_for_signals(signal_types: List[str]) -> List[str]:
+    return sorted({t for s in signal_types for t in SIGNAL_SOURCE_TYPES.get(s, [])})
+
+def chat_model(model: str):
+    """
+    Gemini chat client. The SDK takes ~0.4s to import, so it is only imported here:
+    on the first LLM call, or ahead of it by the startup prewarm (app.core.startup).
+    """
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    from app.core.config import settings
+
+    return ChatGoogleGenerativeAI(model=model, google_api_key=settings.GOOGLE_API_KEY, temperature=0.0)
 
 class ResearcherGraph:
-    def __init__(self):
-        self.fetcher = Fetcher()
-        self.search = TavilySearchProvider()
+    def __init__(
+        self,
+        fetcher: Optional[Fetcher] = None,
+        search: Optional[TavilySearchProvider] = None,
+        limits: Optional[ProviderLimits] = None,
+        batch_scorer: Optional[BatchScorer] = None,
+        llm_cache: Optional[LLMCache] = None,
+        llm_upstream: Optional[Upstream] = None,
+        signal_upstream: Optional[Upstream] = None,
+        llm_factory: Optional[Callable[[str], Any]] = None,
+        cpu: Optional[CPUExecutor] = None,
+    ):
+        # Pass shared clients (see app.core.runtime) to reuse them across missions
+        self.fetcher = fetcher or Fetcher()
+        self.search = search or TavilySearchProvider()
+        self.limits = limits or ProviderLimits()
+        self.llm_factory = llm_factory or chat_model # model name -> chat client
+        self.llm = None # Built on first scoring call (or by the prewarm), then reused
+        self.signal_llm = None # Cheap model for signal extraction, same lifecycle
+        self.batch_scorer = batch_scorer # Used when state.scoring_mode == "batched"
+        self.llm_cache = llm_cache
+        # Rate limit + breaker + retries for the LLM provider (shared with the BatchScorer)
+        self.llm_upstream = llm_upstream or Upstream("llm", rate=5, burst=5)
+        # The signal model has its own quota
+        self.signal_upstream = signal_upstream or Upstream("signal_llm", rate=20, burst=20)
+        # Rule pre-scoring and evidence packing run here: inline, or in a process pool (off the event loop)
+        self.cpu = cpu or CPUExecutor()
+
+    def get_llm(self):
+        if self.llm is None:
+            from app.core.config import settings
+
+            self.llm = self.llm_factory(settings.LLM_MODEL)
+        return self.llm
+
+    def get_signal_llm(self):
+        if self.signal_llm is None:
+            from app.core.config import settings
+
+            self.signal_llm = self.llm_factory(settings.SIGNAL_LLM_MODEL)
+        return self.signal_llm
+
+    def _remaining_seconds(self, state: ResearcherState) -> Optional[float]:
+        """Seconds left before the mission deadline (None = no deadline)."""
+        if state.deadline_at is None:
+            return None
+        return max(0.0, (state.deadline_at - datetime.now()).total_seconds())
+
+    async def _gather_until(self, calls: List[Awaitable[Any]], timeout: Optional[float]) -> List[Any]:
+        """
+        Runs calls concurrently and returns their results in order.
+        Calls that fail or are still running at the deadline yield None (partial results).
+        """
+        tasks = [asyncio.ensure_future(c) for c in calls]
+        if not tasks:
+            return []
+
+        done, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            print(f"⏱️ Deadline hit, dropping {len(pending)} unfinished calls")
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        results = []
+        for task in tasks:
+            if task in done and not task.cancelled() and task.exception() is None:
+                results.append(task.result())
+            else:
+                if task in done and not task.cancelled():
+                    print(f"❌ Call failed: {task.exception()}")
+                results.append(None)
+        return results
         
     async def collect_sources(self, state: ResearcherState):
         """Node 1: Gather raw URLs from Search + Homepage"""
         print(f"🕵️ Collecting components for {state.domain}...")
+        policy = state.config.concurrency
+        if state.deadline_at is None:
+            state.deadline_at = datetime.now() + timedelta(seconds=policy.deadline_seconds)
+        
+        # Partial refresh (dossier cache hit): only re-collect the forced categories,
+        # evidence for the other categories was seeded from the cache
+        wanted = state.refresh_source_types
         
         # 1. Homepage
         homepage_url = f"https://{state.domain}"
         
         # 2. Search Queries
         queries = [
-            f'site:{state.domain} "careers" OR "jobs"',
-            f'site:{state.domain} "pricing"',
-            f'"{state.domain}" funding news',
-            f'"{state.domain}" tech stack'
+            (template.format(domain=state.domain), source_type)
+            for template, source_type in SOURCE_QUERIES
+            if wanted is None or source_type in wanted
         ]
         
-        found_urls = [homepage_url]
-        for q in queries:
-            results = await self.search.search(q, max_results=1)
+        # Fan out all queries at once, bounded by the mission concurrency limit
+        limit = asyncio.Semaphore(policy.max_concurrency)
+
+        async def run_query(q: str):
+            async with limit, self.limits.search:
+                return await self.search.search(q, max_results=1)
+
+        all_results = await self._gather_until(
+            [run_query(q) for q, _ in queries], self._remaining_seconds(state)
+        )
+
+        found = {}
+        if wanted is None or "HOMEPAGE" in wanted:
+            found[homepage_url] = "HOMEPAGE"
+        for (_, source_type), results in zip(queries, all_results):
             if results:
-                found_urls.append(results[0].url)
-        
-        # Dedupe
-        unique_urls = list(set(found_urls))
-        print(f"🔗 Found {len(unique_urls)} unique sources: {unique_urls}")
+                # Dedupe (first category wins, order preserved)
+                found.setdefault(results[0].url, source_type)
+
+        kept = [e for e in state.evidence_items if e.url not in found]
+        print(f"🔗 Found {len(found)} unique sources: {list(found)}")
         
-        # Create EvidenceItems (Empty content for now, fetched in next step)
+        # Create Evidence (Empty content for now, fetched in next step)
         new_evidence = []
-        for i, url in enumerate(unique_urls):
-            new_evidence.append(EvidenceItem(
-                evidence_id=f"ev_{int(datetime.now().timestamp())}_{i}",
+        for url, source_type in found.items():
+            new_evidence.append(Evidence(
+                evidence_id=evidence_id(url), # Re-derived from the content once fetched
                 domain=state.domain,
-                source_type="HOMEPAGE" if url == homepage_url else "SEARCH",
+                source_type=source_type,
                 url=url,
                 retrieved_at=datetime.now(),
                 reliability="MED"
             ))
             
-        state.evidence_items = new_evidence
+        state.evidence_items = kept + new_evidence
         state.status = "COLLECTING"
         return state
 
     async def extract_facts(self, state: ResearcherState):
         """Node 2: Visit URLs and extract text"""
-        print(f"📥 Extracting facts from {len(state.evidence_items)} sources...")
+        # Items seeded from the dossier cache already carry their excerpt
+        pending = [item for item in state.evidence_items if item.excerpt is None]
+        print(f"📥 Extracting facts from {len(pending)} sources...")
         
-        for item in state.evidence_items:
-            data = await self.fetcher.fetch(item.url)
-            if data["status"] == "success":
-                # Truncate for token limits (simple logic for now)
-                item.excerpt = data["content"][:5000] 
+        policy = state.config.concurrency
+        limit = asyncio.Semaphore(policy.max_concurrency)
+        # This mission's own per-host cap; the process-wide one (HOST_CONCURRENCY) is self.limits.host
+        host_limits: Dict[str, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(policy.per_host_limit)
+        )
+
+        # Each item is reported on the "custom" stream as soon as it is fetched (see stream_mission)
+        emit = get_stream_writer()
+        stored = {e.url: e for e in state.stored_evidence}
+
+        def apply(item: Evidence, data: Optional[Dict[str, Any]]):
+            previous = stored.get(item.url)
+            if data is not None and data["status"] == "success":
+                # Already readable text, capped while streaming (Fetcher.max_chars)
+                item.excerpt = data["content"]
                 item.extract_method = data.get("method", "requests")
+                item.evidence_id = evidence_id(item.url, item.excerpt) # Same page content = same id across runs
+            elif previous is not None:
+                # Fetch failed but an earlier run stored this page: a flaky site is not a change
+                item.excerpt = previous.excerpt
+                item.evidence_id = previous.evidence_id
+                item.retrieved_at = previous.retrieved_at
+                item.extract_method = "stored"
             else:
+                # Fetch failed, or deadline hit / crashed: keep the item, flag it as partial
                 item.excerpt = "Failed to fetch"
                 item.reliability = "LOW"
+            emit({"event": "evidence", "evidence": item.to_json()})
+
+        async def fetch_item(item: Evidence):
+            host = urlparse(item.url).netloc
+            async with host_limits[host], limit, self.limits.host(host), self.limits.fetch:
+                data = await self.fetcher.fetch(item.url)
+            apply(item, data)
+            return data
+
+        all_data = await self._gather_until(
+            [fetch_item(item) for item in pending], self._remaining_seconds(state)
+        )
+
+        for item, data in zip(pending, all_data):
+            if data is None:
+                apply(item, None)
                 
         state.status = "EXTRACTING"
         return state
 
+    async def apply_rules(self, state: ResearcherState):
+        """Node 3: Rule-based signals; clear-cut and unchanged accounts are settled here and skip the LLM"""
+        from app.core.config import settings
+
+        diagnosis, state.signals = await self.cpu.run(
+            prescore, state.domain, state.evidence_items, ruleset_for(state.config.icp_ruleset_id)
+        )
+        print(f"📏 Rules found {[s.signal_type for s in state.signals]}")
+        if diagnosis is not None and settings.RULE_PRESCORING:
+            print(f"📏 Settled by rules: Tier {diagnosis.fit_tier} ({diagnosis.diagnosis_label})")
+            state.dossier = AccountDossier(
+                domain=state.domain,
+                record_id=state.record_id,
+                firmographics=state.firmographics or Firmographics(),
+                signals=state.signals,
+                gtm_diagnosis=diagnosis,
+                meta={"config_id": state.config.config_id, "generated_at": datetime.now(), "version": "dossier_v1"}
+            )
+            # Nothing fetched (outage, deadline): a placeholder diagnosis, not one worth caching or storing
+            state.status = "RULES_SETTLED" if any(is_material(e) for e in state.evidence_items) else "NO_EVIDENCE"
+        else:
+            # Before the signals node: an account whose evidence did not change costs no LLM call at all
+            self._reuse_previous(state)
+        return state
+
+    def _reuse_previous(self, state: ResearcherState):
+        # Dossier cache revalidation: forced categories came back unchanged,
+        # so the cached diagnosis still holds and the LLM call is skipped
+        if state.cached_dossier is not None and state.refresh_source_types is not None:
+            current = evidence_fingerprint(state.evidence_items, state.refresh_source_types)
+            if current == state.cached_fingerprint:
+                print("♻️ Refreshed evidence unchanged. Reusing cached diagnosis.")
+                state.dossier = state.cached_dossier
+                state.status = "CACHE_REVALIDATED"
+                return
+
+        # Evidence store: same material evidence as the last scored run, so the same diagnosis
+        if state.stored_diagnosis is not None and material_ids(state.evidence_items) == state.stored_evidence_ids:
+            print("♻️ Evidence unchanged since the last run. Reusing previous diagnosis.")
+            state.dossier = AccountDossier(
+                domain=state.domain,
+                record_id=state.record_id,
+                firmographics=state.firmographics or Firmographics(),
+                signals=state.signals, # Rule-detected signals (no extraction ran)
+                gtm_diagnosis=state.stored_diagnosis,
+                meta={"config_id": state.config.config_id, "generated_at": datetime.now(), "version": "dossier_v1"}
+            )
+            state.status = "EVIDENCE_UNCHANGED"
+
+    def _after_prescore(self, state: ResearcherState) -> str:
+        # Settled by the rules, or the previous diagnosis still holds: no LLM
+        finished = ("RULES_SETTLED", "NO_EVIDENCE", "CACHE_REVALIDATED", "EVIDENCE_UNCHANGED")
+        return END if state.status in finished else "signals"
+
+    async def extract_signals(self, state: ResearcherState):
+        """Node 4: Signals from every evidence chunk in parallel (cheap model), merged and deduped"""
+        from app.core.config import settings
+
+        if not settings.SIGNAL_EXTRACTION or not settings.GOOGLE_API_KEY:
+            return state
+
+        chunks = [
+            (item, chunk)
+            for item in state.evidence_items if is_material(item)
+            for chunk in chunk_excerpt(item, settings.SIGNAL_CHUNK_CHARS)
+        ]
+        print(f"🔎 Extracting signals from {len(chunks)} chunks...")
+        limit = asyncio.Semaphore(state.config.concurrency.max_concurrency)
+
+        async def run_chunk(item: Evidence, chunk: str):
+            async with limit:
+                return await self._extract_chunk(state, item, chunk)
+
+        results = await self._gather_until(
+            [run_chunk(item, chunk) for item, chunk in chunks], self._remaining_seconds(state)
+        )
+        if not chunks or any(r is None for r in results):
+            # A missing chunk would silently drop evidence: score on the raw text instead
+            print("⚠️ Signal extraction incomplete. Scoring on raw evidence.")
+            return state
+
+        state.signals = merge_signals([s for r in results for s in r], state.signals)
+        state.signals_extracted = True
+        state.status = "SIGNALS_EXTRACTED"
+        return state
+
+    async def _extract_chunk(self, state: ResearcherState, item: Evidence, chunk: str) -> List[Signal]:
+        from langchain_core.messages import HumanMessage
+        from app.agents.prompts import SIGNAL_EXTRACTION_PROMPT, PROMPT_VERSION
+        from app.core.config import settings
+
+        prompt = SIGNAL_EXTRACTION_PROMPT.format(
+            domain=state.domain,
+            proposition=state.config.proposition,
+            persona=state.config.persona,
+            text_content=extraction_input(item, chunk),
+        )
+        # Evidence ids are content hashes, so an unchanged page reuses its cached extraction
+        key = prompt_fingerprint(settings.SIGNAL_LLM_MODEL, PROMPT_VERSION, prompt)
+        if self.llm_cache is not None:
+            cached = await self.llm_cache.get(key)
+            record_cache("llm", "hit" if cached is not None else "miss")
+            if cached is not None:
+                try:
+                    return parse_signals(parse_llm_json(cached), item.evidence_id)
+                except ValueError:
+                    pass
+
+        async with self.limits.llm:
+            with span("llm.signals", provider="gemini"):
+                result = await self.signal_upstream.call(lambda: self.get_signal_llm().ainvoke(
+                    [HumanMessage(content=prompt)],
+                    config={"configurable": {"response_mime_type": "application/json"}}
+                ))
+        record_llm_usage(
+            *llm_usage(result),
+            prices=(settings.SIGNAL_LLM_INPUT_COST_PER_MTOK, settings.SIGNAL_LLM_OUTPUT_COST_PER_MTOK),
+        )
+        signals = parse_signals(parse_llm_json(result.content), item.evidence_id)
+        if self.llm_cache is not None:
+            await self.llm_cache.put(key, settings.SIGNAL_LLM_MODEL, result.content)
+        return signals
+
     async def score_fit(self, state: ResearcherState):
-        """Node 3: Analyze extracted text to score fit (LLM AI)"""
-        print("🧠 Scoring fit using Gemini 1.5 Flash...")
+        """Node 5: Score fit from the signals (LLM AI) - ambiguous accounts only"""
+        print("🧠 Scoring fit using Gemini...")
         
-        # 1. Initialize LLM
-        # Use a cheaper/faster model for this task
-        from langchain_google_genai import ChatGoogleGenerativeAI
-        from langchain_core.messages import HumanMessage
-        from app.agents.prompts import FIT_SCORING_PROMPT
         from app.core.config import settings
-        import json
 
         if not settings.GOOGLE_API_KEY:
             print("⚠️ No GOOGLE_API_KEY found. Falling back to mock scoring.")
-            # ... keep mock logic or simple rule-based ...
+            # Placeholder dossier (status SCORING_SKIPPED, never cached); clear-cut accounts were already settled by the rules
             dossier = AccountDossier(
                 domain=state.domain,
+                record_id=state.record_id,
+                firmographics=state.firmographics or Firmographics(),
                 meta={"config_id": state.config.config_id, "generated_at": datetime.now(), "version": "v1-mock"}
             )
             dossier.gtm_diagnosis.diagnosis_label = "Key Missing: Google API Key"
@@ -91,54 +385,47 @@ class ResearcherGraph:
             state.status = "SCORING_SKIPPED"
             return state
 
-        llm = ChatGoogleGenerativeAI(
-            model="gemini-1.5-flash", 
-            google_api_key=settings.GOOGLE_API_KEY,
-            temperature=0.0
-        )
-
-        # 2. Prepare Context
-        # Aggregate evidence text
-        evidence_text = "\n\n".join([
-            f"SOURCE ({e.source_type} - {e.url}):\n{e.excerpt[:2000]}" 
-            for e in state.evidence_items 
-            if e.excerpt
-        ])
+        # 1. Prepare Context
+        if state.signals_extracted:
+            # Compact cited signal list (a few hundred tokens) instead of raw page text
+            evidence_text = render_signals(state.signals) or "No GTM signals found in the evidence."
+            evidence_ids = sorted({e for s in state.signals for e in s.evidence_ids})
+            print(f"📋 Scoring on {len(state.signals)} signals (~{estimate_tokens(evidence_text)} tokens)")
+        else:
+            # Pack the most relevant, de-duplicated passages into the token budget
+            packed = await self.cpu.run(
+                pack_evidence,
+                state.evidence_items,
+                f"{state.config.proposition} {state.config.persona}", # Query
+                settings.EVIDENCE_TOKEN_BUDGET,
+            )
+            evidence_text = packed.text
+            evidence_ids = packed.evidence_ids
+            print(
+                f"📦 Packed {packed.passages_used}/{packed.passages_total} passages "
+                f"(~{packed.tokens} tokens, {packed.duplicates_dropped} near-duplicates dropped)"
+            )
 
-        # 3. Call LLM
-        prompt = FIT_SCORING_PROMPT.format(
-            icp_ruleset=state.config.icp_ruleset_id, # Should be detailed text in future
-            signals=evidence_text # We pass raw evidence as signals for now
-        )
-        
         try:
-            # We ask for JSON_MODE (supported by Gemini)
-            result = await llm.ainvoke(
-                [HumanMessage(content=prompt)],
-                config={"configurable": {"response_mime_type": "application/json"}} 
-            )
-            
-            # 4. Parse JSON
-            # Clean possible markdown fencing
-            content = result.content.replace('```json', '').replace('```', '')
-            data = json.loads(content)
+            # 2. Call LLM (cached by prompt fingerprint, micro-batched on the batch path)
+            diagnosis = await self._score(state, evidence_text)
             
-            # 5. Hydrate Dossier
+            # 3. Hydrate Dossier
             dossier = AccountDossier(
                 domain=state.domain,
                 record_id=state.record_id,
+                firmographics=state.firmographics or Firmographics(),
+                signals=state.signals,
+                gtm_diagnosis=diagnosis,
                 meta={
                     "config_id": state.config.config_id,
                     "generated_at": datetime.now(),
                     "version": "dossier_v1"
                 }
             )
-            dossier.gtm_diagnosis.fit_tier = data.get("fit_tier", "C")
-            dossier.gtm_diagnosis.diagnosis_label = data.get("diagnosis_label", "Analyzed")
-            dossier.gtm_diagnosis.reasoning_bullets = data.get("reasoning_bullets", [])
-            dossier.gtm_diagnosis.confidence = data.get("confidence", 0.0)
             
-            # Map evidence IDs (Future: Validate they exist)
+            # Evidence actually shown to the model (directly or through the signals citing it)
+            dossier.gtm_diagnosis.evidence_ids = evidence_ids
             
             state.dossier = dossier
             state.status = "SCORING_COMPLETE"
@@ -150,16 +437,83 @@ class ResearcherGraph:
 
         return state
 
-    def compile(self):
+    async def _score(self, state: ResearcherState, evidence_text: str) -> GTMDiagnosis:
+        from langchain_core.messages import HumanMessage
+        from app.agents.prompts import FIT_SCORING_PROMPT, PROMPT_VERSION
+        from app.core.config import settings
+
+        prompt = FIT_SCORING_PROMPT.format(
+            icp_ruleset=state.config.icp_ruleset_id, # Should be detailed text in future
+            signals=evidence_text # Rendered signal list, or packed evidence passages when extraction was off/incomplete
+        )
+
+        # Temperature 0: an identical prompt gets the identical answer, reuse it.
+        # Batched answers are stored under the single-account prompt, so both paths share entries.
+        key = prompt_fingerprint(settings.LLM_MODEL, PROMPT_VERSION, prompt)
+        if self.llm_cache is not None:
+            cached = await self.llm_cache.get(key)
+            record_cache("llm", "hit" if cached is not None else "miss")
+            if cached is not None:
+                try:
+                    print(f"💾 LLM cache hit for {state.domain}")
+                    return diagnosis_from_json(parse_llm_json(cached))
+                except (ValueError, ScoringError):
+                    pass # Unreadable entry: score again and overwrite it
+
+        diagnosis = None
+        if state.scoring_mode == "batched" and self.batch_scorer is not None:
+            try:
+                with span("llm.batched"): # This mission's wait, including the batching window
+                    diagnosis = await self.batch_scorer.score(
+                        state.domain, state.config.icp_ruleset_id, evidence_text
+                    )
+                content = diagnosis.model_dump_json(include={"fit_tier", "diagnosis_label", "reasoning_bullets", "confidence"})
+            except ScoringError as e:
+                print(f"⚠️ {e}. Re-scoring {state.domain} on its own.")
+
+        if diagnosis is None:
+            # We ask for JSON_MODE (supported by Gemini)
+            async with self.limits.llm:
+                with span("llm", provider="gemini"):
+                    result = await self.llm_upstream.call(lambda: self.get_llm().ainvoke(
+                        [HumanMessage(content=prompt)],
+                        config={"configurable": {"response_mime_type": "application/json"}} 
+                    ))
+            record_llm_usage(*llm_usage(result))
+            content = result.content
+            diagnosis = diagnosis_from_json(parse_llm_json(content))
+
+        # Only answers that parsed and validated are cached
+        if self.llm_cache is not None:
+            await self.llm_cache.put(key, settings.LLM_MODEL, content)
+        return diagnosis
+
+    def _timed(self, name: str, node):
+        """Wraps a node in a "node.<name>" span (see app.core.metrics)."""
+        async def run(state: ResearcherState):
+            with span(f"node.{name}"):
+                return await node(state)
+        return run
+
+    def compile(self, checkpointer=None):
+        """
+        With a checkpointer, state is saved after each node (collect, extract, prescore, signals, score),
+        so an interrupted mission resumes from its last completed node (see app.worker).
+        """
         workflow = StateGraph(ResearcherState)
         
-        workflow.add_node("collect", self.collect_sources)
-        workflow.add_node("extract", self.extract_facts)
-        workflow.add_node("score", self.score_fit)
+        workflow.add_node("collect", self._timed("collect", self.collect_sources))
+        workflow.add_node("extract", self._timed("extract", self.extract_facts))
+        workflow.add_node("prescore", self._timed("prescore", self.apply_rules))
+        workflow.add_node("signals", self._timed("signals", self.extract_signals))
+        workflow.add_node("score", self._timed("score", self.score_fit))
         
         workflow.set_entry_point("collect")
         workflow.add_edge("collect", "extract")
-        workflow.add_edge("extract", "score")
+        workflow.add_edge("extract", "prescore")
+        # Accounts settled by the rules (or unchanged since the last run) never reach the LLM
+        workflow.add_conditional_edges("prescore", self._after_prescore, ["signals", END])
+        workflow.add_edge("signals", "score")
         workflow.add_edge("score", END)
         
-        return workflow.compile()
+        return workflow.compile(checkpointer=checkpointer)
@@ -1,5 +1,8 @@
 from langchain_core.prompts import PromptTemplate
 
+# Bump when any prompt below changes: cached dossiers are keyed on it
+PROMPT_VERSION = "prompts_v2"
+
 # --- 1. Signal Extraction Prompt ---
 SIGNAL_EXTRACTION_PROMPT = """
 You are an expert Revenue Operations Analyst.
@@ -11,7 +14,7 @@ Target Persona: {persona}
 
 RULES:
 1. Only extract signals that are HIGHLY RELEVANT to our proposition.
-2. Signal Types allowed: EXEC_HIRE, FUNDING, TECH_STACK, GTM_TOOLING, PARTNER, EXPANSION.
+2. Signal Types allowed: EXEC_HIRE, FUNDING, TECH_STACK, GTM_TOOLING, PARTNER, EXPANSION, COMPLIANCE, PRODUCT_LAUNCH.
 3. Citation is MANDATORY. You must attribute every signal to a specific Evidence ID provided in the context if possible, or leave evidence_ids empty if inferred (but lower confidence).
 
 INPUT TEXT:
@@ -54,3 +57,36 @@ OUTPUT SCHEMA (JSON):
   "confidence": 0.8
 }}
 """
+
+# --- 3. Batched Fit Scoring Prompt (several accounts per call) ---
+BATCH_ACCOUNT_BLOCK = """
+=== ACCOUNT: {domain} ===
+ICP Definition: {icp_ruleset}
+
+DOSSIER SIGNALS:
+{signals}
+"""
+
+BATCH_FIT_SCORING_PROMPT = """
+Analyze each of the following Account Dossiers INDEPENDENTLY and determine its 'Fit Tier' (A, B, C, D).
+Never use evidence from one account to judge another.
+
+{accounts}
+
+DIAGNOSIS INSTRUCTIONS:
+- Tier A: Perfect Match. Has Budget (Funding), Intent (Hiring), and Tech fit.
+- Tier B: Good Match. Missing one key signal.
+- Tier C: Low Match. Too small or wrong industry.
+- Tier D: Disqualified. Competitor or unrelated.
+
+OUTPUT SCHEMA (JSON):
+One object per account, keyed by its exact domain:
+{{
+  "example.com": {{
+    "fit_tier": "A",
+    "diagnosis_label": "High Fit - Scaling Pain",
+    "reasoning_bullets": ["Reason 1", "Reason 2"],
+    "confidence": 0.8
+  }}
+}}
+"""
@@ -1,14 +1,22 @@
+import asyncio
 from app.models.contracts import AccountDossier, ResearchConfig, Firmographics, Signal
+from typing import Optional
 from app.services.hubspot_service import HubSpotService
+from app.services.crm_mirror import CRMMirror
 
 class ResearcherAgent:
-    def __init__(self, config: ResearchConfig):
+    def __init__(self, config: ResearchConfig, crm_mirror: Optional[CRMMirror] = None):
         self.config = config
         self.hubspot = HubSpotService()
+        self.crm_mirror = crm_mirror
 
     async def research_domain(self, domain: str) -> AccountDossier:
-        # 1. Check CRM for existing data
-        company_record = await self.hubspot.get_company_by_domain(domain)
+        # 1. Check CRM for existing data (local mirror first, search API only without one)
+        if self.crm_mirror is not None:
+            company = await asyncio.to_thread(self.crm_mirror.lookup, domain) # SQLite + lock: off the loop
+            company_record = {"id": company.record_id, "properties": {"name": company.name}} if company else None
+        else:
+            company_record = await self.hubspot.get_company_by_domain(domain)
         
         # 2. Scrape & Analyze (Placeholder for actual LLM/Scraper logic)
         # In a real build, we would call Tavily/Firecrawl here.
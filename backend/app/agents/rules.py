@@ -0,0 +1,176 @@
+import json
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from app.models.contracts import GTMDiagnosis, Signal
+from app.models.evidence import Evidence
+from app.services.evidence_store import is_material
+
+# Bump when detectors or rules change: rule-settled diagnoses may differ
+RULES_VERSION = "rules_v2"
+
+# Keyword/regex detectors per signal type (the types of SIGNAL_EXTRACTION_PROMPT)
+SIGNAL_PATTERNS: Dict[str, List[str]] = {
+    "EXEC_HIRE": [
+        r"\b(?:hiring|open roles?|join us as|appoint(?:s|ed)|hires|welcomes?)\b[^.\n]{0,60}?"
+        r"\b(?:VP|Vice President|Head of|Chief \w+ Officer|C[RM]O|Director)\b",
+        r"\b(?:VP|Vice President|Head) of (?:Sales|Revenue|Marketing|Growth|Customer Success|Partnerships)\b",
+    ],
+    "FUNDING": [
+        r"\b(?:raises?|raised|closed|secures?|announced)\b[^.\n]{0,40}?"
+        r"(?:\$\s?\d[\d.,]*\s?(?:m|mn|b|bn|million|billion)\b|series [a-f]\b|seed round)",
+        r"\bseries [a-f] (?:round|funding)\b",
+    ],
+    # Product names only: dictionary words ("segment") and cloud names every site mentions ("aws") are not a stack
+    "TECH_STACK": [r"\b(?:snowflake|databricks|dbt labs|segment\.com|twilio segment|amplitude|bigquery|kubernetes)\b"],
+    "GTM_TOOLING": [r"\b(?:salesforce|hubspot|outreach|salesloft|gong|marketo|pardot|zoominfo|clari|apollo\.io)\b"],
+    "PARTNER": [r"\b(?:partners? with|partnership with|strategic partner|integration partner)\b"],
+    "EXPANSION": [
+        r"\b(?:open(?:s|ing)? (?:an|a new|its) (?:office|hub)|new office|expand(?:s|ing)? (?:into|to) \w+"
+        r"|international expansion|double (?:its|our) [\w-]+ headcount)\b",
+    ],
+    "COMPLIANCE": [r"\b(?:SOC ?2|ISO ?27001|GDPR|HIPAA|FedRAMP)\b"],
+    "PRODUCT_LAUNCH": [r"\b(?:launch(?:es|ed)|introduc(?:es|ing)|now available|unveil(?:s|ed))\b"],
+}
+
+# Sources that describe the company's own stack (for the Tier A fit rule)
+FIT_SOURCE_TYPES = ("HOMEPAGE", "TECH_DETECT")
+
+SIGNAL_LABELS = {
+    "EXEC_HIRE": "Executive hire",
+    "FUNDING": "Funding event",
+    "TECH_STACK": "Data/infra stack",
+    "GTM_TOOLING": "GTM tooling",
+    "PARTNER": "Partnership",
+    "EXPANSION": "Expansion",
+    "COMPLIANCE": "Compliance",
+    "PRODUCT_LAUNCH": "Product launch",
+}
+
+def _compile_detectors(patterns: Dict[str, List[str]]) -> Tuple[re.Pattern, Dict[str, str]]:
+    """All detectors as one alternation of named groups: a single pass per excerpt finds every signal."""
+    parts, group_types = [], {}
+    for signal_type, regexes in patterns.items():
+        for i, regex in enumerate(regexes):
+            group = f"{signal_type}_{i}"
+            group_types[group] = signal_type
+            parts.append(f"(?P<{group}>{regex})")
+    return re.compile("|".join(parts), re.IGNORECASE), group_types
+
+DETECTOR, DETECTOR_GROUPS = _compile_detectors(SIGNAL_PATTERNS)
+
+# Parked / placeholder homepages: nothing to sell to
+PARKED_PATTERN = re.compile(
+    r"\b(?:this domain (?:is|may be) for sale|buy this domain|domain parking|parked (?:free|domain)"
+    r"|website is under construction)\b",
+    re.IGNORECASE,
+)
+
+@dataclass
+class ICPRuleset:
+    """
+    Deterministic part of an ICP. Clear-cut accounts are settled by these rules,
+    everything in between goes to the LLM.
+    """
+    ruleset_id: str
+    competitor_domains: List[str] = field(default_factory=list) # Tier D outright
+    disqualify_patterns: Dict[str, str] = field(default_factory=dict) # label -> regex over all excerpts
+    settle_tier_a: bool = True # Funding + exec hire + tooling/stack fit settles Tier A without the LLM
+    min_sources: int = 2 # Distinct usable sources needed before anything but "no evidence" is settled
+
+DEFAULT_RULESET = ICPRuleset(ruleset_id="default")
+
+@lru_cache(maxsize=1)
+def load_rulesets(path: str) -> Dict[str, ICPRuleset]:
+    """ICP_RULESETS_PATH: JSON object of ruleset_id -> ICPRuleset fields."""
+    if not path:
+        return {}
+    with open(path) as f:
+        return {rid: ICPRuleset(ruleset_id=rid, **fields) for rid, fields in json.load(f).items()}
+
+def ruleset_for(icp_ruleset_id: str) -> ICPRuleset:
+    from app.core.config import settings
+
+    return load_rulesets(settings.ICP_RULESETS_PATH).get(icp_ruleset_id, DEFAULT_RULESET)
+
+def detect_signals(items: List[Evidence]) -> List[Signal]:
+    """One Signal per detected type, citing every evidence item it was found in."""
+    found: Dict[str, List[Tuple[str, str]]] = {} # signal type -> [(evidence_id, matched text)]
+    for item in items:
+        if not is_material(item):
+            continue
+        for match in DETECTOR.finditer(item.excerpt):
+            hits = found.setdefault(DETECTOR_GROUPS[match.lastgroup], [])
+            if all(ev != item.evidence_id for ev, _ in hits):
+                hits.append((item.evidence_id, " ".join(match.group().split())))
+
+    return [
+        Signal(
+            signal_type=signal_type,
+            label=SIGNAL_LABELS[signal_type],
+            value=hits[0][1][:120],
+            # More independent sources, more confidence
+            confidence=round(min(0.9, 0.5 + 0.15 * len(hits)), 2),
+            evidence_ids=[ev for ev, _ in hits],
+        )
+        for signal_type, hits in sorted(found.items())
+    ]
+
+def _settled(tier: str, label: str, bullets: List[str], confidence: float, evidence_ids: List[str]) -> GTMDiagnosis:
+    return GTMDiagnosis(
+        fit_tier=tier,
+        diagnosis_label=label,
+        reasoning_bullets=bullets + [f"Settled by deterministic rules ({RULES_VERSION})"],
+        confidence=confidence,
+        evidence_ids=evidence_ids,
+    )
+
+def prescore(domain: str, items: List[Evidence], ruleset: ICPRuleset) -> Tuple[Optional[GTMDiagnosis], List[Signal]]:
+    """
+    Returns (diagnosis, signals). The diagnosis is None when the account is ambiguous
+    and needs the LLM; signals are returned either way (they go on the dossier).
+    """
+    usable = [e for e in items if is_material(e)]
+    signals = detect_signals(usable)
+    if not usable:
+        return _settled("C", "Insufficient Evidence", ["No source could be fetched"], 0.1, []), signals
+
+    if domain.lower() in {d.lower() for d in ruleset.competitor_domains}:
+        return _settled("D", "Disqualified - Competitor", [f"{domain} is a listed competitor"], 0.95, []), signals
+
+    for item in usable:
+        if item.source_type == "HOMEPAGE" and PARKED_PATTERN.search(item.excerpt):
+            diagnosis = _settled(
+                "D", "Disqualified - Parked Domain", ["Homepage is a parked/placeholder page"], 0.9, [item.evidence_id]
+            )
+            return diagnosis, signals
+        for label, pattern in ruleset.disqualify_patterns.items():
+            if re.search(pattern, item.excerpt, re.IGNORECASE):
+                diagnosis = _settled(
+                    "D", f"Disqualified - {label}", [f"Matched rule '{label}' in {item.url}"], 0.85, [item.evidence_id]
+                )
+                return diagnosis, signals
+
+    if len({e.url for e in usable}) < ruleset.min_sources:
+        return None, signals
+
+    by_type = {s.signal_type: s for s in signals}
+    # Stack/tooling fit only counts when the company's own site or tech detection shows it,
+    # not when a news article or blog post merely mentions the product
+    own = {e.evidence_id for e in usable if e.source_type in FIT_SOURCE_TYPES}
+    fits = [
+        s for s in (by_type.get("GTM_TOOLING"), by_type.get("TECH_STACK"))
+        if s is not None and own.intersection(s.evidence_ids)
+    ]
+    fit = fits[0] if fits else None
+    if ruleset.settle_tier_a and "FUNDING" in by_type and "EXEC_HIRE" in by_type and fit:
+        chosen = [by_type["FUNDING"], by_type["EXEC_HIRE"], fit]
+        return _settled(
+            "A",
+            "High Fit - Funded & Hiring",
+            [f"{s.label}: {s.value}" for s in chosen],
+            round(min(s.confidence for s in chosen), 2),
+            sorted({ev for s in chosen for ev in s.evidence_ids}),
+        ), signals
+    return None, signals
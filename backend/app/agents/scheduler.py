@@ -0,0 +1,145 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+from app.models.contracts import ResearchConfig
+
+# (domain, config) -> final graph state, e.g. ResearchRuntime.run_mission
+MissionRunner = Callable[[str, ResearchConfig], Awaitable[Dict[str, Any]]]
+
+class BatchJob:
+    """In-memory record of one batch submission and its per-domain results."""
+
+    def __init__(self, domains: List[str], config: ResearchConfig):
+        self.job_id = f"batch_{uuid.uuid4().hex[:12]}"
+        self.domains = domains
+        self.config = config
+        self.created_at = datetime.now()
+        self.finished_at: Optional[datetime] = None
+        self.status = "QUEUED" # QUEUED|RUNNING|COMPLETE|CANCELLED
+        self.results: List[Dict[str, Any]] = []
+        self.failed = 0
+        self._changed = asyncio.Condition()
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("COMPLETE", "CANCELLED")
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "total": len(self.domains),
+            "completed": len(self.results),
+            "failed": self.failed,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+    async def add_result(self, result: Dict[str, Any]):
+        async with self._changed:
+            self.results.append(result)
+            if result["status"] != "SUCCESS":
+                self.failed += 1
+            if len(self.results) == len(self.domains) and not self.done:
+                self.status = "COMPLETE"
+                self.finished_at = datetime.now()
+            self._changed.notify_all()
+
+    async def cancel(self):
+        async with self._changed:
+            if not self.done:
+                self.status = "CANCELLED"
+                self.finished_at = datetime.now()
+            self._changed.notify_all()
+
+    async def stream(self) -> AsyncIterator[Dict[str, Any]]:
+        """Yields results as they complete, from the first one, until the job is done."""
+        sent = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: len(self.results) > sent or self.done)
+                pending = self.results[sent:]
+                finished = self.done
+            for result in pending:
+                yield result
+            sent += len(pending)
+            if finished and sent == len(self.results):
+                return
+
+class BatchScheduler:
+    """
+    Runs batch missions through a fixed pool of workers in this process.
+    Workers share the runtime's compiled graph and clients; provider caps come from ProviderLimits.
+    """
+
+    def __init__(
+        self, runner: MissionRunner, max_missions: int = 32, retention_seconds: float = 3600.0, max_finished: int = 100
+    ):
+        self.runner = runner
+        self.max_missions = max_missions
+        self.retention_seconds = retention_seconds # Finished jobs (and their dossiers) are dropped after this
+        self.max_finished = max_finished # ... or sooner, oldest first, beyond this many
+        self.jobs: Dict[str, BatchJob] = {}
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.workers: List[asyncio.Task] = []
+
+    def submit(self, domains: List[str], config: ResearchConfig) -> BatchJob:
+        self._evict()
+        job = BatchJob(domains, config)
+        self.jobs[job.job_id] = job
+        for domain in domains:
+            self.queue.put_nowait((job, domain))
+        self._ensure_workers()
+        print(f"📦 Queued batch {job.job_id}: {len(domains)} domains")
+        return job
+
+    def get(self, job_id: str) -> Optional[BatchJob]:
+        self._evict()
+        return self.jobs.get(job_id)
+
+    def _evict(self):
+        """Drops finished jobs past the retention time, then the oldest beyond max_finished."""
+        finished = sorted((j for j in self.jobs.values() if j.done), key=lambda j: j.finished_at)
+        cutoff = datetime.now() - timedelta(seconds=self.retention_seconds)
+        expired = [j for j in finished if j.finished_at < cutoff]
+        kept = finished[len(expired):]
+        for job in expired + kept[:max(0, len(kept) - self.max_finished)]:
+            del self.jobs[job.job_id]
+
+    def _ensure_workers(self):
+        # Workers start lazily so the scheduler can be built outside a running loop
+        self.workers = [w for w in self.workers if not w.done()]
+        for _ in range(self.max_missions - len(self.workers)):
+            self.workers.append(asyncio.create_task(self._worker()))
+
+    async def _worker(self):
+        while True:
+            job, domain = await self.queue.get()
+            try:
+                if job.status == "CANCELLED":
+                    continue
+                job.status = "RUNNING"
+                await job.add_result(await self._run_one(domain, job.config))
+            finally:
+                self.queue.task_done()
+
+    async def _run_one(self, domain: str, config: ResearchConfig) -> Dict[str, Any]:
+        try:
+            final_state = await self.runner(domain, config)
+            dossier = final_state.get("dossier")
+            return {
+                "domain": domain,
+                "status": "SUCCESS" if dossier else "FAILED",
+                "mission_status": final_state.get("status"),
+                "dossier": dossier.model_dump(mode="json") if dossier else None,
+            }
+        except Exception as e:
+            print(f"❌ Batch mission failed for {domain}: {e}")
+            return {"domain": domain, "status": "FAILED", "error": str(e)}
+
+    async def close(self):
+        for w in self.workers:
+            w.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
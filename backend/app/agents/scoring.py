@@ -0,0 +1,150 @@
+import asyncio
+import json
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+from app.core.concurrency import ProviderLimits
+from app.core.metrics import MissionTrace, current_trace, detach_trace, llm_usage, record_llm_usage, span
+from app.core.rate_limit import Upstream
+from app.models.contracts import GTMDiagnosis
+
+FIT_TIERS = ("A", "B", "C", "D")
+
+class ScoringError(Exception):
+    """The model's answer for an account was missing or did not match the diagnosis schema."""
+
+def parse_llm_json(content: str) -> Any:
+    # Clean possible markdown fencing
+    return json.loads(content.replace('```json', '').replace('```', ''))
+
+def diagnosis_from_json(data: Dict[str, Any]) -> GTMDiagnosis:
+    """Validates one FIT_SCORING_PROMPT-shaped answer into a GTMDiagnosis."""
+    if not isinstance(data, dict):
+        raise ScoringError(f"Expected a JSON object, got {type(data).__name__}")
+    try:
+        diagnosis = GTMDiagnosis(
+            fit_tier=str(data.get("fit_tier", "C")).strip().upper(),
+            diagnosis_label=data.get("diagnosis_label", "Analyzed"),
+            reasoning_bullets=data.get("reasoning_bullets", []),
+            confidence=data.get("confidence", 0.0),
+        )
+    except ValueError as e: # pydantic.ValidationError is a ValueError
+        raise ScoringError(str(e)) from e
+    if diagnosis.fit_tier not in FIT_TIERS:
+        raise ScoringError(f"Unknown fit tier {diagnosis.fit_tier!r}")
+    return diagnosis
+
+@dataclass
+class _ScoreRequest:
+    domain: str
+    icp_ruleset: str
+    signals: str
+    future: asyncio.Future
+    trace: Optional[MissionTrace] = None # The mission's share of the batch's tokens goes here
+
+class BatchScorer:
+    """
+    Queued micro-batcher for fit scoring.
+    Requests are held for up to max_wait seconds (or until max_batch accounts are queued),
+    sent as one BATCH_FIT_SCORING_PROMPT call and the JSON answer is split back per domain.
+    Accounts missing or invalid in the answer fail with ScoringError so callers can fall back
+    to a single-account call.
+    """
+
+    def __init__(
+        self,
+        get_llm: Callable[[], Any],
+        limits: ProviderLimits,
+        max_batch: int = 8,
+        max_wait: float = 0.5,
+        upstream: Optional[Upstream] = None,
+    ):
+        self.get_llm = get_llm
+        self.upstream = upstream or Upstream("llm", rate=5, burst=5)
+        self.limits = limits
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._pending: List[_ScoreRequest] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._inflight: set = set()
+
+    async def score(self, domain: str, icp_ruleset: str, signals: str) -> GTMDiagnosis:
+        loop = asyncio.get_running_loop()
+        request = _ScoreRequest(domain, icp_ruleset, signals, loop.create_future(), current_trace())
+        self._pending.append(request)
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await request.future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        # Answers are keyed by domain, so a domain appears at most once per batch
+        batch, rest, domains = [], [], set()
+        for request in self._pending:
+            if request.future.done():
+                continue # Caller gave up (deadline/cancel)
+            if len(batch) < self.max_batch and request.domain not in domains:
+                batch.append(request)
+                domains.add(request.domain)
+            else:
+                rest.append(request)
+        self._pending = rest
+
+        if batch:
+            task = asyncio.create_task(self._send(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+        if self._pending:
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait, self._flush)
+
+    async def _send(self, batch: List[_ScoreRequest]):
+        from langchain_core.messages import HumanMessage
+        from app.agents.prompts import BATCH_ACCOUNT_BLOCK, BATCH_FIT_SCORING_PROMPT
+
+        # Runs on behalf of the whole batch: don't time it into whichever mission flushed it
+        detach_trace()
+        print(f"🧠 Scoring {len(batch)} accounts in one call...")
+        prompt = BATCH_FIT_SCORING_PROMPT.format(accounts="\n".join(
+            BATCH_ACCOUNT_BLOCK.format(domain=r.domain, icp_ruleset=r.icp_ruleset, signals=r.signals)
+            for r in batch
+        ))
+        try:
+            async with self.limits.llm:
+                with span("llm.batch", provider="gemini"):
+                    result = await self.upstream.call(lambda: self.get_llm().ainvoke(
+                        [HumanMessage(content=prompt)],
+                        config={"configurable": {"response_mime_type": "application/json"}}
+                    ))
+            record_llm_usage(*llm_usage(result), traces=[r.trace for r in batch])
+            data = parse_llm_json(result.content)
+            if not isinstance(data, dict):
+                raise ScoringError("Batch answer is not a JSON object keyed by domain")
+        except Exception as e:
+            for r in batch:
+                if not r.future.done():
+                    r.future.set_exception(ScoringError(f"Batch scoring failed: {e}"))
+            return
+
+        for r in batch:
+            if r.future.done():
+                continue
+            try:
+                if r.domain not in data:
+                    raise ScoringError("missing from batch answer")
+                r.future.set_result(diagnosis_from_json(data[r.domain]))
+            except ScoringError as e:
+                r.future.set_exception(ScoringError(f"{r.domain}: {e}"))
+
+    async def close(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        for r in self._pending:
+            if not r.future.done():
+                r.future.cancel()
+        self._pending = []
+        await asyncio.gather(*self._inflight, return_exceptions=True)
@@ -0,0 +1,85 @@
+from typing import Any, Dict, List, Tuple
+from app.models.contracts import Signal
+from app.models.evidence import Evidence
+
+# Signal types the extraction prompt may return (SIGNAL_EXTRACTION_PROMPT rule 2)
+SIGNAL_TYPES = {
+    "EXEC_HIRE", "FUNDING", "TECH_STACK", "GTM_TOOLING", "PARTNER", "EXPANSION", "COMPLIANCE", "PRODUCT_LAUNCH",
+}
+
+def chunk_excerpt(item: Evidence, max_chars: int) -> List[str]:
+    """Splits an excerpt on line boundaries into chunks of at most ~max_chars."""
+    chunks, current, size = [], [], 0
+    for line in (item.excerpt or "").splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if current and size + len(line) > max_chars:
+            chunks.append("\n".join(current))
+            current, size = [], 0
+        current.append(line[:max_chars])
+        size += len(line) + 1
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+def extraction_input(item: Evidence, chunk: str) -> str:
+    """The INPUT TEXT block: the evidence id is in the text so the model can cite it."""
+    return f"EVIDENCE ID: {item.evidence_id}\nSOURCE: {item.source_type} - {item.url}\n\n{chunk}"
+
+def parse_signals(data: Any, evidence_id: str) -> List[Signal]:
+    """
+    Validates one extraction answer (a JSON list of Signal objects, or {"signals": [...]}).
+    Unknown types and malformed entries are dropped; citations are pinned to the chunk's evidence id,
+    the only one the model was shown.
+    """
+    if isinstance(data, dict):
+        data = data.get("signals", [])
+    if not isinstance(data, list):
+        return []
+    signals = []
+    for entry in data:
+        if not isinstance(entry, dict):
+            continue
+        signal_type = str(entry.get("signal_type", "")).strip().upper()
+        if signal_type not in SIGNAL_TYPES:
+            continue
+        try:
+            signals.append(Signal(
+                signal_type=signal_type,
+                label=str(entry.get("label") or signal_type),
+                value=str(entry.get("value") or ""),
+                confidence=min(1.0, max(0.0, float(entry.get("confidence", 0.5)))),
+                evidence_ids=[evidence_id],
+            ))
+        except (TypeError, ValueError):
+            continue
+    return signals
+
+def _key(signal: Signal) -> Tuple[str, str]:
+    return signal.signal_type, " ".join((signal.value or signal.label).lower().split())
+
+def merge_signals(extracted: List[Signal], detected: List[Signal]) -> List[Signal]:
+    """
+    Dedupes extracted signals on (type, value), merging their citations and keeping the highest
+    confidence. Rule-detected signals (app.agents.rules) only fill types the model found nothing for.
+    """
+    merged: Dict[Tuple[str, str], Signal] = {}
+    for signal in extracted:
+        key = _key(signal)
+        current = merged.get(key)
+        if current is None:
+            merged[key] = signal.model_copy(update={"evidence_ids": list(signal.evidence_ids)})
+            continue
+        current.confidence = max(current.confidence, signal.confidence)
+        current.evidence_ids += [e for e in signal.evidence_ids if e not in current.evidence_ids]
+    covered = {signal_type for signal_type, _ in merged}
+    signals = list(merged.values()) + [s for s in detected if s.signal_type not in covered]
+    return sorted(signals, key=lambda s: (s.signal_type, -s.confidence))
+
+def render_signals(signals: List[Signal]) -> str:
+    """Compact signal list for FIT_SCORING_PROMPT: one line per signal, no raw page text."""
+    return "\n".join(
+        f"- [{s.signal_type}] {s.label}: {s.value} (confidence {s.confidence:.2f}; evidence {', '.join(s.evidence_ids)})"
+        for s in signals
+    )
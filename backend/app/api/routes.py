@@ -1,8 +1,17 @@
 import asyncio
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends, Request
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
-from app.models.contracts import ResearcherState, ResearchConfig, AccountDossier
-from app.agents.graph import ResearcherGraph
+from app.core.config import settings
+from app.core.runtime import ResearchRuntime
+from app.models.contracts import ResearchConfig, AccountDossier
+from app.models.evidence import CONTENT
+from app.agents.scheduler import BatchJob
+from app.services.hubspot_service import dossier_properties
+from app.services.dossier_export import export_dossiers, find_export, query_export
 
 router = APIRouter()
 
@@ -10,8 +19,38 @@ class RunResearchRequest(BaseModel):
     domain: str
     config: ResearchConfig
 
+class BatchResearchRequest(BaseModel):
+    domains: List[str]
+    config: ResearchConfig
+
+def get_runtime(request: Request) -> ResearchRuntime:
+    """FastAPI dependency: the runtime created in the app lifespan."""
+    return request.app.state.runtime
+
+def _get_job(runtime: ResearchRuntime, job_id: str) -> BatchJob:
+    job = runtime.scheduler.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown batch job {job_id}")
+    return job
+
+def _csv(value: Optional[str]) -> Optional[List[str]]:
+    items = [v.strip() for v in (value or "").split(",") if v.strip()]
+    return items or None
+
+async def _export(dossiers: Iterable[Dict[str, Any]], fmt: str) -> Dict[str, Any]:
+    try:
+        summary = await asyncio.to_thread(
+            export_dossiers, dossiers, settings.EXPORT_DIR, fmt, settings.EXPORT_ROW_GROUP_ROWS
+        )
+    except ImportError:
+        raise HTTPException(status_code=501, detail="Dossier export needs pyarrow (pip install pyarrow)")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    print(f"📤 Exported {summary['rows']} dossiers to {summary['export_id']} ({summary['format']}, {summary['seconds']}s)")
+    return summary
+
 @router.post("/run", response_model=AccountDossier)
-async def run_research_mission(request: RunResearchRequest):
+async def run_research_mission(request: RunResearchRequest, runtime: ResearchRuntime = Depends(get_runtime)):
     """
     Triggers the Researcher Agent Graph.
     """
@@ -20,23 +59,186 @@ async def run_research_mission(request: RunResearchRequest):
     
     print(f"🚀 Starting Mission: Research {domain} for {config.persona}")
     
-    # Initialize Graph
-    agent = ResearcherGraph()
-    app = agent.compile()
-    
-    # Initialize State
-    initial_state = ResearcherState(
-        domain=domain,
-        config=config,
-        status="STARTING"
-    )
-    
-    # Run Graph (Await execution)
+    # Run Graph (Await execution) on the shared, pre-compiled runtime graph
     # in production, this should be a background job (Celery/Arq)
     # but for v1, we await it to return the result immediately to the UI
     try:
-        final_state = await app.ainvoke(initial_state)
+        final_state = await runtime.run_mission(domain, config)
         return final_state["dossier"]
     except Exception as e:
         print(f"❌ Mission Failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/stream")
+async def stream_research_mission(request: RunResearchRequest, runtime: ResearchRuntime = Depends(get_runtime)):
+    """
+    Runs the Researcher Agent Graph and streams progress as server-sent events:
+    `node` (graph transitions), `evidence` (each EvidenceItem as it is fetched),
+    `dossier` (final AccountDossier), or `error`.
+    """
+    print(f"🚀 Starting Streamed Mission: Research {request.domain} for {request.config.persona}")
+
+    async def sse():
+        try:
+            async for event, data in runtime.stream_mission(request.domain, request.config):
+                yield f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+        except Exception as e:
+            print(f"❌ Mission Failed: {e}")
+            yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+
+    return StreamingResponse(
+        sse(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.post("/batch")
+async def submit_research_batch(request: BatchResearchRequest, runtime: ResearchRuntime = Depends(get_runtime)):
+    """
+    Queues a list of domains on the in-process batch scheduler.
+    Returns immediately with the job summary; poll it or stream its results.
+    """
+    # Normalise + dedupe, keeping submission order
+    domains = list(dict.fromkeys(d.strip().lower() for d in request.domains if d.strip()))
+    if not domains:
+        raise HTTPException(status_code=400, detail="No domains submitted")
+    if len(domains) > settings.BATCH_MAX_DOMAINS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(domains)} domains (max {settings.BATCH_MAX_DOMAINS})"
+        )
+
+    job = runtime.scheduler.submit(domains, request.config)
+    return job.summary()
+
+@router.get("/batch/{job_id}")
+async def get_research_batch(job_id: str, runtime: ResearchRuntime = Depends(get_runtime)):
+    return _get_job(runtime, job_id).summary()
+
+@router.get("/batch/{job_id}/results")
+async def stream_research_batch(job_id: str, runtime: ResearchRuntime = Depends(get_runtime)):
+    """
+    Streams per-domain results as newline-delimited JSON while the batch runs.
+    """
+    job = _get_job(runtime, job_id)
+
+    async def ndjson():
+        async for result in job.stream():
+            yield json.dumps(result) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+@router.delete("/batch/{job_id}")
+async def cancel_research_batch(job_id: str, runtime: ResearchRuntime = Depends(get_runtime)):
+    job = _get_job(runtime, job_id)
+    await job.cancel()
+    return job.summary()
+
+@router.post("/batch/{job_id}/crm-sync")
+async def sync_research_batch(job_id: str, runtime: ResearchRuntime = Depends(get_runtime)):
+    """
+    Writes the batch's finished dossiers back to HubSpot in bulk
+    (one search per 100 domains, one batch update per 100 companies).
+    """
+    job = _get_job(runtime, job_id)
+    if job.config.crm_update_mode != "auto":
+        raise HTTPException(status_code=400, detail="crm_update_mode is not 'auto' for this batch")
+
+    updates = {r["domain"]: dossier_properties(r["dossier"]) for r in job.results if r.get("dossier")}
+    result = await runtime.hubspot.sync_companies(updates)
+    return {"job_id": job_id, "submitted": len(updates), **result}
+
+@router.post("/batch/{job_id}/export")
+async def export_research_batch(job_id: str, format: str = "parquet", runtime: ResearchRuntime = Depends(get_runtime)):
+    """
+    Writes the batch's finished dossiers (so far) to a Parquet or Arrow IPC export, one row per account.
+    Query it with GET /exports/{export_id}/query or download it with GET /exports/{export_id}.
+    """
+    job = _get_job(runtime, job_id)
+    dossiers = [r["dossier"] for r in job.results if r.get("dossier")]
+    return await _export(dossiers, format)
+
+@router.get("/cache/stats")
+async def get_cache_stats(runtime: ResearchRuntime = Depends(get_runtime)):
+    """
+    Hit-rate counters for the LLM completion cache (since process start), CRM mirror and evidence store size,
+    plus the excerpts currently held in memory (shared across missions).
+    """
+    # SQLite counts under each store's lock (held by syncs/evictions): off the event loop
+    async def stats(store):
+        return await asyncio.to_thread(store.stats) if store else None
+
+    return {
+        "llm": await stats(runtime.llm_cache),
+        "crm_mirror": await stats(runtime.crm_mirror),
+        "evidence_store": await stats(runtime.evidence_store),
+        "excerpts": CONTENT.stats(),
+    }
+
+@router.get("/upstreams")
+async def get_upstream_health(runtime: ResearchRuntime = Depends(get_runtime)):
+    """Current adaptive rate and breaker state per provider, plus crawled hosts failing fast."""
+    return runtime.upstreams.stats()
+
+@router.post("/jobs")
+async def submit_research_job(request: RunResearchRequest, runtime: ResearchRuntime = Depends(get_runtime)):
+    """
+    Enqueues a mission on the durable job queue; a worker (python -m app.worker) runs it.
+    """
+    job_id = await runtime.job_queue.enqueue(request.domain.strip().lower(), request.config)
+    return await runtime.job_queue.get(job_id)
+
+@router.post("/jobs/export")
+async def export_research_jobs(format: str = "parquet", runtime: ResearchRuntime = Depends(get_runtime)):
+    """Exports the dossiers of every completed durable job, streamed from the queue page by page."""
+    return await _export(runtime.job_queue.completed_dossiers(), format)
+
+@router.get("/jobs/{job_id}")
+async def get_research_job(job_id: str, runtime: ResearchRuntime = Depends(get_runtime)):
+    job = await runtime.job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return job
+
+@router.get("/exports/{export_id}")
+async def download_research_export(export_id: str):
+    path = find_export(settings.EXPORT_DIR, export_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail=f"Unknown export {export_id}")
+    return FileResponse(path, filename=os.path.basename(path), media_type="application/octet-stream")
+
+@router.get("/exports/{export_id}/query")
+async def query_research_export(
+    export_id: str,
+    fit_tier: Optional[str] = None, # Comma list: A,B
+    min_confidence: Optional[float] = None,
+    signal_type: Optional[str] = None, # Comma list: accounts with any of these signals
+    sort: Optional[str] = "confidence", # Any column; empty = file order
+    order: str = "desc",
+    limit: int = 100,
+    columns: Optional[str] = None, # Comma list; default all
+):
+    """
+    Filters and sorts an export without loading it: the file is scanned batch by batch
+    and only the best `limit` rows are kept.
+    """
+    path = find_export(settings.EXPORT_DIR, export_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail=f"Unknown export {export_id}")
+    limit = max(1, min(limit, settings.EXPORT_QUERY_MAX_ROWS))
+    try:
+        rows = await asyncio.to_thread(
+            query_export, path,
+            fit_tiers=_csv(fit_tier),
+            min_confidence=min_confidence,
+            signal_types=_csv(signal_type),
+            sort_by=sort or None,
+            descending=order != "asc",
+            limit=limit,
+            columns=_csv(columns),
+        )
+    except ImportError:
+        raise HTTPException(status_code=501, detail="Dossier export needs pyarrow (pip install pyarrow)")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"export_id": export_id, "count": len(rows), "rows": rows}
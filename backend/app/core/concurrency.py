@@ -0,0 +1,33 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict
+
+class ProviderLimits:
+    """
+    Process-wide caps on concurrent calls to each external provider.
+    Shared by every mission so batch runs cannot overload Tavily, target sites or the LLM.
+    """
+
+    def __init__(self, search: int = 16, fetch: int = 64, llm: int = 8, per_host: int = 2):
+        self.search = asyncio.Semaphore(search)
+        self.fetch = asyncio.Semaphore(fetch)
+        self.llm = asyncio.Semaphore(llm)
+        self.per_host = per_host
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+        self._host_users: Dict[str, int] = {} # Missions holding or waiting on each host's semaphore
+
+    @asynccontextmanager
+    async def host(self, host: str) -> AsyncIterator[None]:
+        """Politeness: at most per_host parallel fetches against one site, across all missions."""
+        if host not in self._hosts:
+            self._hosts[host] = asyncio.Semaphore(self.per_host)
+            self._host_users[host] = 0
+        self._host_users[host] += 1
+        try:
+            async with self._hosts[host]:
+                yield
+        finally:
+            self._host_users[host] -= 1
+            if not self._host_users[host]:
+                # Idle host: forget it, a crawl touches thousands of sites once
+                del self._hosts[host], self._host_users[host]
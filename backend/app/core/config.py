@@ -12,10 +12,102 @@ class Settings(BaseSettings):
     # LLM Provider (Default to Gemini as discussed)
     GOOGLE_API_KEY: str | None = None
     OPENAI_API_KEY: str | None = None
+    LLM_MODEL: str = "gemini-1.5-flash"
+    EVIDENCE_TOKEN_BUDGET: int = 2500 # Evidence block of the fit-scoring prompt
+    SIGNAL_EXTRACTION: bool = True # Score on extracted signals instead of raw evidence text
+    SIGNAL_LLM_MODEL: str = "gemini-1.5-flash-8b" # Cheap model, one call per evidence chunk
+    SIGNAL_CHUNK_CHARS: int = 3000
+    SIGNAL_LLM_INPUT_COST_PER_MTOK: float = 0.0375
+    SIGNAL_LLM_OUTPUT_COST_PER_MTOK: float = 0.15
+    RULE_PRESCORING: bool = True # Settle clear-cut accounts with deterministic rules, no LLM call
+    ICP_RULESETS_PATH: str = "" # JSON of ruleset_id -> ICPRuleset fields (competitors, disqualifiers...)
+    LLM_INPUT_COST_PER_MTOK: float = 0.075 # USD, for the cost estimate in /metrics and dossier meta
+    LLM_OUTPUT_COST_PER_MTOK: float = 0.30
 
     # Services
     HUBSPOT_ACCESS_TOKEN: str | None = None
     TAVILY_API_KEY: str | None = None
+    HUBSPOT_SEARCH_RATE_PER_SECOND: float = 4.0 # CRM search endpoints are capped lower
+
+    # Batch Scheduler (global caps, shared by all missions in the process)
+    BATCH_MAX_MISSIONS: int = 32
+    BATCH_MAX_DOMAINS: int = 50000
+    BATCH_RETENTION_SECONDS: float = 3600.0 # Finished batches (and their dossiers) kept in memory this long
+    BATCH_MAX_FINISHED: int = 100 # ... and at most this many, oldest dropped first
+    SEARCH_CONCURRENCY: int = 16
+    FETCH_CONCURRENCY: int = 64
+    HOST_CONCURRENCY: int = 2 # Parallel fetches against one site, across all missions
+    LLM_CONCURRENCY: int = 8
+    BATCH_SCORING_MODE: str = "batched" # single|batched
+    BATCH_SCORING_MAX_ACCOUNTS: int = 8
+    BATCH_SCORING_MAX_WAIT: float = 0.5
+
+    # Upstream guards: adaptive request rates (halved on 429, regained on success) + circuit breakers
+    SEARCH_RATE_PER_SECOND: float = 10.0
+    LLM_RATE_PER_SECOND: float = 5.0
+    SIGNAL_LLM_RATE_PER_SECOND: float = 20.0 # Separate quota for the cheap signal model
+    JINA_RATE_PER_SECOND: float = 1.0 # r.jina.ai allows ~20 rpm without an API key
+    HUBSPOT_RATE_PER_SECOND: float = 10.0 # HubSpot burst limit per private app
+    HOST_RATE_PER_SECOND: float = 2.0 # Per crawled site
+    HOST_BURST: int = 4
+    BREAKER_FAILURE_THRESHOLD: int = 5 # Consecutive 5xx/transport failures before failing fast
+    BREAKER_RESET_SECONDS: float = 30.0
+
+    # Durable jobs (API enqueues, `python -m app.worker` processes)
+    JOB_QUEUE_PATH: str = ".cache/jobs.db"
+    CHECKPOINT_PATH: str = ".cache/checkpoints.db"
+    WORKER_CONCURRENCY: int = 8
+    WORKER_POLL_SECONDS: float = 1.0
+    JOB_LEASE_SECONDS: float = 300.0
+    JOB_MAX_ATTEMPTS: int = 3
+
+    # Startup: providers loaded before the process takes work (comma list of llm, signal_llm, cpu; empty = on first use)
+    PREWARM_PROVIDERS: str = "llm,signal_llm,cpu"
+
+    # Local HubSpot company mirror (sqlite path, empty = off; synced by the API process)
+    CRM_MIRROR_PATH: str = ".cache/crm.db"
+    CRM_MIRROR_SYNC_SECONDS: float = 300.0
+    CRM_MIRROR_FULL_SYNC_HOURS: float = 24.0
+
+    # Dossier cache: sqlite:///path (local) or redis://host:port/db (production), empty = off
+    DOSSIER_CACHE_URL: str = "sqlite:///.cache/dossiers.db"
+
+    # Evidence store: evidence per domain across runs, re-scores only when it changed (sqlite path, empty = off)
+    EVIDENCE_STORE_PATH: str = ".cache/evidence.db"
+    EVIDENCE_RETENTION_DAYS: int = 90
+
+    # Dossier exports: Parquet / Arrow IPC files for analysts (needs pyarrow)
+    EXPORT_DIR: str = ".cache/exports"
+    EXPORT_ROW_GROUP_ROWS: int = 5000 # Rows held in memory while writing
+    EXPORT_QUERY_MAX_ROWS: int = 1000
+
+    # Search result cache (in memory, per process)
+    SEARCH_CACHE_TTL_SECONDS: float = 86400.0
+    SEARCH_CACHE_MAX_ENTRIES: int = 10000
+
+    # LLM completion cache (sqlite path, empty = off)
+    LLM_CACHE_PATH: str = ".cache/llm.db"
+    LLM_CACHE_TTL_DAYS: int = 30
+    LLM_CACHE_MAX_ENTRIES: int = 100000
+
+    # Page extraction (pages are streamed and cut off early)
+    FETCH_MAX_BYTES: int = 2 * 1024 * 1024
+    FETCH_MAX_TEXT_CHARS: int = 5000
+
+    # Page fetch cache (on disk, empty dir = off)
+    FETCH_CACHE_DIR: str = ".cache/http"
+    FETCH_CACHE_MAX_MB: int = 512
+    FETCH_CACHE_FRESH_SECONDS: float = 3600.0
+
+    # Shared HTTP pools (one for crawling pages, one for provider APIs)
+    HTTP_MAX_CONNECTIONS: int = 200
+    HTTP_MAX_KEEPALIVE: int = 50
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+
+    # CPU-bound stages (HTML parsing, rule pre-scoring, evidence packing): inline (event loop)
+    # or process (worker pool; CPU_WORKERS=0 = one per available core)
+    CPU_EXECUTOR: str = "inline"
+    CPU_WORKERS: int = 0
     
     class Config:
         env_file = ".env"
@@ -0,0 +1,96 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+def available_cores() -> int:
+    """Cores this process may run on (CPU affinity, e.g. a container's cpuset), not the host total."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+def _init_worker():
+    # Import what the tasks need once per worker, not on its first task
+    import app.agents.evidence_packer # noqa: F401
+    import app.agents.rules # noqa: F401
+    import app.services.fetcher # noqa: F401
+
+def _ready() -> int:
+    return os.getpid()
+
+def _on_shared(name: str, size: int, fn: Callable[..., T], *args) -> T:
+    """Worker side of run_on_bytes: fn gets a view of the segment, nothing is copied in."""
+    shm = shared_memory.SharedMemory(name=name) # Owned (and unlinked) by the parent
+    view = shm.buf[:size]
+    try:
+        return fn(view, *args)
+    finally:
+        view.release()
+        shm.close()
+
+class CPUExecutor:
+    """
+    Where the CPU-bound pipeline stages run: page text extraction, evidence packing, rule pre-scoring.
+    All I/O stays on the event loop either way.
+
+    inline:  on the event loop, as before. Cheapest for single missions and small pages.
+    process: on a pool of worker processes (one per core by default), so one mission's parsing or
+             packing no longer stalls the I/O of every other mission in flight. Page bodies reach the
+             workers through shared memory (written once, no pickling through the pool's pipes).
+    """
+
+    def __init__(self, mode: str = "inline", workers: int = 0):
+        if mode not in ("inline", "process"):
+            raise ValueError(f"Unknown CPU executor mode '{mode}' (inline|process)")
+        self.mode = mode
+        self.workers = workers or available_cores()
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def pooled(self) -> bool:
+        return self.mode == "process"
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # forkserver/spawn: workers don't inherit this process's event loop, sockets and threads
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            self._pool = ProcessPoolExecutor(
+                self.workers, mp_context=multiprocessing.get_context(method), initializer=_init_worker
+            )
+            print(f"🧵 CPU pool: {self.workers} {method} workers")
+        return self._pool
+
+    def warm(self):
+        """Starts the worker processes ahead of the first mission (startup prewarm)."""
+        if self.pooled:
+            pool = self._get_pool()
+            for future in [pool.submit(_ready) for _ in range(self.workers)]:
+                future.result()
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        """fn(*args) inline, or in a worker (fn and args must be picklable: module-level functions)."""
+        if not self.pooled:
+            return fn(*args)
+        return await asyncio.get_running_loop().run_in_executor(self._get_pool(), fn, *args)
+
+    async def run_on_bytes(self, fn: Callable[..., T], data: bytes, *args) -> T:
+        """fn(buffer, *args) on a large byte payload (a page body): buffer is a memoryview of it."""
+        if not self.pooled:
+            return fn(memoryview(data), *args)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, len(data)))
+        try:
+            shm.buf[:len(data)] = data
+            return await self.run(_on_shared, shm.name, len(data), fn, *args)
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,199 @@
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from app.core.config import settings
+from app.models.contracts import MissionMetrics
+
+# Seconds; external calls range from cache hits (~ms) to slow LLM calls and deadlines (~30s)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+def _labels(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def _render_labels(key: LabelKey, extra: str = "") -> str:
+    parts = [f'{k}="{v}"' for k, v in key]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+class MetricsRegistry:
+    """
+    Process-wide counters and histograms, rendered in the Prometheus text format (GET /metrics).
+    Small on purpose: label sets are low-cardinality (span, provider, cache, outcome).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._help: Dict[str, Tuple[str, str]] = {} # name -> (type, help)
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, List[float]]] = {} # bucket counts + [sum, count]
+
+    def describe(self, name: str, kind: str, help_text: str):
+        self._help[name] = (kind, help_text)
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        key = _labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        key = _labels(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            counts = series.get(key)
+            if counts is None:
+                counts = series[key] = [0.0] * (len(DEFAULT_BUCKETS) + 2)
+            for i, bound in enumerate(DEFAULT_BUCKETS):
+                if value <= bound:
+                    counts[i] += 1
+            counts[-2] += value
+            counts[-1] += 1
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                kind, help_text = self._help.get(name, ("counter", name))
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+                for key, value in sorted(series.items()):
+                    lines.append(f"{name}{_render_labels(key)} {value:g}")
+            for name, series in sorted(self._histograms.items()):
+                _, help_text = self._help.get(name, ("histogram", name))
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+                for key, counts in sorted(series.items()):
+                    for bound, count in zip(DEFAULT_BUCKETS, counts):
+                        le = 'le="%s"' % bound
+                        lines.append(f"{name}_bucket{_render_labels(key, le)} {count:g}")
+                    inf = 'le="+Inf"'
+                    lines.append(f"{name}_bucket{_render_labels(key, inf)} {counts[-1]:g}")
+                    lines.append(f"{name}_sum{_render_labels(key)} {counts[-2]:.6f}")
+                    lines.append(f"{name}_count{_render_labels(key)} {counts[-1]:g}")
+        return "\n".join(lines) + "\n"
+
+METRICS = MetricsRegistry()
+METRICS.describe("research_span_seconds", "histogram", "Duration of graph nodes and external calls")
+METRICS.describe("research_external_calls_total", "counter", "External calls by provider and outcome")
+METRICS.describe("research_cache_events_total", "counter", "Cache lookups by cache and result (hit/miss/...)")
+METRICS.describe("research_llm_tokens_total", "counter", "LLM tokens by direction (input/output)")
+METRICS.describe("research_llm_cost_usd_total", "counter", "Estimated LLM spend in USD")
+METRICS.describe("research_missions_total", "counter", "Finished missions by final status")
+METRICS.describe("research_startup_seconds", "gauge", "Startup phases of this process (imports, runtime, prewarm:<provider>)")
+
+class MissionTrace:
+    """Per-mission accumulator: node and call timings, call counts, cache results, LLM tokens."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.node_ms: Dict[str, float] = {}
+        self.call_ms: Dict[str, float] = {}
+        self.calls: Dict[str, int] = {}
+        self.cache: Dict[str, int] = {}
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cost_usd = 0.0
+
+    def summary(self) -> MissionMetrics:
+        return MissionMetrics(
+            total_ms=round((time.perf_counter() - self.started) * 1000, 1),
+            node_ms={k: round(v, 1) for k, v in self.node_ms.items()},
+            call_ms={k: round(v, 1) for k, v in self.call_ms.items()},
+            calls=dict(self.calls),
+            cache=dict(self.cache),
+            llm_input_tokens=self.input_tokens,
+            llm_output_tokens=self.output_tokens,
+            llm_cost_usd=round(self.cost_usd, 6),
+        )
+
+_current_trace: contextvars.ContextVar[Optional[MissionTrace]] = contextvars.ContextVar("mission_trace", default=None)
+
+def current_trace() -> Optional[MissionTrace]:
+    return _current_trace.get()
+
+@contextmanager
+def mission_trace() -> Iterator[MissionTrace]:
+    """Collects spans for everything the mission awaits (graph nodes inherit the context)."""
+    trace = MissionTrace()
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        try:
+            _current_trace.reset(token)
+        except ValueError:
+            pass # Streamed mission closed from another context (client went away)
+
+def detach_trace():
+    """For shared background work (e.g. one batched LLM call for many missions): stop attributing to a mission."""
+    _current_trace.set(None)
+
+@contextmanager
+def span(name: str, provider: Optional[str] = None):
+    """
+    Times a block into research_span_seconds{span=name}. Node spans are named "node.<name>";
+    with a provider it is also counted as an external call (outcome ok/error).
+    """
+    start = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        METRICS.observe("research_span_seconds", elapsed, span=name)
+        if provider:
+            METRICS.inc("research_external_calls_total", provider=provider, outcome=outcome)
+        trace = _current_trace.get()
+        if trace is not None:
+            if name.startswith("node."):
+                key = name[5:]
+                trace.node_ms[key] = trace.node_ms.get(key, 0.0) + elapsed * 1000
+            else:
+                trace.call_ms[name] = trace.call_ms.get(name, 0.0) + elapsed * 1000
+                trace.calls[name] = trace.calls.get(name, 0) + 1
+
+def record_cache(cache: str, result: str):
+    """result: hit|miss, or revalidated|stale|coalesced where the cache has those."""
+    METRICS.inc("research_cache_events_total", cache=cache, result=result)
+    trace = _current_trace.get()
+    if trace is not None:
+        key = f"{cache}.{result}"
+        trace.cache[key] = trace.cache.get(key, 0) + 1
+
+def record_llm_usage(
+    input_tokens: int,
+    output_tokens: int,
+    traces: Optional[List[MissionTrace]] = None,
+    prices: Optional[Tuple[float, float]] = None,
+):
+    """
+    Global token/cost counters for one LLM call, split evenly across the missions it served
+    (traces; defaults to the current mission). prices: (input, output) USD per million tokens,
+    defaults to the scoring model's.
+    """
+    input_price, output_price = prices or (settings.LLM_INPUT_COST_PER_MTOK, settings.LLM_OUTPUT_COST_PER_MTOK)
+    cost_usd = (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+    METRICS.inc("research_llm_tokens_total", input_tokens, direction="input")
+    METRICS.inc("research_llm_tokens_total", output_tokens, direction="output")
+    METRICS.inc("research_llm_cost_usd_total", cost_usd)
+    if traces is None:
+        traces = [_current_trace.get()]
+    traces = [t for t in traces if t is not None]
+    for trace in traces:
+        trace.input_tokens += input_tokens // len(traces)
+        trace.output_tokens += output_tokens // len(traces)
+        trace.cost_usd += cost_usd / len(traces)
+
+def llm_usage(result: Any) -> Tuple[int, int]:
+    """(input, output) tokens from a LangChain AIMessage; (0, 0) when the provider reports none."""
+    usage = getattr(result, "usage_metadata", None) or {}
+    return int(usage.get("input_tokens", 0)), int(usage.get("output_tokens", 0))
+
+def record_mission(status: Optional[str]):
+    METRICS.inc("research_missions_total", status=status or "UNKNOWN")
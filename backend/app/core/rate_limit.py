@@ -0,0 +1,277 @@
+import asyncio
+import random
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+import httpx
+
+T = TypeVar("T")
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose breaker is open (it failed repeatedly just now)."""
+
+class RateLimiter:
+    """
+    Async token bucket: at most `rate` acquisitions per second on average, bursts of up to `burst`.
+    Waiters are served in arrival order, so one busy caller cannot starve the others.
+    The rate is adaptive (AIMD) between min_rate and max_rate: throttle() halves it and can pause
+    the bucket for a Retry-After, on_success() adds it back a little at a time.
+    """
+
+    def __init__(self, rate: float, burst: int = 1, min_rate: Optional[float] = None, max_rate: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate if min_rate is not None else rate / 20
+        self.max_rate = max_rate if max_rate is not None else rate
+        self.increase = self.max_rate / 50 # Back to full speed after ~50 clean calls per halving
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        # The lock queues waiters FIFO; the holder sleeps until its token is available
+        async with self._lock:
+            pause = self._paused_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+    def throttle(self, retry_after: Optional[float] = None):
+        """Multiplicative decrease on a 429; a Retry-After also holds every caller back that long."""
+        self._refill()
+        self.rate = max(self.min_rate, self.rate / 2)
+        self._tokens = min(self._tokens, 0.0)
+        if retry_after:
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+
+    def on_success(self):
+        """Additive increase, up to max_rate."""
+        if self.rate < self.max_rate:
+            self._refill()
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive failures; while open, calls fail fast.
+    After reset_seconds one trial call is let through (half-open): success closes it, failure re-opens it.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0, name: str = "upstream"):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def release_probe(self):
+        """The trial call was abandoned (cancelled): let the next caller probe instead."""
+        self._probing = False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self._probing or self.failures >= self.failure_threshold:
+            if self.opened_at is None or self._probing:
+                print(f"🔌 {self.name} circuit opened after {self.failures} failures")
+            self.opened_at = time.monotonic()
+        self._probing = False
+
+def _retry_after(response: Optional[httpx.Response]) -> Optional[float]:
+    value = response.headers.get("Retry-After") if response is not None else None
+    try:
+        return max(0.0, float(value)) if value else None
+    except ValueError:
+        return None # HTTP-date form: fall back to our own backoff
+
+def _error_status(e: Exception) -> int:
+    """HTTP status carried by an exception (httpx, google-api-core and most SDK errors), 0 if none."""
+    for status in (
+        getattr(e, "status_code", None),
+        getattr(e, "code", None),
+        getattr(getattr(e, "response", None), "status_code", None),
+    ):
+        if isinstance(status, int):
+            return status
+    return 0
+
+def _is_throttle_error(e: Exception) -> bool:
+    """
+    429s raised as exceptions (e.g. SDK clients such as the Gemini one): the status code, or gRPC's
+    RESOURCE_EXHAUSTED. Not a bare "429" in the message, which also matches URLs, ids and byte counts.
+    """
+    return _error_status(e) == 429 or "RESOURCE_EXHAUSTED" in str(e)
+
+def _response_of(result: Any) -> Optional[httpx.Response]:
+    return result if isinstance(result, httpx.Response) else None
+
+class Upstream:
+    """
+    Guard for one external service (or one crawled host): adaptive token bucket + circuit breaker
+    + jittered retries. 429s slow the bucket down (honouring Retry-After), 5xx and transport
+    errors count towards the breaker; both are retried up to max_retries times.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate: float,
+        burst: int = 1,
+        max_retries: int = 2,
+        failure_threshold: int = 5,
+        reset_seconds: float = 30.0,
+        max_retry_delay: float = 30.0,
+    ):
+        self.name = name
+        self.limiter = RateLimiter(rate, burst=burst)
+        self.breaker = CircuitBreaker(failure_threshold, reset_seconds, name=name)
+        self.max_retries = max_retries
+        self.max_retry_delay = max_retry_delay
+
+    def _backoff(self, attempt: int) -> float:
+        return min(self.max_retry_delay, 0.5 * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+    async def call(
+        self,
+        fn: Callable[[], Awaitable[T]],
+        response_of: Callable[[T], Optional[httpx.Response]] = _response_of,
+    ) -> T:
+        """
+        Runs fn() under the limiter and breaker. If fn returns an HTTP response (found via
+        response_of), 429/5xx are retried; the last response is returned once retries run out.
+        Raises CircuitOpenError without calling fn while the breaker is open.
+        """
+        for attempt in range(self.max_retries + 1):
+            if not self.breaker.allow():
+                raise CircuitOpenError(f"{self.name} circuit open, failing fast")
+            try:
+                await self.limiter.acquire()
+                result = await fn()
+            except asyncio.CancelledError:
+                self.breaker.release_probe()
+                raise
+            except Exception as e:
+                if _is_throttle_error(e):
+                    self.limiter.throttle()
+                    self.breaker.record_success() # Alive, just busy
+                elif isinstance(e, (httpx.TransportError, asyncio.TimeoutError)) or _error_status(e) >= 500:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success() # Our request was bad, not the upstream
+                    raise
+                if attempt == self.max_retries:
+                    raise
+                await asyncio.sleep(self._backoff(attempt))
+                continue
+
+            response = response_of(result)
+            status = response.status_code if response is not None else 200
+            if status == 429:
+                delay = _retry_after(response)
+                self.limiter.throttle(delay)
+                self.breaker.record_success()
+            elif status >= 500:
+                delay = None
+                self.breaker.record_failure()
+            else:
+                self.limiter.on_success()
+                self.breaker.record_success()
+                return result
+
+            if attempt == self.max_retries or (delay or 0) > self.max_retry_delay:
+                return result
+            print(f"⏳ {self.name} {status}, retrying (attempt {attempt + 1})")
+            await asyncio.sleep(delay if delay is not None else self._backoff(attempt))
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {"rate": round(self.limiter.rate, 3), "breaker": self.breaker.state, "failures": self.breaker.failures}
+
+class UpstreamRegistry:
+    """
+    Process-wide Upstream guards: one per named provider (search, llm, signal_llm, jina, hubspot)
+    and one per crawled host, created on first use (LRU-bounded).
+    """
+
+    def __init__(
+        self,
+        providers: Dict[str, Dict[str, Any]],
+        host_rate: float = 2.0,
+        host_burst: int = 4,
+        failure_threshold: int = 5,
+        reset_seconds: float = 30.0,
+        max_hosts: int = 10000,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.providers = {
+            name: Upstream(name, failure_threshold=failure_threshold, reset_seconds=reset_seconds, **opts)
+            for name, opts in providers.items()
+        }
+        self.host_rate = host_rate
+        self.host_burst = host_burst
+        self.max_hosts = max_hosts
+        self._hosts: "OrderedDict[str, Upstream]" = OrderedDict()
+
+    def provider(self, name: str) -> Upstream:
+        return self.providers[name]
+
+    def host(self, host: str) -> Upstream:
+        upstream = self._hosts.get(host)
+        if upstream is None:
+            # Crawled sites: one retry, and never wait long on a site's Retry-After
+            upstream = Upstream(
+                host, self.host_rate, burst=self.host_burst, max_retries=1,
+                failure_threshold=self.failure_threshold, reset_seconds=self.reset_seconds, max_retry_delay=5.0,
+            )
+            self._hosts[host] = upstream
+            while len(self._hosts) > self.max_hosts:
+                self._hosts.popitem(last=False)
+        else:
+            self._hosts.move_to_end(host)
+        return upstream
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "providers": {name: u.stats() for name, u in self.providers.items()},
+            "hosts_tracked": len(self._hosts),
+            "hosts_open": [h for h, u in self._hosts.items() if u.breaker.state != "closed"],
+        }
@@ -0,0 +1,371 @@
+import asyncio
+import httpx
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Tuple
+from app.core.concurrency import ProviderLimits
+from app.core.config import settings
+from app.core.executor import CPUExecutor
+from app.core.metrics import MissionTrace, mission_trace, record_cache, record_mission
+from app.core.rate_limit import RateLimiter, UpstreamRegistry
+from app.models.contracts import ResearcherState, ResearchConfig
+from app.models.evidence import Evidence
+from app.services.fetcher import Fetcher
+from app.services.fetch_cache import FetchCache
+from app.services.llm_cache import LLMCache
+from app.services.job_queue import JobQueue
+from app.services.hubspot_service import HubSpotService
+from app.services.crm_mirror import CRMMirror
+from app.services.evidence_store import EvidenceStore, scoring_key
+from app.services.search_provider import TavilySearchProvider
+from app.services.dossier_cache import (
+    DossierCacheEntry, build_dossier_cache, dossier_cache_key, evidence_fingerprint
+)
+from app.agents.graph import ResearcherGraph, source_types_for_signals
+from app.agents.scoring import BatchScorer
+from app.agents.prompts import PROMPT_VERSION
+from app.agents.rules import RULES_VERSION
+from app.agents.scheduler import BatchScheduler
+
+# Cached and stored diagnoses are only valid for the prompts and rules that produced them
+SCORING_VERSION = f"{PROMPT_VERSION}+{RULES_VERSION}"
+
+# Final statuses with a real diagnosis (worth caching and storing). NO_EVIDENCE (nothing could be
+# fetched) and SCORING_SKIPPED (no API key) still return a placeholder dossier but are never persisted.
+SCORED_STATUSES = ("SCORING_COMPLETE", "CACHE_REVALIDATED", "EVIDENCE_UNCHANGED", "RULES_SETTLED")
+
+class ResearchRuntime:
+    """
+    Application-lifetime resources shared by every mission:
+    pooled HTTP/2 clients, the rate-limited HubSpot client and its local mirror, the cached LLM client,
+    one compiled graph, the dossier, page fetch and LLM completion caches, the evidence store
+    and the batch scheduler.
+    Built once in the FastAPI lifespan (app.main) and closed on shutdown.
+    Workers (app.worker) build one with a checkpointer so missions can resume after a crash.
+    """
+
+    def __init__(
+        self,
+        checkpointer=None,
+        transport_factory: Optional[Callable[[httpx.Limits], httpx.AsyncBaseTransport]] = None,
+    ):
+        limits = httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+        )
+        # transport_factory swaps the network layer (benchmarks/ routes everything to local stand-ins)
+        transport = (lambda: transport_factory(limits)) if transport_factory else (lambda: None)
+        # Crawling client: many hosts, follows redirects
+        self.web_client = httpx.AsyncClient(
+            http2=True, limits=limits, timeout=10.0, follow_redirects=True, transport=transport()
+        )
+        # Provider API client: few hosts (Tavily, HubSpot), long-lived connections
+        self.api_client = httpx.AsyncClient(http2=True, limits=limits, timeout=10.0, transport=transport())
+
+        # CPU-bound stages (HTML parsing, rule pre-scoring, evidence packing): inline or a process pool
+        self.cpu = CPUExecutor(settings.CPU_EXECUTOR, settings.CPU_WORKERS)
+        self.provider_limits = ProviderLimits(
+            search=settings.SEARCH_CONCURRENCY,
+            fetch=settings.FETCH_CONCURRENCY,
+            llm=settings.LLM_CONCURRENCY,
+            per_host=settings.HOST_CONCURRENCY,
+        )
+        # Rate limits + circuit breakers per provider and per crawled host
+        self.upstreams = UpstreamRegistry(
+            {
+                "search": {"rate": settings.SEARCH_RATE_PER_SECOND, "burst": int(settings.SEARCH_RATE_PER_SECOND)},
+                "llm": {"rate": settings.LLM_RATE_PER_SECOND, "burst": int(settings.LLM_RATE_PER_SECOND)},
+                "signal_llm": {
+                    "rate": settings.SIGNAL_LLM_RATE_PER_SECOND, "burst": int(settings.SIGNAL_LLM_RATE_PER_SECOND)
+                },
+                "jina": {"rate": settings.JINA_RATE_PER_SECOND, "burst": 2},
+                "hubspot": {
+                    "rate": settings.HUBSPOT_RATE_PER_SECOND,
+                    "burst": int(settings.HUBSPOT_RATE_PER_SECOND),
+                    "max_retries": 5,
+                },
+            },
+            host_rate=settings.HOST_RATE_PER_SECOND,
+            host_burst=settings.HOST_BURST,
+            failure_threshold=settings.BREAKER_FAILURE_THRESHOLD,
+            reset_seconds=settings.BREAKER_RESET_SECONDS,
+        )
+        self.hubspot = HubSpotService(
+            client=self.api_client,
+            upstream=self.upstreams.provider("hubspot"),
+            search_limiter=RateLimiter(
+                settings.HUBSPOT_SEARCH_RATE_PER_SECOND, burst=int(settings.HUBSPOT_SEARCH_RATE_PER_SECOND)
+            ),
+        )
+        self.crm_mirror = CRMMirror(settings.CRM_MIRROR_PATH) if settings.CRM_MIRROR_PATH else None
+        self._crm_sync_task: Optional[asyncio.Task] = None
+        self.fetch_cache = (
+            FetchCache(settings.FETCH_CACHE_DIR, max_bytes=settings.FETCH_CACHE_MAX_MB * 1024 * 1024)
+            if settings.FETCH_CACHE_DIR else None
+        )
+        self.llm_cache = (
+            LLMCache(
+                settings.LLM_CACHE_PATH,
+                ttl_seconds=settings.LLM_CACHE_TTL_DAYS * 86400,
+                max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+            )
+            if settings.LLM_CACHE_PATH else None
+        )
+        self.evidence_store = (
+            EvidenceStore(settings.EVIDENCE_STORE_PATH, retention_days=settings.EVIDENCE_RETENTION_DAYS)
+            if settings.EVIDENCE_STORE_PATH else None
+        )
+        self.graph = ResearcherGraph(
+            fetcher=Fetcher(
+                client=self.web_client,
+                cache=self.fetch_cache,
+                cache_fresh_seconds=settings.FETCH_CACHE_FRESH_SECONDS,
+                max_bytes=settings.FETCH_MAX_BYTES,
+                max_chars=settings.FETCH_MAX_TEXT_CHARS,
+                upstreams=self.upstreams,
+                cpu=self.cpu,
+            ),
+            search=TavilySearchProvider(
+                client=self.api_client,
+                cache_ttl_seconds=settings.SEARCH_CACHE_TTL_SECONDS,
+                cache_max_entries=settings.SEARCH_CACHE_MAX_ENTRIES,
+                upstream=self.upstreams.provider("search"),
+            ),
+            limits=self.provider_limits,
+            llm_cache=self.llm_cache,
+            llm_upstream=self.upstreams.provider("llm"),
+            signal_upstream=self.upstreams.provider("signal_llm"),
+            cpu=self.cpu,
+        )
+        self.graph.batch_scorer = BatchScorer(
+            self.graph.get_llm,
+            self.provider_limits,
+            max_batch=settings.BATCH_SCORING_MAX_ACCOUNTS,
+            max_wait=settings.BATCH_SCORING_MAX_WAIT,
+            upstream=self.upstreams.provider("llm"),
+        )
+        self.checkpointer = checkpointer
+        self.app = self.graph.compile(checkpointer=checkpointer)
+        self.job_queue = JobQueue(
+            settings.JOB_QUEUE_PATH,
+            lease_seconds=settings.JOB_LEASE_SECONDS,
+            max_attempts=settings.JOB_MAX_ATTEMPTS,
+        )
+        self.dossier_cache = build_dossier_cache(settings.DOSSIER_CACHE_URL)
+        self.scheduler = BatchScheduler(
+            partial(self.run_mission, scoring_mode=settings.BATCH_SCORING_MODE),
+            max_missions=settings.BATCH_MAX_MISSIONS,
+            retention_seconds=settings.BATCH_RETENTION_SECONDS,
+            max_finished=settings.BATCH_MAX_FINISHED,
+        )
+
+    def start(self):
+        """Starts background upkeep (CRM mirror sync). Called by the API lifespan only."""
+        if self.crm_mirror is not None and self.hubspot.access_token:
+            self._crm_sync_task = asyncio.create_task(self._sync_crm_mirror())
+
+    async def _sync_crm_mirror(self):
+        while True:
+            try:
+                await self.crm_mirror.sync(self.hubspot, settings.CRM_MIRROR_FULL_SYNC_HOURS * 3600)
+            except Exception as e:
+                print(f"❌ CRM mirror sync failed: {e}")
+            await asyncio.sleep(settings.CRM_MIRROR_SYNC_SECONDS)
+
+    async def run_mission(
+        self, domain: str, config: ResearchConfig, scoring_mode: str = "single", thread_id: Optional[str] = None
+    ) -> dict:
+        """
+        Runs one mission on the shared graph and returns the final state.
+        Honours config.refresh_policy: dossiers younger than ttl_days are served from the cache,
+        re-collecting only the evidence categories behind force_refresh_signals.
+        With a checkpointer, thread_id identifies the mission and an interrupted run resumes
+        from its last completed node instead of starting over.
+        """
+        run_config = {"configurable": {"thread_id": thread_id}} if thread_id else None
+        with mission_trace() as trace:
+            if run_config and self.checkpointer is not None:
+                snapshot = await self.app.aget_state(run_config)
+                if snapshot.values:
+                    return await self._resume_mission(domain, config, snapshot, run_config, trace)
+
+            initial_state, entry, hit = await self._prepare_mission(domain, config, scoring_mode)
+            if hit:
+                record_mission("CACHE_HIT")
+                evidence = [Evidence.from_item(e) for e in entry.evidence_items]
+                return {"dossier": entry.dossier, "evidence_items": evidence, "status": "CACHE_HIT"}
+
+            final_state = self._release(await self.app.ainvoke(initial_state, run_config))
+            self._attach_metrics(final_state, trace)
+            await self._remember_mission(domain, config, final_state, entry)
+            return final_state
+
+    async def _resume_mission(
+        self, domain: str, config: ResearchConfig, snapshot, run_config: dict, trace: MissionTrace
+    ) -> dict:
+        if not snapshot.next:
+            return self._release(snapshot.values) # Finished (and counted) before the worker went away
+
+        print(f"⏯️ Resuming {domain} at {list(snapshot.next)}")
+        # The old deadline passed while the job was orphaned: give the remaining nodes a fresh one
+        await self.app.aupdate_state(run_config, {
+            "deadline_at": datetime.now() + timedelta(seconds=config.concurrency.deadline_seconds)
+        })
+        final_state = self._release(await self.app.ainvoke(None, run_config))
+        self._attach_metrics(final_state, trace) # Covers the resumed nodes only
+        # A resumed partial refresh lost its cache entry's age, so only full runs are cached
+        if snapshot.values.get("refresh_source_types") is None:
+            await self._remember_mission(domain, config, final_state, None)
+        return final_state
+
+    async def stream_mission(self, domain: str, config: ResearchConfig) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Same as run_mission, but yields (event, data) pairs while the graph runs:
+        "node" on every node transition, "evidence" for each EvidenceItem as it is fetched,
+        then "dossier" with the final AccountDossier (None if scoring failed).
+        """
+        with mission_trace() as trace:
+            initial_state, entry, hit = await self._prepare_mission(domain, config, "single")
+            if hit:
+                record_mission("CACHE_HIT")
+                yield "node", {"node": "cache", "status": "CACHE_HIT"}
+                for item in entry.evidence_items:
+                    yield "evidence", item.model_dump(mode="json")
+                yield "dossier", entry.dossier.model_dump(mode="json")
+                return
+
+            # Evidence reused from the cache is sent up front, fresh evidence as it arrives
+            for item in initial_state.evidence_items:
+                yield "evidence", item.to_json()
+
+            final_state: Dict[str, Any] = {}
+            async for mode, chunk in self.app.astream(initial_state, stream_mode=["updates", "custom", "values"]):
+                if mode == "custom":
+                    yield chunk["event"], chunk["evidence"]
+                elif mode == "updates":
+                    for node, update in chunk.items():
+                        yield "node", {"node": node, "status": (update or {}).get("status")}
+                else:
+                    final_state = chunk
+
+            final_state = self._release(final_state)
+            self._attach_metrics(final_state, trace)
+            await self._remember_mission(domain, config, final_state, entry)
+            dossier = final_state.get("dossier")
+            yield "dossier", dossier.model_dump(mode="json") if dossier else None
+
+    async def _prepare_mission(
+        self, domain: str, config: ResearchConfig, scoring_mode: str
+    ) -> Tuple[ResearcherState, Optional[DossierCacheEntry], bool]:
+        """
+        Builds the initial state, seeded from the dossier cache when possible.
+        Returns (initial_state, cache entry, hit); hit=True means the entry can be served as-is.
+        """
+        policy = config.refresh_policy
+        initial_state = ResearcherState(
+            domain=domain, config=config, status="STARTING", scoring_mode=scoring_mode
+        )
+        # CRM record + firmographics from the local mirror (no HubSpot search per mission)
+        company = await asyncio.to_thread(self.crm_mirror.lookup, domain) if self.crm_mirror is not None else None
+        if company is not None:
+            initial_state.record_id = company.record_id
+            initial_state.firmographics = company.firmographics()
+        # Previous run's evidence: re-scoring is skipped if it comes back unchanged
+        if self.evidence_store is not None:
+            initial_state.stored_evidence = [Evidence.from_item(e) for e in await self.evidence_store.latest(domain)]
+            stored = await self.evidence_store.last_score(
+                domain, scoring_key(config.config_id, SCORING_VERSION, settings.LLM_MODEL)
+            )
+            if stored is not None:
+                initial_state.stored_evidence_ids = stored.evidence_ids
+                initial_state.stored_diagnosis = stored.diagnosis
+        if self.dossier_cache is None or policy.ttl_days <= 0:
+            return initial_state, None, False
+
+        key = dossier_cache_key(domain, config.config_id, SCORING_VERSION, settings.LLM_MODEL)
+        entry = await self.dossier_cache.get(key)
+        if entry is None or entry.age_days() >= policy.ttl_days:
+            record_cache("dossier", "miss")
+            return initial_state, None, False
+
+        forced = source_types_for_signals(policy.force_refresh_signals)
+        record_cache("dossier", "partial" if forced else "hit")
+        if not forced:
+            print(f"💾 Dossier cache hit for {domain}")
+            return initial_state, entry, True
+
+        print(f"💾 Dossier cache hit for {domain}, refreshing {forced}")
+        initial_state.evidence_items = [
+            Evidence.from_item(e) for e in entry.evidence_items if e.source_type not in forced
+        ]
+        initial_state.refresh_source_types = forced
+        initial_state.cached_dossier = entry.dossier
+        initial_state.cached_fingerprint = evidence_fingerprint(entry.evidence_items, forced)
+        return initial_state, entry, False
+
+    def _release(self, final_state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Drops the bulk only the graph needed (previous run's evidence, cached dossier) before callers
+        keep the state. Evidence stays compact: EvidenceItems are only built where it is stored or sent.
+        """
+        final_state["stored_evidence"] = []
+        final_state["cached_dossier"] = None
+        return final_state
+
+    def _attach_metrics(self, final_state: Dict[str, Any], trace: MissionTrace):
+        """Stamps the run's timings/tokens onto the dossier's MetaInfo and counts the mission."""
+        record_mission(final_state.get("status"))
+        dossier = final_state.get("dossier")
+        if dossier is not None:
+            dossier.meta.metrics = trace.summary()
+
+    async def _remember_mission(
+        self, domain: str, config: ResearchConfig, final_state: Dict[str, Any], entry: Optional[DossierCacheEntry]
+    ):
+        if final_state.get("status") not in SCORED_STATUSES:
+            return
+        items = [e.to_item() for e in final_state["evidence_items"]]
+        if self.evidence_store is not None:
+            await self.evidence_store.record(
+                domain,
+                items,
+                scoring_key(config.config_id, SCORING_VERSION, settings.LLM_MODEL),
+                final_state["dossier"].gtm_diagnosis,
+            )
+        if self.dossier_cache is None or config.refresh_policy.ttl_days <= 0:
+            return
+        key = dossier_cache_key(domain, config.config_id, SCORING_VERSION, settings.LLM_MODEL)
+        await self.dossier_cache.put(key, DossierCacheEntry(
+            dossier=final_state["dossier"],
+            evidence_items=items,
+            # A partial refresh does not reset the age of the evidence it kept
+            created_at=entry.created_at if entry else datetime.now(),
+        ), config.refresh_policy.ttl_days * 86400)
+
+    async def close(self):
+        if self._crm_sync_task is not None:
+            self._crm_sync_task.cancel()
+            await asyncio.gather(self._crm_sync_task, return_exceptions=True)
+        await self.scheduler.close()
+        await self.graph.batch_scorer.close()
+        if self.dossier_cache is not None:
+            await self.dossier_cache.close()
+        for llm in (self.graph.llm, self.graph.signal_llm):
+            llm_close = getattr(llm, "aclose", None)
+            if llm_close:
+                await llm_close()
+        if self.fetch_cache is not None:
+            self.fetch_cache.close()
+        if self.llm_cache is not None:
+            print(f"💾 LLM cache: {self.llm_cache.stats()}")
+            self.llm_cache.close()
+        self.job_queue.close()
+        if self.evidence_store is not None:
+            self.evidence_store.close()
+        if self.crm_mirror is not None:
+            self.crm_mirror.close()
+        self.cpu.close()
+        await self.web_client.aclose()
+        await self.api_client.aclose()
+        print("🔌 Research runtime closed")
@@ -0,0 +1,95 @@
+"""
+Startup profile and prewarm.
+
+Provider SDKs are imported where they are first used (see app.agents.graph.chat_model), so importing
+the app stays cheap. prewarm() loads the selected ones before the process takes work: from the API
+lifespan (/health only reports healthy after it) and in workers before they claim jobs. The first
+mission on a new pod then costs what every other mission costs.
+
+STARTUP records how long each phase took: imports (entrypoint module and everything it pulls in),
+runtime (pools, caches, graph compile) and prewarm:<provider>. Import it first in an entrypoint.
+"""
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# Start of the import phase: the entrypoint imports this module before anything else
+STARTED_AT = time.perf_counter()
+
+class StartupProfile:
+    """Seconds per startup phase, and whether the process is ready (GET /health, /metrics)."""
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+        self.ready = False
+        self.error: Optional[str] = None
+
+    def record(self, phase: str, seconds: float):
+        from app.core.metrics import METRICS # Lazy: this module is imported before the app's dependencies
+
+        self.phases[phase] = round(seconds, 4)
+        METRICS.inc("research_startup_seconds", seconds, phase=phase)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def imported(self):
+        """Ends the import phase (bottom of the entrypoint module)."""
+        self.record("imports", time.perf_counter() - STARTED_AT)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "error": self.error,
+            "seconds": dict(self.phases),
+            "total_seconds": round(sum(self.phases.values()), 4),
+        }
+
+STARTUP = StartupProfile()
+
+# Providers the prewarm can load: name -> loader(runtime). Each builds the client the first mission would.
+PROVIDERS: Dict[str, Callable[[Any], Any]] = {
+    "llm": lambda runtime: runtime.graph.get_llm(),
+    "signal_llm": lambda runtime: runtime.graph.get_signal_llm(),
+    "cpu": lambda runtime: runtime.cpu.warm(), # Process pool workers (no-op when inline)
+}
+
+def selected_providers() -> List[str]:
+    """PREWARM_PROVIDERS, minus providers the current settings never call."""
+    from app.core.config import settings
+
+    names = [p.strip() for p in settings.PREWARM_PROVIDERS.split(",") if p.strip()]
+    if not settings.GOOGLE_API_KEY:
+        names = [p for p in names if p not in ("llm", "signal_llm")] # Keyless: mock scoring, no LLM calls
+    elif not settings.SIGNAL_EXTRACTION:
+        names = [p for p in names if p != "signal_llm"]
+    if settings.CPU_EXECUTOR != "process":
+        names = [p for p in names if p != "cpu"]
+    return names
+
+def prewarm(runtime, providers: Optional[List[str]] = None) -> bool:
+    """
+    Loads the providers (SDK import + client) and marks the process ready.
+    A provider that fails to load leaves it unready: /health reports why,
+    instead of the first mission failing on it.
+    """
+    for name in selected_providers() if providers is None else providers:
+        load = PROVIDERS.get(name)
+        if load is None:
+            print(f"⚠️ Unknown prewarm provider '{name}', skipped")
+            continue
+        try:
+            with STARTUP.phase(f"prewarm:{name}"):
+                load(runtime)
+        except Exception as e:
+            STARTUP.error = f"{name}: {e}"
+            print(f"❌ Prewarm failed for {name}: {e}")
+            return False
+    STARTUP.ready = True
+    print(f"🔥 Ready in {STARTUP.summary()['total_seconds']:.2f}s {STARTUP.phases}")
+    return True
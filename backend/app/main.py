@@ -1,9 +1,26 @@
+from app.core.startup import STARTUP, prewarm # First: starts the import clock
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 from app.core.config import settings
+from app.core.metrics import METRICS
+from app.core.runtime import ResearchRuntime
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One compiled graph + pooled clients for the whole process
+    with STARTUP.phase("runtime"):
+        app.state.runtime = ResearchRuntime()
+    # Provider SDKs + clients now, not on the first mission (/health stays 503 until this ran)
+    prewarm(app.state.runtime)
+    app.state.runtime.start()
+    yield
+    await app.state.runtime.close()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan
 )
 
 # --- CORS Configuration (Critical for UI) ---
@@ -22,9 +39,20 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "service": "backend"}
+    """Readiness: healthy once the runtime is built and the prewarm ran, with the startup timings."""
+    startup = STARTUP.summary()
+    if not STARTUP.ready:
+        status = "unhealthy" if STARTUP.error else "starting"
+        return JSONResponse({"status": status, "service": "backend", "startup": startup}, status_code=503)
+    return {"status": "healthy", "service": "backend", "startup": startup}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus scrape endpoint: span latencies, external calls, cache results, LLM tokens and cost."""
+    return PlainTextResponse(METRICS.render(), media_type="text/plain; version=0.0.4")
 
 from app.api.routes import router as research_router
 
 app.include_router(research_router, prefix=f"{settings.API_V1_STR}/research", tags=["research"])
 
+STARTUP.imported()
@@ -1,6 +1,7 @@
 from datetime import datetime
 from typing import List, Optional, Any, Dict
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, SkipValidation
+from app.models.evidence import Evidence
 
 # --- 2.2 Evidence Contract (Source of Truth) ---
 class EvidenceItem(BaseModel):
@@ -40,10 +41,21 @@ class GTMDiagnosis(BaseModel):
     confidence: float = 0.0
     evidence_ids: List[str] = []
 
+class MissionMetrics(BaseModel):
+    total_ms: float = 0.0
+    node_ms: Dict[str, float] = {} # collect|extract|prescore|signals|score
+    call_ms: Dict[str, float] = {} # Summed per external call type (search, fetch.direct, fetch.jina, llm...)
+    calls: Dict[str, int] = {}
+    cache: Dict[str, int] = {} # "<cache>.<result>" -> count
+    llm_input_tokens: int = 0
+    llm_output_tokens: int = 0
+    llm_cost_usd: float = 0.0
+
 class MetaInfo(BaseModel):
     config_id: str
     generated_at: datetime
     version: str = "dossier_v1"
+    metrics: Optional[MissionMetrics] = None # Instrumentation of the run that produced the dossier
 
 class AccountDossier(BaseModel):
     domain: str
@@ -60,21 +72,44 @@ class RefreshPolicy(BaseModel):
     ttl_days: int = 14
     force_refresh_signals: List[str] = ["FUNDING", "EXEC_HIRE"]
 
+class ConcurrencyPolicy(BaseModel):
+    max_concurrency: int = 8 # Parallel search/fetch calls per mission
+    per_host_limit: int = 2 # Politeness: parallel fetches against one host within this mission (HOST_CONCURRENCY caps all missions)
+    deadline_seconds: float = 30.0 # Return partial evidence after this
+
 class ResearchConfig(BaseModel):
     config_id: str
     proposition: str
     persona: str
     icp_ruleset_id: str
     refresh_policy: RefreshPolicy = Field(default_factory=RefreshPolicy)
+    concurrency: ConcurrencyPolicy = Field(default_factory=ConcurrencyPolicy)
     crm_update_mode: str = "suggest"
 
 # --- Run State for LangGraph ---
+# Validated once on entry; the graph's own bulky fields (evidence, signals) skip re-validation
+# at every node transition (see app.models.evidence)
 class ResearcherState(BaseModel):
     domain: str
     record_id: Optional[str] = None
+    firmographics: Optional[Firmographics] = None # From the CRM mirror, when the account is known
     config: ResearchConfig
     
     # Accumulators
-    evidence_items: List[EvidenceItem] = []
+    evidence_items: SkipValidation[List[Evidence]] = []
+    signals: SkipValidation[List[Signal]] = [] # Rule engine (app.agents.rules), then merged with extracted signals
+    signals_extracted: bool = False # Scoring reads the signal list instead of raw evidence
     dossier: Optional[AccountDossier] = None
     status: str = "IDLE" 
+    deadline_at: Optional[datetime] = None # Set on entry from config.concurrency
+    scoring_mode: str = "single" # single|batched (micro-batched with other accounts)
+
+    # Dossier cache (partial refresh of a cached dossier)
+    refresh_source_types: Optional[List[str]] = None # None = collect every category
+    cached_dossier: Optional[AccountDossier] = None
+    cached_fingerprint: Optional[str] = None
+
+    # Evidence store (incremental re-research, see app.services.evidence_store)
+    stored_evidence: SkipValidation[List[Evidence]] = [] # Last stored copy of each page: fallback for failed fetches
+    stored_evidence_ids: Optional[List[str]] = None # Material evidence behind stored_diagnosis
+    stored_diagnosis: Optional[GTMDiagnosis] = None
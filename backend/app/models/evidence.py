@@ -0,0 +1,109 @@
+import hashlib
+import sys
+import threading
+import weakref
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+if TYPE_CHECKING:
+    from app.models.contracts import EvidenceItem # contracts imports this module for ResearcherState
+
+class Text(str):
+    """Excerpt text shared through the ContentStore (a str that can be weakly referenced)."""
+    __slots__ = ("__weakref__",)
+
+class ContentStore:
+    """
+    Process-wide excerpt store: one copy per distinct text, keyed by content hash.
+    Entries are weak, so a text lives exactly as long as some evidence references it.
+    The same page seen by several missions (or carried over from a previous run) is held once.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._texts: "weakref.WeakValueDictionary[bytes, Text]" = weakref.WeakValueDictionary()
+
+    def put(self, text: str) -> Text:
+        if isinstance(text, Text):
+            return text
+        key = hashlib.blake2b(text.encode(), digest_size=12).digest()
+        with self._lock:
+            shared = self._texts.get(key)
+            if shared is None:
+                shared = self._texts[key] = Text(text)
+        return shared
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            texts = list(self._texts.values())
+        return {"texts": len(texts), "chars": sum(len(t) for t in texts)}
+
+CONTENT = ContentStore()
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if type(value) is str else value
+
+@dataclass(slots=True)
+class Evidence:
+    """
+    Internal evidence record carried through the graph state (EvidenceItem is the API shape).
+    Slotted, repeated strings interned, excerpt shared via CONTENT; no validation, items are built
+    by the graph itself. Convert with from_item / to_item at the boundary.
+    """
+    evidence_id: str
+    domain: str
+    source_type: str
+    url: str
+    retrieved_at: datetime
+    extract_method: str = "requests"
+    content: Optional[str] = None
+    reliability: str = "MED"
+
+    def __post_init__(self):
+        # Same few values on every item (urls and ids are unique per page, interning them only grows the table)
+        self.domain = _intern(self.domain)
+        self.source_type = _intern(self.source_type)
+        self.extract_method = _intern(self.extract_method)
+        self.reliability = _intern(self.reliability)
+        if self.content is not None:
+            self.content = CONTENT.put(self.content) # Checkpoint restores come back as plain str
+
+    @property
+    def excerpt(self) -> Optional[str]:
+        return self.content
+
+    @excerpt.setter
+    def excerpt(self, text: Optional[str]):
+        self.content = CONTENT.put(text) if text is not None else None
+
+    @classmethod
+    def from_item(cls, item: "EvidenceItem") -> "Evidence":
+        return cls(
+            evidence_id=item.evidence_id,
+            domain=item.domain,
+            source_type=item.source_type,
+            url=item.url,
+            retrieved_at=item.retrieved_at,
+            extract_method=item.extract_method,
+            content=item.excerpt,
+            reliability=item.reliability,
+        )
+
+    def to_item(self) -> "EvidenceItem":
+        from app.models.contracts import EvidenceItem
+
+        # Built by the graph from validated inputs: construct without re-validating (or copying the excerpt)
+        return EvidenceItem.model_construct(
+            evidence_id=self.evidence_id,
+            domain=self.domain,
+            source_type=self.source_type,
+            url=self.url,
+            retrieved_at=self.retrieved_at,
+            extract_method=self.extract_method,
+            excerpt=self.content,
+            reliability=self.reliability,
+        )
+
+    def to_json(self) -> Dict[str, Any]:
+        return self.to_item().model_dump(mode="json")
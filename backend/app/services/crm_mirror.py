@@ -0,0 +1,165 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+from app.models.contracts import Firmographics
+from app.services.hubspot_service import HubSpotService, MIRROR_PROPERTIES, parse_timestamp_ms
+
+# HubSpot's search index lags writes by a few seconds: re-read a small window on each sync
+SYNC_OVERLAP_MS = 60 * 1000
+
+def normalize_domain(value: str) -> str:
+    """'https://www.Acme.com/about' -> 'acme.com' (CRM domains are entered by hand)."""
+    value = value.strip().lower()
+    if "://" in value:
+        value = value.split("://", 1)[1]
+    value = value.split("/", 1)[0].split(":", 1)[0]
+    return value[4:] if value.startswith("www.") else value
+
+@dataclass
+class CRMCompany:
+    record_id: str
+    domain: str
+    name: Optional[str] = None
+    city: Optional[str] = None
+    country: Optional[str] = None
+    industry: Optional[str] = None
+    employees: Optional[str] = None
+
+    def firmographics(self) -> Firmographics:
+        location = ", ".join(p for p in (self.city, self.country) if p) or None
+        return Firmographics(
+            company_name=self.name,
+            hq_location=location,
+            employee_range=self.employees,
+            industry=self.industry,
+        )
+
+class CRMMirror:
+    """
+    Local SQLite copy of HubSpot companies (domain -> record id + firmographics).
+    Loaded in full once, then kept current by incremental syncs on hs_lastmodifieddate,
+    so missions resolve their CRM record with an indexed lookup instead of a search call.
+    Full syncs also drop companies deleted in HubSpot (incremental search cannot see those).
+    """
+
+    def __init__(self, path: str):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=30.0)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(
+            "CREATE TABLE IF NOT EXISTS companies ("
+            " record_id TEXT PRIMARY KEY, domain TEXT NOT NULL, name TEXT, city TEXT, country TEXT,"
+            " industry TEXT, employees TEXT, modified_ms INTEGER NOT NULL, sync_id INTEGER NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS idx_companies_domain ON companies (domain);"
+            "CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value INTEGER NOT NULL);"
+        )
+        self.conn.commit()
+
+    # --- Reads (indexed; from async code via asyncio.to_thread: syncs hold the lock while writing a page) ---
+    def lookup(self, domain: str) -> Optional[CRMCompany]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT record_id, domain, name, city, country, industry, employees FROM companies"
+                " WHERE domain = ? ORDER BY CAST(record_id AS INTEGER) LIMIT 1", # Duplicates: oldest record wins
+                (normalize_domain(domain),)
+            ).fetchone()
+        return CRMCompany(*row) if row else None
+
+    def _state(self, key: str) -> Optional[int]:
+        with self._lock:
+            row = self.conn.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count = self.conn.execute("SELECT COUNT(*) FROM companies").fetchone()[0]
+        return {
+            "companies": count,
+            "cursor_ms": self._state("cursor_ms"),
+            "last_full_sync": self._state("last_full_sync"),
+        }
+
+    # --- Writes ---
+    def _upsert(self, records: List[Dict[str, Any]], sync_id: int) -> int:
+        """Stores a page of HubSpot records; returns the newest hs_lastmodifieddate seen (ms)."""
+        rows, newest = [], 0
+        for record in records:
+            props = record.get("properties", {})
+            domain = normalize_domain(props.get("domain") or "")
+            modified = props.get("hs_lastmodifieddate") or record.get("updatedAt")
+            modified_ms = parse_timestamp_ms(modified) if modified else 0
+            newest = max(newest, modified_ms)
+            if not domain:
+                continue # Nothing to match missions against
+            rows.append((
+                str(record["id"]), domain, props.get("name"), props.get("city"), props.get("country"),
+                props.get("industry"), props.get("numberofemployees"), modified_ms, sync_id,
+            ))
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO companies"
+                " (record_id, domain, name, city, country, industry, employees, modified_ms, sync_id)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self.conn.commit()
+        return newest
+
+    def _remove_unseen(self, sync_id: int) -> int:
+        with self._lock:
+            removed = self.conn.execute("DELETE FROM companies WHERE sync_id != ?", (sync_id,)).rowcount
+            self.conn.commit()
+        return removed
+
+    def _set_state(self, **values: int):
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)", list(values.items())
+            )
+            self.conn.commit()
+
+    async def full_sync(self, hubspot: HubSpotService) -> int:
+        """Reloads every company; rows not seen in this pass (deleted in HubSpot) are removed."""
+        started_ms = int(time.time() * 1000)
+        sync_id = started_ms
+        total = 0
+        async for page in hubspot.iter_companies(MIRROR_PROPERTIES):
+            await asyncio.to_thread(self._upsert, page, sync_id)
+            total += len(page)
+        removed = await asyncio.to_thread(self._remove_unseen, sync_id)
+        await asyncio.to_thread(self._set_state, cursor_ms=started_ms, last_full_sync=started_ms)
+        print(f"🗂️ CRM mirror full sync: {total} companies ({removed} removed)")
+        return total
+
+    async def incremental_sync(self, hubspot: HubSpotService) -> int:
+        """Applies companies modified since the last sync."""
+        cursor = await asyncio.to_thread(self._state, "cursor_ms")
+        if cursor is None:
+            return await self.full_sync(hubspot)
+
+        sync_id = int(time.time() * 1000)
+        total, newest = 0, cursor
+        async for page in hubspot.iter_companies_modified_since(cursor - SYNC_OVERLAP_MS, MIRROR_PROPERTIES):
+            newest = max(newest, await asyncio.to_thread(self._upsert, page, sync_id))
+            total += len(page)
+        await asyncio.to_thread(self._set_state, cursor_ms=newest)
+        if total:
+            print(f"🗂️ CRM mirror incremental sync: {total} companies updated")
+        return total
+
+    async def sync(self, hubspot: HubSpotService, full_every_seconds: float) -> int:
+        """Incremental sync, or a full one when the mirror is empty or the last full sync is too old."""
+        last_full = await asyncio.to_thread(self._state, "last_full_sync")
+        if last_full is None or time.time() - last_full / 1000 > full_every_seconds:
+            return await self.full_sync(hubspot)
+        return await self.incremental_sync(hubspot)
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
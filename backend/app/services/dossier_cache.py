@@ -0,0 +1,115 @@
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Iterable, List, Optional, Protocol
+from pydantic import BaseModel
+from app.models.contracts import AccountDossier, EvidenceItem
+
+# --- Cache Entry ---
+class DossierCacheEntry(BaseModel):
+    dossier: AccountDossier
+    evidence_items: List[EvidenceItem] = []
+    created_at: datetime # When the oldest evidence in the entry was collected
+
+    def age_days(self) -> float:
+        return (datetime.now() - self.created_at).total_seconds() / 86400
+
+def dossier_cache_key(domain: str, config_id: str, prompt_version: str, model: str) -> str:
+    return f"dossier:{domain}:{config_id}:{prompt_version}:{model}"
+
+def evidence_fingerprint(items: Iterable[EvidenceItem], source_types: Iterable[str]) -> str:
+    """Hash of the excerpts for the given source types; equal hashes = nothing changed."""
+    wanted = set(source_types)
+    h = hashlib.sha256()
+    for url, excerpt in sorted((e.url, e.excerpt or "") for e in items if e.source_type in wanted):
+        h.update(url.encode())
+        h.update(b"\0")
+        h.update(excerpt.encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+# --- Interface ---
+class DossierCache(Protocol):
+    async def get(self, key: str) -> Optional[DossierCacheEntry]:
+        ...
+
+    async def put(self, key: str, entry: DossierCacheEntry, ttl_seconds: int) -> None:
+        ...
+
+    async def close(self) -> None:
+        ...
+
+# --- Implementation: SQLite (Local) ---
+class SQLiteDossierCache:
+    def __init__(self, path: str):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS dossiers ("
+            " key TEXT PRIMARY KEY, payload TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self.conn.commit()
+
+    def _get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT payload FROM dossiers WHERE key = ? AND expires_at > ?",
+                (key, datetime.now().timestamp())
+            ).fetchone()
+        return row[0] if row else None
+
+    def _put(self, key: str, payload: str, expires_at: float):
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO dossiers (key, payload, expires_at) VALUES (?, ?, ?)",
+                (key, payload, expires_at)
+            )
+            self.conn.commit()
+
+    async def get(self, key: str) -> Optional[DossierCacheEntry]:
+        payload = await asyncio.to_thread(self._get, key)
+        return DossierCacheEntry.model_validate_json(payload) if payload else None
+
+    async def put(self, key: str, entry: DossierCacheEntry, ttl_seconds: int) -> None:
+        expires_at = entry.created_at.timestamp() + ttl_seconds
+        await asyncio.to_thread(self._put, key, entry.model_dump_json(), expires_at)
+
+    async def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+
+# --- Implementation: Redis (Production) ---
+class RedisDossierCache:
+    def __init__(self, url: str):
+        import redis.asyncio as redis # Optional dependency, only needed for this backend
+        self.client = redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[DossierCacheEntry]:
+        payload = await self.client.get(key)
+        return DossierCacheEntry.model_validate_json(payload) if payload else None
+
+    async def put(self, key: str, entry: DossierCacheEntry, ttl_seconds: int) -> None:
+        remaining = int(entry.created_at.timestamp() + ttl_seconds - datetime.now().timestamp())
+        if remaining > 0:
+            await self.client.set(key, entry.model_dump_json(), ex=remaining)
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+def build_dossier_cache(url: Optional[str]) -> Optional[DossierCache]:
+    """
+    sqlite:///path/to.db -> SQLiteDossierCache, redis://... -> RedisDossierCache, empty -> disabled.
+    """
+    if not url:
+        return None
+    if url.startswith("sqlite:///"):
+        return SQLiteDossierCache(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://")):
+        return RedisDossierCache(url)
+    raise ValueError(f"Unsupported DOSSIER_CACHE_URL: {url}")
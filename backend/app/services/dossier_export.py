@@ -0,0 +1,250 @@
+"""
+Columnar dossier exports for analysts (Parquet or Arrow IPC), and queries over them.
+
+Dossiers are flattened to one row each: firmographics, positioning and diagnosis as plain columns,
+signals as a list of structs plus a signal_types list, and every evidence id the dossier cites.
+Rows are written one row group (EXPORT_ROW_GROUP_ROWS) at a time, so an export of any size holds
+at most one row group in memory. Queries scan the file batch by batch: fit_tier / confidence
+filters are pushed down (Parquet skips row groups on their statistics) and only the best `limit`
+rows are kept between batches.
+
+pyarrow is an optional dependency, imported on first use: without it exports raise ImportError.
+"""
+import os
+import re
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Union
+from app.models.contracts import AccountDossier
+
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"} # format -> file extension
+_EXPORT_ID = re.compile(r"^export_[0-9a-f]{12}$")
+
+def dossier_schema():
+    import pyarrow as pa # Optional dependency, only needed for exports
+
+    text = pa.string()
+    signal = pa.struct([
+        ("signal_type", text), ("label", text), ("value", text),
+        ("confidence", pa.float64()), ("evidence_ids", pa.list_(text)),
+    ])
+    return pa.schema([
+        ("domain", text), ("record_id", text),
+        ("company_name", text), ("hq_location", text), ("employee_range", text), ("industry", text),
+        ("one_liner", text), ("category", text), ("ideal_customer", text),
+        ("fit_tier", text), ("diagnosis_label", text), ("confidence", pa.float64()),
+        ("reasoning_bullets", pa.list_(text)), ("diagnosis_evidence_ids", pa.list_(text)),
+        ("signal_types", pa.list_(text)), ("signals", pa.list_(signal)),
+        ("evidence_ids", pa.list_(text)), # Every id cited by the diagnosis or a signal
+        ("config_id", text), ("generated_at", pa.timestamp("us")), ("version", text),
+        ("total_ms", pa.float64()), ("llm_cost_usd", pa.float64()),
+    ])
+
+def flatten_dossier(dossier: Union[AccountDossier, Dict[str, Any]]) -> Dict[str, Any]:
+    """One export row from a dossier (model, or its JSON dump as stored by batches and the job queue)."""
+    d = dossier.model_dump() if isinstance(dossier, AccountDossier) else dossier
+    firmo = d.get("firmographics") or {}
+    pos = d.get("positioning") or {}
+    diag = d.get("gtm_diagnosis") or {}
+    meta = d.get("meta") or {}
+    metrics = meta.get("metrics") or {}
+    signals = d.get("signals") or []
+    generated_at = meta.get("generated_at")
+    if isinstance(generated_at, str):
+        generated_at = datetime.fromisoformat(generated_at)
+
+    cited = dict.fromkeys(diag.get("evidence_ids") or [])
+    for s in signals:
+        cited.update(dict.fromkeys(s.get("evidence_ids") or []))
+    return {
+        "domain": d["domain"],
+        "record_id": d.get("record_id"),
+        "company_name": firmo.get("company_name"),
+        "hq_location": firmo.get("hq_location"),
+        "employee_range": firmo.get("employee_range"),
+        "industry": firmo.get("industry"),
+        "one_liner": pos.get("one_liner"),
+        "category": pos.get("category"),
+        "ideal_customer": pos.get("ideal_customer"),
+        "fit_tier": diag.get("fit_tier"),
+        "diagnosis_label": diag.get("diagnosis_label"),
+        "confidence": diag.get("confidence"),
+        "reasoning_bullets": diag.get("reasoning_bullets") or [],
+        "diagnosis_evidence_ids": diag.get("evidence_ids") or [],
+        "signal_types": sorted({s["signal_type"] for s in signals}),
+        "signals": [
+            {
+                "signal_type": s["signal_type"],
+                "label": s.get("label"),
+                "value": s.get("value"),
+                "confidence": s.get("confidence"),
+                "evidence_ids": s.get("evidence_ids") or [],
+            }
+            for s in signals
+        ],
+        "evidence_ids": list(cited),
+        "config_id": meta.get("config_id"),
+        "generated_at": generated_at,
+        "version": meta.get("version"),
+        "total_ms": metrics.get("total_ms"),
+        "llm_cost_usd": metrics.get("llm_cost_usd"),
+    }
+
+class DossierExportWriter:
+    """
+    Appends flattened dossiers to a Parquet / Arrow IPC file, one row group per row_group_rows.
+    Writes to a temp file that replaces `path` on close, so readers never see a partial export.
+    """
+
+    def __init__(self, path: str, fmt: str = "parquet", row_group_rows: int = 5000):
+        import pyarrow as pa # Optional dependency, only needed for exports
+
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown export format '{fmt}' ({'|'.join(FORMATS)})")
+        self.pa = pa
+        self.path = path
+        self.fmt = fmt
+        self.row_group_rows = max(1, row_group_rows)
+        self.schema = dossier_schema()
+        self.rows = 0
+        self.row_groups = 0
+        self._pending: List[Dict[str, Any]] = []
+        self._tmp_path = f"{path}.tmp"
+        if fmt == "parquet":
+            import pyarrow.parquet as pq
+
+            self._writer = pq.ParquetWriter(self._tmp_path, self.schema, compression="zstd")
+        else:
+            self._writer = pa.ipc.new_file(self._tmp_path, self.schema)
+
+    def write(self, dossier: Union[AccountDossier, Dict[str, Any]]):
+        self._pending.append(flatten_dossier(dossier))
+        if len(self._pending) >= self.row_group_rows:
+            self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        table = self.pa.Table.from_pylist(self._pending, schema=self.schema)
+        if self.fmt == "parquet":
+            self._writer.write_table(table, row_group_size=len(self._pending))
+        else:
+            self._writer.write_table(table)
+        self.rows += len(self._pending)
+        self.row_groups += 1
+        self._pending = []
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        self._writer.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+def export_path(directory: str, export_id: str, fmt: str) -> str:
+    return os.path.join(directory, export_id + FORMATS[fmt])
+
+def find_export(directory: str, export_id: str) -> Optional[str]:
+    """Path of an existing export, or None (unknown or malformed id)."""
+    if not _EXPORT_ID.match(export_id):
+        return None
+    for fmt in FORMATS:
+        path = export_path(directory, export_id, fmt)
+        if os.path.exists(path):
+            return path
+    return None
+
+def export_dossiers(
+    dossiers: Iterable[Union[AccountDossier, Dict[str, Any]]],
+    directory: str,
+    fmt: str = "parquet",
+    row_group_rows: int = 5000,
+) -> Dict[str, Any]:
+    """Writes the dossiers (consumed lazily) to a new export file; blocking, run it in a thread."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}' ({'|'.join(FORMATS)})")
+    os.makedirs(directory, exist_ok=True)
+    export_id = f"export_{uuid.uuid4().hex[:12]}"
+    path = export_path(directory, export_id, fmt)
+    started = time.perf_counter()
+    writer = DossierExportWriter(path, fmt, row_group_rows)
+    try:
+        for dossier in dossiers:
+            writer.write(dossier)
+    except BaseException:
+        writer.abort()
+        raise
+    writer.close()
+    return {
+        "export_id": export_id,
+        "format": fmt,
+        "rows": writer.rows,
+        "row_groups": writer.row_groups,
+        "bytes": os.path.getsize(path),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+def query_export(
+    path: str,
+    fit_tiers: Optional[List[str]] = None,
+    min_confidence: Optional[float] = None,
+    signal_types: Optional[List[str]] = None,
+    sort_by: Optional[str] = "confidence",
+    descending: bool = True,
+    limit: int = 100,
+    columns: Optional[List[str]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Rows of an export matching every filter (signal_types: any of them), best `limit` by sort_by.
+    Memory is bounded by one scan batch plus `limit` rows, whatever the file size.
+    """
+    import pyarrow as pa # Optional dependency, only needed for exports
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(path, format="parquet" if path.endswith(FORMATS["parquet"]) else "ipc")
+    names = dataset.schema.names
+    columns = columns or names
+    unknown = [c for c in columns + ([sort_by] if sort_by else []) if c not in names]
+    if unknown:
+        raise ValueError(f"Unknown export columns: {', '.join(unknown)}")
+    if sort_by:
+        kind = dataset.schema.field(sort_by).type
+        if pa.types.is_nested(kind): # Lists / structs have no order (select_k crashes on them)
+            raise ValueError(f"Cannot sort on {sort_by}: not a scalar column")
+
+    condition = None
+    if fit_tiers:
+        condition = ds.field("fit_tier").isin(fit_tiers)
+    if min_confidence is not None:
+        at_least = ds.field("confidence") >= min_confidence
+        condition = at_least if condition is None else condition & at_least
+    # signal_types and the sort key are read even when not returned
+    scanned = list(dict.fromkeys(columns + ([sort_by] if sort_by else []) + (["signal_types"] if signal_types else [])))
+    wanted = pa.array(signal_types or [], type=pa.string())
+    order = "descending" if descending else "ascending"
+
+    best = None
+    for batch in dataset.to_batches(columns=scanned, filter=condition):
+        if signal_types and batch.num_rows:
+            listed = batch.column("signal_types")
+            parents = pc.list_parent_indices(listed)
+            batch = batch.take(pc.unique(pc.filter(parents, pc.is_in(pc.list_flatten(listed), value_set=wanted))))
+        if not batch.num_rows:
+            continue
+        table = pa.Table.from_batches([batch])
+        best = table if best is None else pa.concat_tables([best, table])
+        if sort_by:
+            best = best.take(pc.select_k_unstable(best, k=limit, sort_keys=[(sort_by, order)]))
+        elif best.num_rows >= limit:
+            best = best.slice(0, limit)
+            break # File order: the first `limit` matches will do
+    if best is None:
+        return []
+    if sort_by:
+        best = best.sort_by([(sort_by, order)])
+    return best.select(columns).to_pylist()
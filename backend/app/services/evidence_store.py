@@ -0,0 +1,132 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Union
+from app.models.contracts import EvidenceItem, GTMDiagnosis
+from app.models.evidence import Evidence
+
+def evidence_id(url: str, excerpt: Optional[str] = None) -> str:
+    """
+    Stable, content-derived id: ev_<hash of url + normalized excerpt>.
+    Before the page is fetched (excerpt None) the id only covers the url.
+    Whitespace and case are normalized so re-rendered but identical pages keep their id.
+    """
+    h = hashlib.sha256(url.encode())
+    if excerpt is not None:
+        h.update(b"\0")
+        h.update(" ".join(excerpt.lower().split()).encode())
+    return f"ev_{h.hexdigest()[:16]}"
+
+def is_material(item: Union[Evidence, EvidenceItem]) -> bool:
+    """Evidence the scorer can use: fetched successfully (failed fetches are flagged LOW)."""
+    return bool(item.excerpt) and item.reliability != "LOW"
+
+def material_ids(items: Iterable[Union[Evidence, EvidenceItem]]) -> List[str]:
+    return sorted({e.evidence_id for e in items if is_material(e)})
+
+def scoring_key(config_id: str, prompt_version: str, model: str) -> str:
+    """A diagnosis only carries over for the same config, prompt and model."""
+    return f"{config_id}:{prompt_version}:{model}"
+
+@dataclass
+class StoredScore:
+    evidence_ids: List[str] # Material evidence the diagnosis was computed from
+    diagnosis: GTMDiagnosis
+    scored_at: float
+
+class EvidenceStore:
+    """
+    Evidence per domain across runs (SQLite), plus the last diagnosis per scoring key and the
+    evidence set it was computed from. A re-run diffs its fetches against it: failed fetches fall
+    back to the stored copy of the page, and an unchanged evidence set reuses the stored diagnosis
+    instead of calling the LLM. Evidence not seen for retention_days is dropped.
+    """
+
+    def __init__(self, path: str, retention_days: float = 90):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.retention_seconds = retention_days * 86400
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=30.0)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(
+            "CREATE TABLE IF NOT EXISTS evidence ("
+            " domain TEXT NOT NULL, evidence_id TEXT NOT NULL, url TEXT NOT NULL, payload TEXT NOT NULL,"
+            " first_seen REAL NOT NULL, last_seen REAL NOT NULL, PRIMARY KEY (domain, evidence_id));"
+            "CREATE TABLE IF NOT EXISTS scores ("
+            " domain TEXT NOT NULL, scoring_key TEXT NOT NULL, evidence_ids TEXT NOT NULL,"
+            " diagnosis TEXT NOT NULL, scored_at REAL NOT NULL, PRIMARY KEY (domain, scoring_key));"
+        )
+        self.conn.commit()
+
+    def _latest(self, domain: str) -> List[EvidenceItem]:
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT url, payload FROM evidence WHERE domain = ? ORDER BY last_seen", (domain,)
+            ).fetchall()
+        # Most recently seen version of each page
+        latest: Dict[str, str] = {url: payload for url, payload in rows}
+        return [EvidenceItem.model_validate_json(p) for p in latest.values()]
+
+    def _score(self, domain: str, key: str) -> Optional[StoredScore]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT evidence_ids, diagnosis, scored_at FROM scores WHERE domain = ? AND scoring_key = ?",
+                (domain, key)
+            ).fetchone()
+        if row is None:
+            return None
+        return StoredScore(json.loads(row[0]), GTMDiagnosis.model_validate_json(row[1]), row[2])
+
+    def _record(self, domain: str, items: List[EvidenceItem], key: Optional[str], diagnosis: Optional[GTMDiagnosis]):
+        now = time.time()
+        rows = [
+            (domain, e.evidence_id, e.url, e.model_dump_json(), now, now)
+            for e in items if is_material(e)
+        ]
+        with self._lock:
+            self.conn.executemany(
+                "INSERT INTO evidence (domain, evidence_id, url, payload, first_seen, last_seen)"
+                " VALUES (?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (domain, evidence_id) DO UPDATE SET last_seen = excluded.last_seen",
+                rows
+            )
+            self.conn.execute(
+                "DELETE FROM evidence WHERE domain = ? AND last_seen < ?", (domain, now - self.retention_seconds)
+            )
+            if key is not None and diagnosis is not None:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO scores (domain, scoring_key, evidence_ids, diagnosis, scored_at)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (domain, key, json.dumps(material_ids(items)), diagnosis.model_dump_json(), now)
+                )
+            self.conn.commit()
+
+    async def latest(self, domain: str) -> List[EvidenceItem]:
+        """The last stored version of every page collected for the domain."""
+        return await asyncio.to_thread(self._latest, domain)
+
+    async def last_score(self, domain: str, key: str) -> Optional[StoredScore]:
+        return await asyncio.to_thread(self._score, domain, key)
+
+    async def record(
+        self, domain: str, items: List[EvidenceItem], key: Optional[str] = None, diagnosis: Optional[GTMDiagnosis] = None
+    ):
+        """Stores a run's material evidence; with a diagnosis, also the evidence set it was scored on."""
+        await asyncio.to_thread(self._record, domain, items, key, diagnosis)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            evidence = self.conn.execute("SELECT COUNT(*) FROM evidence").fetchone()[0]
+            domains = self.conn.execute("SELECT COUNT(DISTINCT domain) FROM evidence").fetchone()[0]
+            scores = self.conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+        return {"evidence": evidence, "domains": domains, "scores": scores}
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,156 @@
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import NamedTuple, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+TRACKING_PARAMS = ("utm_", "gclid", "fbclid", "mc_cid", "mc_eid")
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical cache key for a URL: lowercase scheme/host, no default port, no fragment,
+    tracking params dropped and the rest sorted.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower() or "https"
+    host = (parts.hostname or "").lower()
+    if parts.port and not ((scheme == "http" and parts.port == 80) or (scheme == "https" and parts.port == 443)):
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith(TRACKING_PARAMS)
+    ))
+    return urlunsplit((scheme, host, parts.path or "/", query, ""))
+
+class CachedResponse(NamedTuple):
+    content: str
+    final_url: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+
+class FetchCache:
+    """
+    On-disk HTTP response cache for the Fetcher.
+    SQLite index keyed by normalized URL + zlib-compressed bodies stored once per content hash,
+    bounded by total compressed size with LRU eviction.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 512 * 1024 * 1024):
+        self.blob_dir = os.path.join(directory, "blobs")
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(os.path.join(directory, "index.db"), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " url TEXT PRIMARY KEY, content_hash TEXT NOT NULL, final_url TEXT NOT NULL,"
+            " etag TEXT, last_modified TEXT, stored_at REAL NOT NULL, last_access REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS idx_responses_access ON responses (last_access);"
+            "CREATE INDEX IF NOT EXISTS idx_responses_hash ON responses (content_hash);"
+            "CREATE TABLE IF NOT EXISTS blobs (content_hash TEXT PRIMARY KEY, size INTEGER NOT NULL);"
+        )
+        self.conn.commit()
+        self._total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def _blob_path(self, content_hash: str) -> str:
+        return os.path.join(self.blob_dir, content_hash[:2], f"{content_hash}.z")
+
+    # --- Sync internals (run in a worker thread) ---
+    def _lookup(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT content_hash, final_url, etag, last_modified, stored_at FROM responses WHERE url = ?",
+                (key,)
+            ).fetchone()
+            if not row:
+                return None
+            content_hash, final_url, etag, last_modified, stored_at = row
+            try:
+                with open(self._blob_path(content_hash), "rb") as f:
+                    content = zlib.decompress(f.read()).decode("utf-8")
+            except (OSError, zlib.error):
+                # Blob lost or corrupt: forget it and every entry pointing at it, so the caller's
+                # refetch stores it again (a leftover blobs row would make _store skip the write)
+                self.conn.execute("DELETE FROM responses WHERE content_hash = ?", (content_hash,))
+                self._release([content_hash])
+                self.conn.commit()
+                return None
+            self.conn.execute("UPDATE responses SET last_access = ? WHERE url = ?", (time.time(), key))
+            self.conn.commit()
+        return CachedResponse(content, final_url, etag, last_modified, stored_at)
+
+    def _store(self, key: str, content: str, final_url: str, etag: Optional[str], last_modified: Optional[str]):
+        body = content.encode("utf-8")
+        content_hash = hashlib.sha256(body).hexdigest()
+        now = time.time()
+        with self._lock:
+            previous = self.conn.execute("SELECT content_hash FROM responses WHERE url = ?", (key,)).fetchone()
+            # Identical bodies (same page under several URLs, unchanged re-fetch) are stored once
+            if not self.conn.execute("SELECT 1 FROM blobs WHERE content_hash = ?", (content_hash,)).fetchone():
+                compressed = zlib.compress(body, 6)
+                path = self._blob_path(content_hash)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "wb") as f:
+                    f.write(compressed)
+                self.conn.execute("INSERT INTO blobs (content_hash, size) VALUES (?, ?)", (content_hash, len(compressed)))
+                self._total += len(compressed)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (url, content_hash, final_url, etag, last_modified, stored_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, content_hash, final_url, etag, last_modified, now, now)
+            )
+            if previous and previous[0] != content_hash:
+                self._release([previous[0]])
+            self._evict()
+            self.conn.commit()
+
+    def _touch(self, key: str):
+        now = time.time()
+        with self._lock:
+            self.conn.execute("UPDATE responses SET stored_at = ?, last_access = ? WHERE url = ?", (now, now, key))
+            self.conn.commit()
+
+    def _release(self, hashes):
+        """Deletes blobs that no URL references any more."""
+        for content_hash in set(hashes):
+            if self.conn.execute("SELECT 1 FROM responses WHERE content_hash = ? LIMIT 1", (content_hash,)).fetchone():
+                continue
+            row = self.conn.execute("SELECT size FROM blobs WHERE content_hash = ?", (content_hash,)).fetchone()
+            self._total -= row[0] if row else 0
+            try:
+                os.remove(self._blob_path(content_hash))
+            except OSError:
+                pass
+            self.conn.execute("DELETE FROM blobs WHERE content_hash = ?", (content_hash,))
+
+    def _evict(self):
+        # Drop least recently used URLs in chunks until their blobs free enough space
+        while self._total > self.max_bytes:
+            victims = self.conn.execute(
+                "SELECT url, content_hash FROM responses ORDER BY last_access LIMIT 50"
+            ).fetchall()
+            if not victims:
+                break
+            self.conn.executemany("DELETE FROM responses WHERE url = ?", [(url,) for url, _ in victims])
+            self._release([content_hash for _, content_hash in victims])
+
+    # --- Async API ---
+    async def lookup(self, url: str) -> Optional[CachedResponse]:
+        return await asyncio.to_thread(self._lookup, normalize_url(url))
+
+    async def store(self, url: str, content: str, final_url: str, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        await asyncio.to_thread(self._store, normalize_url(url), content, final_url, etag, last_modified)
+
+    async def touch(self, url: str):
+        """Marks an entry as revalidated (304) without rewriting its body."""
+        await asyncio.to_thread(self._touch, normalize_url(url))
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
@@ -1,11 +1,114 @@
+import codecs
 import httpx
 import random
-from typing import Optional, Dict
+import time
+from html.parser import HTMLParser
+from typing import Optional, Dict, Tuple
+from urllib.parse import urlparse
+from app.core.executor import CPUExecutor
+from app.core.metrics import record_cache, span
+from app.core.rate_limit import CircuitOpenError, UpstreamRegistry
+from app.services.fetch_cache import FetchCache, CachedResponse
+
+class TextExtractor(HTMLParser):
+    """
+    Incremental HTML -> readable text.
+    Fed chunk by chunk while the page downloads; drops scripts, styles and navigation
+    boilerplate and reports `full` once max_chars of text have been collected.
+    """
+
+    SKIP_TAGS = {"script", "style", "noscript", "svg", "template", "iframe", "head", "nav", "header", "footer", "aside", "form"}
+    BLOCK_TAGS = {
+        "p", "div", "br", "li", "ul", "ol", "table", "tr", "td", "th", "section", "article",
+        "main", "blockquote", "pre", "h1", "h2", "h3", "h4", "h5", "h6",
+    }
+
+    def __init__(self, max_chars: int):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self._skip_depth = 0
+        self._parts = [] # Finished blocks, whitespace collapsed
+        self._block = [] # Raw text of the current block: inline tags and chunk boundaries add no spaces
+        self._size = 0
+
+    @property
+    def full(self) -> bool:
+        return self._size >= self.max_chars
+
+    def _end_block(self):
+        text = " ".join("".join(self._block).split())
+        if text:
+            self._parts.append(text)
+        self._block = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in self.BLOCK_TAGS:
+            self._end_block()
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in self.BLOCK_TAGS:
+            self._end_block()
+
+    def handle_data(self, data):
+        if self._skip_depth or self.full:
+            return
+        self._block.append(data)
+        self._size += len(data.strip()) # Estimate for the early cut-off; text() trims exactly
+
+    def text(self) -> str:
+        self._end_block()
+        return "\n".join(self._parts)[:self.max_chars]
+
+class PageReader:
+    """Page bytes -> readable text, chunk by chunk: HTML through TextExtractor, anything else as-is."""
+
+    def __init__(self, encoding: str, is_html: bool, max_chars: int):
+        try:
+            self.decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        except LookupError:
+            self.decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self.max_chars = max_chars
+        self.extractor = TextExtractor(max_chars) if is_html else None
+        self.plain = []
+        self.plain_size = 0
+
+    def feed(self, chunk) -> bool:
+        """Returns True once max_chars of text are collected (the rest of the page is not needed)."""
+        text = self.decoder.decode(chunk)
+        if self.extractor:
+            self.extractor.feed(text)
+            return self.extractor.full
+        self.plain.append(text)
+        self.plain_size += len(text)
+        return self.plain_size >= self.max_chars
+
+    def text(self) -> str:
+        if self.extractor:
+            self.extractor.close()
+            return self.extractor.text()
+        return "".join(self.plain)[:self.max_chars]
+
+def page_text(body, encoding: str, is_html: bool, max_chars: int, chunk_bytes: int = 64 * 1024) -> str:
+    """
+    Readable text of a downloaded body (bytes or a memoryview of it), same result as streaming it
+    through a PageReader. Runs in a CPUExecutor worker when the process pool is on.
+    """
+    reader = PageReader(encoding, is_html, max_chars)
+    for start in range(0, len(body), chunk_bytes):
+        if reader.feed(body[start:start + chunk_bytes]):
+            break
+    return reader.text()
 
 class Fetcher:
     """
     Robust HTTP Client for the Researcher Agent.
-    Features: User-Agent rotation, Timeout handling, Jina Reader fallback.
+    Features: User-Agent rotation, Timeout handling, Jina Reader fallback,
+    on-disk response cache with conditional revalidation (ETag / Last-Modified),
+    per-host and Jina rate limits with circuit breakers (dead hosts fail fast).
     """
     
     USER_AGENTS = [
@@ -14,23 +117,61 @@ class Fetcher:
         "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
     ]
 
-    def __init__(self):
-        self.client = httpx.AsyncClient(timeout=10.0, follow_redirects=True)
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        cache: Optional[FetchCache] = None,
+        cache_fresh_seconds: float = 3600.0,
+        max_bytes: int = 2 * 1024 * 1024,
+        max_chars: int = 5000,
+        upstreams: Optional[UpstreamRegistry] = None,
+        cpu: Optional[CPUExecutor] = None,
+    ):
+        # Pass a shared (pooled) client to reuse connections across missions
+        self._owns_client = client is None
+        self.client = client or httpx.AsyncClient(timeout=10.0, follow_redirects=True)
+        # Entries younger than cache_fresh_seconds are served without any request,
+        # older ones are revalidated with a conditional GET
+        self.cache = cache
+        self.cache_fresh_seconds = cache_fresh_seconds
+        # Pages are read incrementally: stop at max_bytes downloaded or max_chars of text
+        self.max_bytes = max_bytes
+        self.max_chars = max_chars
+        # Per-host guards for direct fetches, the "jina" provider guard for the proxy
+        self.upstreams = upstreams or UpstreamRegistry({"jina": {"rate": 1.0, "burst": 2}})
+        # HTML parsing runs here (inline, as pages stream in) or in its process pool
+        self.cpu = cpu or CPUExecutor()
 
     async def fetch(self, url: str) -> Dict[str, str]:
         """
         Attempts to fetch a URL. Returns dict with 'content', 'status', 'method'.
+        'content' is the readable text of the page, capped at max_chars.
         """
         headers = {"User-Agent": random.choice(self.USER_AGENTS)}
+        cached = await self._cached(url)
+        if cached and self._is_fresh(cached):
+            return self._from_cache(cached, "cache")
+        if cached:
+            headers.update(self._validators(cached))
+        elif self.cache:
+            record_cache("fetch", "miss")
         
         try:
             # 1. Direct Request
             print(f"🌐 Fetching {url}...")
-            resp = await self.client.get(url, headers=headers)
+            with span("fetch.direct", provider="web"):
+                resp, content = await self.upstreams.host(urlparse(url).netloc).call(
+                    lambda: self._get_text(url, headers), response_of=lambda r: r[0]
+                )
+
+            if resp.status_code == 304 and cached:
+                await self.cache.touch(url)
+                return self._from_cache(cached, "cache_revalidated")
             
             if resp.status_code == 200:
+                await self._remember(url, content, str(resp.url), resp)
                 return {
-                    "content": resp.text,
+                    "content": content,
                     "status": "success", 
                     "method": "direct",
                     "url": str(resp.url)
@@ -40,31 +181,114 @@ class Fetcher:
             # Used when sites block bots or possess complex JS
             if resp.status_code in [403, 401, 503]:
                 print(f"⚠️ Direct access blocked ({resp.status_code}). Trying Jina Reader Proxy...")
-                return await self._fetch_via_jina(url)
+                return await self._fetch_via_jina(url, stale=cached)
                 
             return {"content": "", "status": "error", "error_code": resp.status_code}
             
+        except CircuitOpenError as e:
+            # Host keeps failing: skip it, the proxy has its own limit and breaker
+            print(f"🔌 {e}. Trying Jina Reader Proxy...")
+            return await self._fetch_via_jina(url, stale=cached)
         except Exception as e:
             print(f"❌ Error fetching {url}: {e}. Trying Fallback...")
-            return await self._fetch_via_jina(url)
+            return await self._fetch_via_jina(url, stale=cached)
 
-    async def _fetch_via_jina(self, url: str) -> Dict[str, str]:
+    async def _fetch_via_jina(self, url: str, stale: Optional[CachedResponse] = None) -> Dict[str, str]:
         """
         Uses https://r.jina.ai/ to get a clean Markdown representation of the page.
+        Falls back to a stale cached copy of the page when the proxy fails too.
         """
         jina_url = f"https://r.jina.ai/{url}"
+        cached = await self._cached(jina_url)
+        if cached and self._is_fresh(cached):
+            return self._from_cache(cached, "cache")
+        headers = self._validators(cached) if cached else {}
+
         try:
-            resp = await self.client.get(jina_url)
+            with span("fetch.jina", provider="jina"):
+                resp, content = await self.upstreams.provider("jina").call(
+                    lambda: self._get_text(jina_url, headers), response_of=lambda r: r[0]
+                )
+            if resp.status_code == 304 and cached:
+                await self.cache.touch(jina_url)
+                return self._from_cache(cached, "cache_revalidated")
             if resp.status_code == 200:
+                 await self._remember(jina_url, content, url, resp)
                  return {
-                    "content": resp.text,
+                    "content": content,
                     "status": "success",
                     "method": "jina_proxy",
                     "url": url
                 }
-            return {"content": "", "status": "error", "error_code": resp.status_code}
+            error = {"content": "", "status": "error", "error_code": resp.status_code}
         except Exception as e:
-            return {"content": "", "status": "error", "error_msg": str(e)}
+            error = {"content": "", "status": "error", "error_msg": str(e)}
+
+        stale = stale or cached
+        if stale:
+            print(f"♻️ Serving stale cached copy of {url}")
+            return self._from_cache(stale, "cache_stale")
+        return error
+
+    async def _get_text(self, url: str, headers: Dict[str, str]) -> Tuple[httpx.Response, str]:
+        """
+        Streams a GET and extracts text as bytes arrive, without holding the page in memory.
+        Stops early (closing the stream) at max_bytes or once max_chars of text are collected.
+        With the process pool on, HTML is downloaded (up to max_bytes) and parsed in a worker,
+        so parsing never holds up the event loop.
+        """
+        async with self.client.stream("GET", url, headers=headers) as resp:
+            if resp.status_code != 200:
+                return resp, ""
+
+            encoding = resp.charset_encoding or "utf-8"
+            # HTML is parsed; anything else (Jina markdown, plain text) is kept as-is
+            is_html = "html" in resp.headers.get("content-type", "text/html")
+            offload = is_html and self.cpu.pooled
+            reader = PageReader(encoding, is_html, self.max_chars)
+            body = bytearray()
+            received = 0
+
+            async for chunk in resp.aiter_bytes():
+                received += len(chunk)
+                if offload:
+                    body += chunk
+                elif reader.feed(chunk):
+                    break
+                if received >= self.max_bytes:
+                    break
+
+        if offload:
+            return resp, await self.cpu.run_on_bytes(page_text, body, encoding, is_html, self.max_chars)
+        return resp, reader.text()
+
+    # --- Response cache helpers ---
+    async def _cached(self, url: str) -> Optional[CachedResponse]:
+        return await self.cache.lookup(url) if self.cache else None
+
+    def _is_fresh(self, cached: CachedResponse) -> bool:
+        return time.time() - cached.stored_at < self.cache_fresh_seconds
+
+    def _validators(self, cached: CachedResponse) -> Dict[str, str]:
+        headers = {}
+        if cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+        return headers
+
+    def _from_cache(self, cached: CachedResponse, method: str) -> Dict[str, str]:
+        record_cache("fetch", {"cache": "hit", "cache_revalidated": "revalidated", "cache_stale": "stale"}[method])
+        return {"content": cached.content, "status": "success", "method": method, "url": cached.final_url}
+
+    async def _remember(self, url: str, content: str, final_url: str, resp: httpx.Response):
+        if self.cache and content:
+            await self.cache.store(
+                url, content, final_url,
+                etag=resp.headers.get("etag"),
+                last_modified=resp.headers.get("last-modified"),
+            )
 
     async def close(self):
-        await self.client.aclose()
+        if self._owns_client:
+            await self.client.aclose()
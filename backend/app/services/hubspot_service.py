@@ -1,45 +1,233 @@
 import os
 import httpx
-from typing import Optional, Dict, Any
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+from app.core.metrics import span
+from app.core.rate_limit import RateLimiter, Upstream
+
+BATCH_SIZE = 100 # HubSpot max inputs per batch call, max values per IN filter and max page size
+COMPANY_PROPERTIES = ["name", "domain", "city", "description", "industry"]
+# Properties kept in the local CRM mirror (app.services.crm_mirror)
+MIRROR_PROPERTIES = ["name", "domain", "city", "country", "industry", "numberofemployees", "hs_lastmodifieddate"]
+SEARCH_RESULT_CAP = 10000 # HubSpot search stops paging after 10k results per query
+
+def dossier_properties(dossier: Dict[str, Any]) -> Dict[str, str]:
+    """CRM write-back of a dossier (JSON form) onto GTM360 custom company properties."""
+    diagnosis = dossier.get("gtm_diagnosis") or {}
+    return {
+        "gtm360_fit_tier": diagnosis.get("fit_tier") or "",
+        "gtm360_diagnosis": diagnosis.get("diagnosis_label") or "",
+        "gtm360_confidence": str(diagnosis.get("confidence", "")),
+    }
+
+def parse_timestamp_ms(value: str) -> int:
+    """HubSpot datetime properties come back as ISO 8601 strings or epoch milliseconds."""
+    if value.isdigit():
+        return int(value)
+    return int(datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp() * 1000)
+
+def _chunks(items: List[Any], size: int) -> Iterable[List[Any]]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
 
 class HubSpotService:
-    def __init__(self):
+    """
+    HubSpot CRM client.
+    Uses a pooled client and a shared upstream guard (adaptive token bucket at HubSpot's ~10 requests/second
+    per app, search endpoints less, circuit breaker) that retries 429/5xx with backoff, honouring Retry-After.
+    Prefer the bulk methods (get_companies_by_domains, batch_update_companies) when syncing many
+    accounts: one call covers up to 100 companies.
+    """
+
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        upstream: Optional[Upstream] = None,
+        search_limiter: Optional[RateLimiter] = None,
+    ):
         self.access_token = os.getenv("HUBSPOT_ACCESS_TOKEN")
         self.base_url = "https://api.hubapi.com/crm/v3/objects"
         self.headers = {
             "Authorization": f"Bearer {self.access_token}",
             "Content-Type": "application/json"
         }
+        # Pass a shared (pooled) client to reuse connections across missions
+        self._owns_client = client is None
+        self.client = client or httpx.AsyncClient(timeout=10.0)
+        self.upstream = upstream or Upstream("hubspot", rate=10, burst=10, max_retries=5)
+        self.search_limiter = search_limiter or RateLimiter(rate=4, burst=4)
+
+    async def _request(self, method: str, url: str, search: bool = False, **kwargs) -> httpx.Response:
+        """Rate-limited request; 429 and 5xx are retried by the upstream guard (see app.core.rate_limit)."""
+        async def send() -> httpx.Response:
+            if search:
+                await self.search_limiter.acquire()
+            return await self.client.request(method, url, headers=self.headers, **kwargs)
+        with span("hubspot", provider="hubspot"):
+            return await self.upstream.call(send)
 
     async def get_company_by_domain(self, domain: str) -> Optional[Dict[str, Any]]:
         if not self.access_token:
             return None # Mock mode or error
-            
-        # Search endpoint
-        url = "https://api.hubapi.com/crm/v3/objects/companies/search"
-        payload = {
-            "filterGroups": [{
-                "filters": [{
-                    "propertyName": "domain",
-                    "operator": "EQ",
-                    "value": domain
-                }]
-            }],
-            "properties": ["name", "domain", "city", "description", "industry"]
-        }
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, headers=self.headers, json=payload)
-            if response.status_code == 200:
-                results = response.json().get('results')
-                return results[0] if results else None
-            return None
+        return (await self.get_companies_by_domains([domain])).get(domain.strip().lower())
+
+    async def get_companies_by_domains(self, domains: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Looks up many companies with one search per 100 domains (IN filter, paginated).
+        Returns {domain: company record}; domains without a company are absent.
+        """
+        if not self.access_token:
+            return {} # Mock mode
+
+        wanted = list(dict.fromkeys(d.strip().lower() for d in domains if d.strip()))
+        url = f"{self.base_url}/companies/search"
+        found: Dict[str, Dict[str, Any]] = {}
+        for chunk in _chunks(wanted, BATCH_SIZE):
+            after = None
+            while True:
+                payload = {
+                    "filterGroups": [{
+                        "filters": [{
+                            "propertyName": "domain",
+                            "operator": "IN",
+                            "values": chunk
+                        }]
+                    }],
+                    "properties": COMPANY_PROPERTIES,
+                    "limit": BATCH_SIZE,
+                }
+                if after:
+                    payload["after"] = after
+                response = await self._request("POST", url, search=True, json=payload)
+                if response.status_code != 200:
+                    print(f"❌ HubSpot search failed ({response.status_code}): {response.text[:200]}")
+                    break
+                data = response.json()
+                for record in data.get("results", []):
+                    domain = (record.get("properties", {}).get("domain") or "").strip().lower()
+                    # Duplicates in the CRM: keep the first record returned per domain
+                    found.setdefault(domain, record)
+                after = data.get("paging", {}).get("next", {}).get("after")
+                if not after:
+                    break
+        return found
+
+    async def iter_companies(self, properties: List[str]) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Pages through every company (list endpoint, not search: no 10k cap, higher rate limit)."""
+        if not self.access_token:
+            return
+
+        url = f"{self.base_url}/companies"
+        after = None
+        while True:
+            params = {"limit": BATCH_SIZE, "properties": ",".join(properties), "archived": "false"}
+            if after:
+                params["after"] = after
+            response = await self._request("GET", url, params=params)
+            response.raise_for_status()
+            data = response.json()
+            yield data.get("results", [])
+            after = data.get("paging", {}).get("next", {}).get("after")
+            if not after:
+                return
+
+    async def iter_companies_modified_since(
+        self, since_ms: int, properties: List[str]
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Pages through companies with hs_lastmodifieddate >= since_ms, oldest change first.
+        Search caps a query at 10k results, so past that the query restarts from the last timestamp seen.
+        """
+        if not self.access_token:
+            return
+
+        url = f"{self.base_url}/companies/search"
+        after, seen = None, 0
+        while True:
+            payload = {
+                "filterGroups": [{
+                    "filters": [{
+                        "propertyName": "hs_lastmodifieddate",
+                        "operator": "GTE",
+                        "value": str(since_ms)
+                    }]
+                }],
+                "sorts": [{"propertyName": "hs_lastmodifieddate", "direction": "ASCENDING"}],
+                "properties": properties,
+                "limit": BATCH_SIZE,
+            }
+            if after:
+                payload["after"] = after
+            response = await self._request("POST", url, search=True, json=payload)
+            response.raise_for_status()
+            data = response.json()
+            results = data.get("results", [])
+            yield results
+            seen += len(results)
+            after = data.get("paging", {}).get("next", {}).get("after")
+            if not after:
+                return
+            if seen + BATCH_SIZE > SEARCH_RESULT_CAP:
+                # Restart the window (records at the boundary timestamp are simply seen twice)
+                last = results[-1].get("properties", {}).get("hs_lastmodifieddate") if results else None
+                next_since = parse_timestamp_ms(last) if last else since_ms
+                if next_since <= since_ms:
+                    print(f"[WARN] Over {SEARCH_RESULT_CAP} companies modified at {since_ms}, run a full sync")
+                    return
+                since_ms, after, seen = next_since, None, 0
 
     async def update_company(self, company_id: str, properties: Dict[str, str]):
         if not self.access_token:
             print(f"[MOCK] Would update Company {company_id} with {properties}")
             return
-            
+
         url = f"{self.base_url}/companies/{company_id}"
-        async with httpx.AsyncClient() as client:
-            await client.patch(url, headers=self.headers, json={"properties": properties})
+        await self._request("PATCH", url, json={"properties": properties})
+
+    async def batch_update_companies(self, updates: Dict[str, Dict[str, str]]) -> Dict[str, Any]:
+        """
+        Writes {company_id: properties} through the batch update endpoint, 100 companies per call.
+        Returns {"updated": n, "errors": [...]}; a failed chunk does not stop the others.
+        """
+        if not self.access_token:
+            print(f"[MOCK] Would batch update {len(updates)} companies")
+            return {"updated": 0, "errors": []}
+
+        url = f"{self.base_url}/companies/batch/update"
+        items = list(updates.items())
+        updated, errors = 0, []
+        for chunk in _chunks(items, BATCH_SIZE):
+            payload = {"inputs": [{"id": company_id, "properties": props} for company_id, props in chunk]}
+            response = await self._request("POST", url, json=payload)
+            if response.status_code in (200, 207):
+                data = response.json()
+                updated += len(data.get("results", []))
+                # 207 Multi-Status: some inputs were rejected
+                errors.extend(data.get("errors", []))
+            else:
+                print(f"❌ HubSpot batch update failed ({response.status_code}): {response.text[:200]}")
+                errors.append({
+                    "status": response.status_code,
+                    "message": response.text[:500],
+                    "ids": [company_id for company_id, _ in chunk],
+                })
+        return {"updated": updated, "errors": errors}
+
+    async def sync_companies(self, updates_by_domain: Dict[str, Dict[str, str]]) -> Dict[str, Any]:
+        """
+        Bulk sync keyed by domain: resolves company ids in bulk, then batch updates them.
+        Domains with no company in HubSpot are reported as unmatched (not created).
+        """
+        updates_by_domain = {d.strip().lower(): props for d, props in updates_by_domain.items()}
+        companies = await self.get_companies_by_domains(list(updates_by_domain))
+        updates = {
+            record["id"]: updates_by_domain[domain]
+            for domain, record in companies.items() if domain in updates_by_domain
+        }
+        result = await self.batch_update_companies(updates)
+        result["unmatched"] = [d for d in updates_by_domain if d not in companies]
+        return result
+
+    async def close(self):
+        if self._owns_client:
+            await self.client.aclose()
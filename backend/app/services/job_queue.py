@@ -0,0 +1,160 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from app.models.contracts import ResearchConfig
+
+class JobQueue:
+    """
+    Durable research job queue on SQLite, shared by the API (enqueue/status) and workers (claim/complete).
+    Claims are leases: a job whose worker died becomes claimable again once its lease expires,
+    and resumes from its last graph checkpoint (thread_id = job_id).
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 300.0, max_attempts: int = 3):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        # Several processes (API + workers) share the file: wait on locks instead of failing
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=30.0)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " job_id TEXT PRIMARY KEY, domain TEXT NOT NULL, config TEXT NOT NULL,"
+            " status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0,"
+            " worker_id TEXT, lease_until REAL, result TEXT, error TEXT,"
+            " created_at REAL NOT NULL, updated_at REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs (status, lease_until, created_at);"
+        )
+        self.conn.commit()
+
+    # --- Sync internals (run in a worker thread) ---
+    def _enqueue(self, domain: str, config: ResearchConfig) -> str:
+        job_id = f"job_{uuid.uuid4().hex[:16]}"
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                "INSERT INTO jobs (job_id, domain, config, status, created_at, updated_at) VALUES (?, ?, ?, 'QUEUED', ?, ?)",
+                (job_id, domain, config.model_dump_json(), now, now)
+            )
+            self.conn.commit()
+        return job_id
+
+    def _claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            # Lease expired on the last attempt (the worker crashed or was OOM-killed each time): give up
+            self.conn.execute(
+                "UPDATE jobs SET status = 'FAILED', lease_until = NULL, updated_at = ?,"
+                " error = COALESCE(error, 'Lease expired on every attempt (worker died)')"
+                " WHERE status = 'RUNNING' AND lease_until < ? AND attempts >= ?",
+                (now, now, self.max_attempts)
+            )
+            # Single UPDATE ... RETURNING: atomic across processes
+            row = self.conn.execute(
+                "UPDATE jobs SET status = 'RUNNING', worker_id = ?, lease_until = ?, attempts = attempts + 1, updated_at = ?"
+                " WHERE job_id = ("
+                "  SELECT job_id FROM jobs"
+                "  WHERE (status = 'QUEUED' OR (status = 'RUNNING' AND lease_until < ?)) AND attempts < ?"
+                "  ORDER BY created_at LIMIT 1"
+                " ) RETURNING job_id, domain, config, attempts",
+                (worker_id, now + self.lease_seconds, now, now, self.max_attempts)
+            ).fetchone()
+            self.conn.commit()
+        if not row:
+            return None
+        job_id, domain, config, attempts = row
+        return {"job_id": job_id, "domain": domain, "config": ResearchConfig.model_validate_json(config), "attempts": attempts}
+
+    def _extend(self, job_id: str, worker_id: str):
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                "UPDATE jobs SET lease_until = ?, updated_at = ? WHERE job_id = ? AND worker_id = ? AND status = 'RUNNING'",
+                (now + self.lease_seconds, now, job_id, worker_id)
+            )
+            self.conn.commit()
+
+    def _finish(self, job_id: str, worker_id: str, status: str, result: Optional[str], error: Optional[str]) -> bool:
+        with self._lock:
+            # Only the lease holder: a stale worker must not overwrite a job another worker re-claimed
+            updated = self.conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, lease_until = NULL, updated_at = ?"
+                " WHERE job_id = ? AND worker_id = ? AND status = 'RUNNING'",
+                (status, result, error, time.time(), job_id, worker_id)
+            ).rowcount
+            self.conn.commit()
+        return updated > 0
+
+    def _get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT job_id, domain, status, attempts, result, error, created_at, updated_at FROM jobs WHERE job_id = ?",
+                (job_id,)
+            ).fetchone()
+        if not row:
+            return None
+        job_id, domain, status, attempts, result, error, created_at, updated_at = row
+        return {
+            "job_id": job_id,
+            "domain": domain,
+            "status": status,
+            "attempts": attempts,
+            "dossier": json.loads(result) if result else None,
+            "error": error,
+            "created_at": created_at,
+            "updated_at": updated_at,
+        }
+
+    def _completed_page(self, after: int, limit: int) -> List[Tuple[int, str]]:
+        with self._lock:
+            return self.conn.execute(
+                "SELECT rowid, result FROM jobs WHERE status = 'COMPLETE' AND result IS NOT NULL AND rowid > ?"
+                " ORDER BY rowid LIMIT ?",
+                (after, limit)
+            ).fetchall()
+
+    def completed_dossiers(self, page_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Dossiers of every completed job, read page by page (blocking: iterate it in a thread)."""
+        after = 0
+        while True:
+            rows = self._completed_page(after, page_size)
+            for _, result in rows:
+                yield json.loads(result)
+            if len(rows) < page_size:
+                return
+            after = rows[-1][0]
+
+    # --- Async API ---
+    async def enqueue(self, domain: str, config: ResearchConfig) -> str:
+        return await asyncio.to_thread(self._enqueue, domain, config)
+
+    async def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """Leases the oldest runnable job (queued, or running with an expired lease)."""
+        return await asyncio.to_thread(self._claim, worker_id)
+
+    async def extend(self, job_id: str, worker_id: str):
+        """Heartbeat: keeps the lease alive while the mission runs."""
+        await asyncio.to_thread(self._extend, job_id, worker_id)
+
+    async def complete(self, job_id: str, worker_id: str, dossier_json: Optional[str]) -> bool:
+        """False when worker_id no longer holds the lease (the result is dropped)."""
+        return await asyncio.to_thread(self._finish, job_id, worker_id, "COMPLETE", dossier_json, None)
+
+    async def fail(self, job_id: str, worker_id: str, error: str, attempts: int, retry: bool = True) -> bool:
+        """Requeues the job (it resumes from its checkpoint) until max_attempts is reached."""
+        status = "QUEUED" if retry and attempts < self.max_attempts else "FAILED"
+        return await asyncio.to_thread(self._finish, job_id, worker_id, status, None, error)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._get, job_id)
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,100 @@
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+def prompt_fingerprint(model: str, prompt_version: str, prompt: str) -> str:
+    h = hashlib.sha256()
+    for part in (model, prompt_version, prompt):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+class LLMCache:
+    """
+    Persistent cache of LLM completions keyed by prompt fingerprint (model + prompt version + rendered prompt).
+    Scoring runs at temperature 0, so identical prompts can reuse the stored answer.
+    Entries expire after ttl_seconds; beyond max_entries the least recently used are evicted.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = 30 * 86400, max_entries: int = 100000):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(
+            "CREATE TABLE IF NOT EXISTS completions ("
+            " key TEXT PRIMARY KEY, model TEXT NOT NULL, content TEXT NOT NULL,"
+            " created_at REAL NOT NULL, last_access REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS idx_completions_access ON completions (last_access);"
+        )
+        self.conn.commit()
+        self._entries = self.conn.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute("SELECT content, created_at FROM completions WHERE key = ?", (key,)).fetchone()
+            if row and now - row[1] > self.ttl_seconds:
+                self.conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+                self.conn.commit()
+                self._entries -= 1
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.conn.execute("UPDATE completions SET last_access = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+            self.hits += 1
+        return row[0]
+
+    def _put(self, key: str, model: str, content: str):
+        now = time.time()
+        with self._lock:
+            existed = self.conn.execute("SELECT 1 FROM completions WHERE key = ?", (key,)).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO completions (key, model, content, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, model, content, now, now)
+            )
+            if not existed:
+                self._entries += 1
+            if self._entries > self.max_entries:
+                # Evict in chunks (10%) so we don't pay a DELETE on every insert
+                excess = self._entries - self.max_entries + max(1, self.max_entries // 10)
+                cur = self.conn.execute(
+                    "DELETE FROM completions WHERE key IN"
+                    " (SELECT key FROM completions ORDER BY last_access LIMIT ?)",
+                    (excess,)
+                )
+                self._entries -= cur.rowcount
+                self.evictions += cur.rowcount
+            self.conn.commit()
+
+    async def get(self, key: str) -> Optional[str]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def put(self, key: str, model: str, content: str):
+        await asyncio.to_thread(self._put, key, model, content)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": self._entries,
+            "evictions": self.evictions,
+        }
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
@@ -1,4 +1,4 @@
-from typing import List, Protocol
+from typing import List, Optional, Protocol
 from pydantic import BaseModel
 
 # --- Inteface ---
@@ -9,40 +9,107 @@ class SearchResult(BaseModel):
     score: float
 
 class SearchProvider(Protocol):
-    async def search(self, query: str, max_results: int = 5) -> List[SearchResult]:
+    async def search(self, query: str, max_results: int = 5, search_depth: str = "basic") -> List[SearchResult]:
         ...
 
 # --- Implementation: Tavily (Free Tier) ---
+import asyncio
 import os
+import time
+from collections import OrderedDict
+from typing import Dict, Tuple
 import httpx
+from app.core.metrics import record_cache, span
+from app.core.rate_limit import Upstream
+
+SearchKey = Tuple[str, int, str] # (query, max_results, search_depth)
 
 class TavilySearchProvider:
-    def __init__(self):
+    """
+    Tavily client with a TTL-bounded result cache and in-flight coalescing:
+    concurrent missions issuing the same query share one upstream call (and one credit).
+    """
+
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        cache_ttl_seconds: float = 86400.0,
+        cache_max_entries: int = 10000,
+        upstream: Optional[Upstream] = None,
+    ):
         self.api_key = os.getenv("TAVILY_API_KEY")
         self.base_url = "https://api.tavily.com/search"
+        # Pass a shared (pooled) client to reuse connections across missions
+        self._owns_client = client is None
+        self.client = client or httpx.AsyncClient(timeout=10.0)
+        # Rate limit + breaker + retries on 429/5xx (shared via app.core.runtime)
+        self.upstream = upstream or Upstream("search", rate=10, burst=10)
+
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.cache_max_entries = cache_max_entries
+        self._cache: "OrderedDict[SearchKey, Tuple[float, List[SearchResult]]]" = OrderedDict()
+        self._inflight: Dict[SearchKey, asyncio.Future] = {}
 
-    async def search(self, query: str, max_results: int = 5) -> List[SearchResult]:
+    async def search(self, query: str, max_results: int = 5, search_depth: str = "basic") -> List[SearchResult]:
         if not self.api_key:
             print("[WARN] No TAVILY_API_KEY found. Returning mock data.")
             return [SearchResult(url="https://example.com", title="Mock Result", content="Mock Content", score=1.0)]
 
+        key = (query, max_results, search_depth)
+
+        # 1. Cache (TTL, LRU-bounded)
+        hit = self._cache.get(key)
+        if hit and hit[0] > time.monotonic():
+            self._cache.move_to_end(key)
+            record_cache("search", "hit")
+            return list(hit[1])
+
+        # 2. Coalesce with an identical query already in flight
+        task = self._inflight.get(key)
+        record_cache("search", "coalesced" if task is not None else "miss")
+        if task is None:
+            task = asyncio.ensure_future(self._search_and_cache(key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish_inflight(key, t))
+
+        # Shielded: a caller hitting its deadline must not cancel the call for the others
+        return list(await asyncio.shield(task))
+
+    def _finish_inflight(self, key: SearchKey, task: asyncio.Future):
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            task.exception() # Mark retrieved even if every waiter gave up
+
+    async def _search_and_cache(self, key: SearchKey) -> List[SearchResult]:
+        results = await self._search_upstream(*key)
+        self._cache[key] = (time.monotonic() + self.cache_ttl_seconds, results)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_max_entries:
+            self._cache.popitem(last=False)
+        return results
+
+    async def _search_upstream(self, query: str, max_results: int, search_depth: str) -> List[SearchResult]:
         payload = {
             "api_key": self.api_key,
             "query": query,
-            "search_depth": "basic",
+            "search_depth": search_depth,
             "max_results": max_results
         }
         
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(self.base_url, json=payload)
+        with span("search", provider="tavily"):
+            resp = await self.upstream.call(lambda: self.client.post(self.base_url, json=payload))
             resp.raise_for_status()
-            data = resp.json()
-            
-            return [
-                SearchResult(
-                    url=r.get("url"),
-                    title=r.get("title"),
-                    content=r.get("content"),
-                    score=r.get("score")
-                ) for r in data.get("results", [])
-            ]
+        data = resp.json()
+        
+        return [
+            SearchResult(
+                url=r.get("url"),
+                title=r.get("title"),
+                content=r.get("content"),
+                score=r.get("score")
+            ) for r in data.get("results", [])
+        ]
+
+    async def close(self):
+        if self._owns_client:
+            await self.client.aclose()
@@ -0,0 +1,111 @@
+"""
+Research worker: processes missions from the durable job queue, separately from the API pods.
+
+    python -m app.worker
+
+Each mission is checkpointed after every graph node (collect, extract, prescore, signals, score) under
+thread_id = job_id. If a worker dies mid-mission its lease expires, another worker claims
+the job and resumes from the last completed node instead of redoing search and fetch.
+"""
+from app.core.startup import STARTUP, prewarm # First: starts the import clock
+import asyncio
+import os
+import signal
+import socket
+import inspect
+import aiosqlite
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from app.core.config import settings
+from app.core.runtime import ResearchRuntime
+
+STARTUP.imported()
+
+def checkpoint_serde() -> JsonPlusSerializer:
+    """
+    Checkpoint serializer that may rebuild the app's own state types (app.models.*) on resume,
+    and nothing else beyond LangGraph's safe built-ins.
+    """
+    from app.models import contracts, evidence
+
+    types = [
+        cls for module in (contracts, evidence)
+        for _, cls in inspect.getmembers(module, inspect.isclass) if cls.__module__ == module.__name__
+    ]
+    return JsonPlusSerializer(allowed_msgpack_modules=types)
+
+async def _heartbeat(runtime: ResearchRuntime, job_id: str, worker_id: str):
+    while True:
+        await asyncio.sleep(settings.JOB_LEASE_SECONDS / 3)
+        try:
+            await runtime.job_queue.extend(job_id, worker_id)
+        except Exception as e:
+            # Keep beating: one failed write (e.g. database locked) must not let the lease lapse
+            print(f"⚠️ Lease heartbeat failed for {job_id}: {e}")
+
+async def _work_loop(runtime: ResearchRuntime, worker_id: str, stop: asyncio.Event):
+    queue = runtime.job_queue
+    while not stop.is_set():
+        job = await queue.claim(worker_id)
+        if job is None:
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=settings.WORKER_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            continue
+
+        job_id = job["job_id"]
+        print(f"🛠️ {worker_id} running {job_id} ({job['domain']}, attempt {job['attempts']})")
+        heartbeat = asyncio.create_task(_heartbeat(runtime, job_id, worker_id))
+        try:
+            final_state = await runtime.run_mission(job["domain"], job["config"], thread_id=job_id)
+            dossier = final_state.get("dossier")
+            if dossier is None:
+                # The graph finished (checkpoint is final), retrying would not re-run scoring
+                finished = await queue.fail(
+                    job_id, worker_id, f"Mission ended with status {final_state.get('status')}", job["attempts"], retry=False
+                )
+            else:
+                finished = await queue.complete(job_id, worker_id, dossier.model_dump_json())
+            if not finished:
+                # Lease lost (expired and re-claimed): the job and its checkpoint belong to another worker now
+                print(f"⚠️ {worker_id} lost the lease on {job_id}, result dropped")
+                continue
+            # Finished missions don't need their checkpoints any more
+            delete_thread = getattr(runtime.checkpointer, "adelete_thread", None)
+            if delete_thread:
+                await delete_thread(job_id)
+        except Exception as e:
+            print(f"❌ {job_id} failed: {e}")
+            await queue.fail(job_id, worker_id, str(e), job["attempts"])
+        finally:
+            heartbeat.cancel()
+
+async def run_worker(concurrency: int):
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        # Graceful: stop claiming, let in-flight missions finish
+        loop.add_signal_handler(sig, stop.set)
+
+    if os.path.dirname(settings.CHECKPOINT_PATH):
+        os.makedirs(os.path.dirname(settings.CHECKPOINT_PATH), exist_ok=True)
+    async with aiosqlite.connect(settings.CHECKPOINT_PATH) as conn:
+        checkpointer = AsyncSqliteSaver(conn, serde=checkpoint_serde())
+        with STARTUP.phase("runtime"):
+            runtime = ResearchRuntime(checkpointer=checkpointer)
+        # Provider SDKs + clients before the first claim, so a fresh worker's first mission isn't the slow one
+        if not prewarm(runtime):
+            await runtime.close()
+            raise SystemExit(f"Prewarm failed: {STARTUP.error}")
+        worker_id = f"{socket.gethostname()}-{os.getpid()}"
+        print(f"🚜 Worker {worker_id} online ({concurrency} concurrent missions)")
+        try:
+            await asyncio.gather(*[
+                _work_loop(runtime, f"{worker_id}-{i}", stop) for i in range(concurrency)
+            ])
+        finally:
+            await runtime.close()
+
+if __name__ == "__main__":
+    asyncio.run(run_worker(settings.WORKER_CONCURRENCY))
@@ -0,0 +1,158 @@
+"""
+Memory cost of a mission, in flight and once finished.
+
+    cd backend
+    python -m benchmarks.memory --missions 512 --concurrency 64 --latency-scale 0.05
+    python -m benchmarks.memory --page-chars 5000 --json mem.json --baseline mem_before.json
+
+Runs missions (graph mode, stand-in upstreams as in benchmarks.run) and keeps every final state,
+like a batch worker holding its results. Reports, per mission:
+  inflight_kb   (peak RSS - baseline) / concurrency
+  retained_kb   (RSS after gc - baseline) / missions
+  traced_*_kb   the same from tracemalloc (Python allocations only, no allocator noise)
+  checkpoint_kb bytes a worker writes to its checkpointer over one mission (all node transitions)
+Stand-in pages are padded to --page-chars so excerpts have production sizes.
+"""
+import argparse
+import asyncio
+import contextlib
+import gc
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional
+from benchmarks.run import (
+    ResourceSampler, _free_port, _wait_for_port, bench_config, bench_env, build_runtime, run_level
+)
+from benchmarks.stand_ins import FIXTURES_PATH, scaled_profiles, serve
+
+def _rss_mb() -> float:
+    sampler = ResourceSampler(os.getpid())
+    sampler.sample()
+    return sampler.peak_rss_mb
+
+async def _checkpoint_kb(standin_port: int, missions: int) -> float:
+    """Average serialized checkpoint volume per mission (what app.worker writes)."""
+    from langgraph.checkpoint.memory import InMemorySaver
+
+    saver = InMemorySaver()
+    written = [0]
+    dumps_typed = saver.serde.dumps_typed
+
+    def counting_dumps(obj):
+        kind, data = dumps_typed(obj)
+        written[0] += len(data)
+        return kind, data
+
+    saver.serde.dumps_typed = counting_dumps
+    runtime = build_runtime(standin_port, checkpointer=saver)
+    config = bench_config()
+    try:
+        for i in range(missions):
+            await runtime.run_mission(f"ckpt-{i}.example", config, thread_id=f"ckpt-{i}")
+    finally:
+        await runtime.close()
+    return written[0] / 1024 / missions
+
+async def measure(args, standin_port: int) -> Dict[str, Any]:
+    from app.core.runtime import SCORED_STATUSES
+
+    runtime = build_runtime(standin_port)
+    config = bench_config()
+    retained: List[dict] = []
+    try:
+        async def mission(i: int) -> bool:
+            state = await runtime.run_mission(f"mem-{i}.example", config)
+            retained.append(state)
+            return state.get("status") in SCORED_STATUSES
+
+        for i in range(4):
+            await runtime.run_mission(f"warmup-{i}.example", config)
+        gc.collect()
+        base_rss = _rss_mb()
+        tracemalloc.start()
+        traced_base = tracemalloc.get_traced_memory()[0]
+        level = await run_level(mission, args.concurrency, args.missions, os.getpid())
+        _, traced_peak = tracemalloc.get_traced_memory()
+        gc.collect()
+        traced_after = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        after_rss = _rss_mb()
+    finally:
+        await runtime.close()
+
+    checkpoint_kb = await _checkpoint_kb(standin_port, args.checkpoint_missions)
+    return {
+        "missions": args.missions,
+        "concurrency": args.concurrency,
+        "failures": level["failures"],
+        "page_chars": args.page_chars,
+        "base_rss_mb": round(base_rss, 1),
+        "peak_rss_mb": level["peak_rss_mb"],
+        "after_rss_mb": round(after_rss, 1),
+        "inflight_kb": round((level["peak_rss_mb"] - base_rss) * 1024 / args.concurrency, 1),
+        "retained_kb": round((after_rss - base_rss) * 1024 / args.missions, 1),
+        "traced_inflight_kb": round((traced_peak - traced_base) / 1024 / args.concurrency, 1),
+        "traced_retained_kb": round((traced_after - traced_base) / 1024 / args.missions, 1),
+        "checkpoint_kb": round(checkpoint_kb, 1),
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Per-mission memory benchmark")
+    parser.add_argument("--missions", type=int, default=256)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--page-chars", type=int, default=5000, help="Pad stand-in pages to this size")
+    parser.add_argument("--checkpoint-missions", type=int, default=8)
+    parser.add_argument("--latency-scale", type=float, default=0.05)
+    parser.add_argument("--fixtures", default=FIXTURES_PATH)
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--baseline", help="Earlier results JSON to compare against")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    env = bench_env(tempfile.mkdtemp(prefix="bench_"))
+    # Provider rate limits would only stretch the run; memory is what is measured here
+    env.update({"SEARCH_RATE_PER_SECOND": "1000", "LLM_RATE_PER_SECOND": "1000", "SIGNAL_LLM_RATE_PER_SECOND": "1000"})
+    os.environ.update(env)
+
+    spawn = multiprocessing.get_context("spawn")
+    port = _free_port()
+    stand_ins = spawn.Process(
+        target=serve, args=(port, scaled_profiles(args.latency_scale, 0.0), args.fixtures, 7, args.page_chars), daemon=True
+    )
+    stand_ins.start()
+    try:
+        _wait_for_port(port)
+        quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(open(os.devnull, "w"))
+        started = time.perf_counter()
+        with quiet:
+            result = asyncio.run(measure(args, port))
+        result["wall_seconds"] = round(time.perf_counter() - started, 1)
+    finally:
+        stand_ins.terminate()
+        stand_ins.join(5)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print(f"\n🧮 Memory per mission ({result['missions']} missions, {result['concurrency']} in flight, pages {result['page_chars']} chars)")
+    for key in ("inflight_kb", "retained_kb", "traced_inflight_kb", "traced_retained_kb", "checkpoint_kb", "peak_rss_mb"):
+        line = f"  {key:<20} {result[key]:>10}"
+        if baseline and baseline.get(key):
+            line += f"   (baseline {baseline[key]}, {result[key] / baseline[key] - 1:+.0%})"
+        print(line)
+    if result["failures"]:
+        print(f"  ⚠️ {result['failures']} missions failed")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"💾 Results written to {args.json}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,380 @@
+"""
+Offline benchmark of the research pipeline, against local stand-ins for every upstream.
+
+    cd backend
+    python -m benchmarks.run --mode graph --concurrency 1,8,32,64 --latency-scale 0.1
+    python -m benchmarks.run --mode api --concurrency 8,32 --json bench.json
+    python -m benchmarks.run --mode crm --missions 5000 --concurrency 1,4
+    python -m benchmarks.run --mode graph --baseline bench.json --max-regression 0.2   # CI gate
+
+Modes:
+  graph  missions through ResearchRuntime.run_mission (the compiled ResearcherGraph), in this process
+  api    POST /api/v1/research/run against the FastAPI app served by uvicorn in a child process
+  crm    bulk HubSpot write-back (HubSpotService.sync_companies), domains split across concurrent syncs
+
+Tavily, crawled pages, Jina, HubSpot and Gemini are replayed by benchmarks.stand_ins (fixtures in
+benchmarks/fixtures) from a separate process: no network or API keys are needed. Caches are off,
+so every mission does the full search -> fetch -> score path. Per concurrency level the report
+shows throughput, p50/p95/p99 latency, failures, and the peak RSS and open sockets of the
+process running the pipeline.
+
+Provider rate limits apply as configured (SEARCH_RATE_PER_SECOND=10 with ~4 searches per mission
+caps a run at ~2.5 missions/s); raise them through the environment to measure the pipeline itself:
+    SEARCH_RATE_PER_SECOND=500 LLM_RATE_PER_SECOND=500 python -m benchmarks.run ...
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import multiprocessing
+import os
+import resource
+import socket
+import sys
+import tempfile
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import httpx
+from benchmarks.stand_ins import FIXTURES_PATH, RedirectTransport, StandInLLM, scaled_profiles, serve
+
+def bench_env(workdir: str) -> Dict[str, str]:
+    """Hermetic settings: fake keys (the stand-ins accept anything), caches off, state in a temp dir."""
+    return {
+        "SUPABASE_URL": "http://127.0.0.1",
+        "SUPABASE_KEY": "bench",
+        "GOOGLE_API_KEY": "bench",
+        "TAVILY_API_KEY": "bench",
+        "HUBSPOT_ACCESS_TOKEN": "bench",
+        "DOSSIER_CACHE_URL": "",
+        "FETCH_CACHE_DIR": "",
+        "LLM_CACHE_PATH": "",
+        "CRM_MIRROR_PATH": "",
+        "EVIDENCE_STORE_PATH": "",
+        "JOB_QUEUE_PATH": os.path.join(workdir, "jobs.db"),
+    }
+
+def build_runtime(standin_port: int, checkpointer=None, cold_llm: bool = False):
+    """
+    A ResearchRuntime whose HTTP clients (and Gemini) talk to the stand-in server.
+    cold_llm: LLM clients are built on first use like in production (SDK import and real client
+    construction included), then answered by the stand-in.
+    """
+    from app.core.config import settings
+    from app.core.runtime import ResearchRuntime
+    from app.agents.graph import chat_model
+
+    runtime = ResearchRuntime(
+        checkpointer=checkpointer,
+        transport_factory=lambda limits: RedirectTransport(standin_port, limits),
+    )
+    if cold_llm:
+        def stand_in_after_build(model: str):
+            chat_model(model)
+            return StandInLLM(runtime.api_client, model)
+
+        runtime.graph.llm_factory = stand_in_after_build
+    else:
+        runtime.graph.llm = StandInLLM(runtime.api_client, settings.LLM_MODEL)
+        runtime.graph.signal_llm = StandInLLM(runtime.api_client, settings.SIGNAL_LLM_MODEL)
+    return runtime
+
+def bench_config():
+    from app.models.contracts import ResearchConfig
+
+    return ResearchConfig(
+        config_id="bench",
+        proposition="Revenue intelligence for B2B SaaS sales teams",
+        persona="VP Sales",
+        icp_ruleset_id="Series A-C B2B SaaS, 50-500 employees, Salesforce or HubSpot CRM",
+    )
+
+def serve_api(port: int, standin_port: int, env: Dict[str, str], verbose: bool):
+    """Child process: the real FastAPI app, with the runtime pointed at the stand-ins."""
+    os.environ.update(env)
+    if not verbose:
+        sys.stdout = open(os.devnull, "w")
+    from contextlib import asynccontextmanager
+    import uvicorn
+    from app.main import app
+    from app.core.startup import prewarm
+
+    @asynccontextmanager
+    async def lifespan(app):
+        app.state.runtime = build_runtime(standin_port)
+        prewarm(app.state.runtime)
+        yield
+        await app.state.runtime.close()
+
+    app.router.lifespan_context = lifespan
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning", backlog=4096)
+
+# --- Measurement ---
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _wait_for_port(port: int, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with contextlib.suppress(OSError), socket.create_connection(("127.0.0.1", port), timeout=0.5):
+            return
+        time.sleep(0.1)
+    raise RuntimeError(f"Nothing listening on port {port} after {timeout}s")
+
+class ResourceSampler:
+    """Samples RSS and open sockets of a process (Linux /proc) while a level runs; keeps the peaks."""
+
+    def __init__(self, pid: int, interval: float = 0.05):
+        self.pid = pid
+        self.interval = interval
+        self.peak_rss_mb = 0.0
+        self.peak_sockets: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def sample(self):
+        try:
+            with open(f"/proc/{self.pid}/statm") as f:
+                rss = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+            fd_dir = f"/proc/{self.pid}/fd"
+            sockets = 0
+            for fd in os.listdir(fd_dir):
+                with contextlib.suppress(OSError):
+                    if os.readlink(f"{fd_dir}/{fd}").startswith("socket:"):
+                        sockets += 1
+            self.peak_sockets = max(self.peak_sockets or 0, sockets)
+        except (OSError, ValueError):
+            # No /proc (macOS): lifetime peak of this process only
+            rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        self.peak_rss_mb = max(self.peak_rss_mb, rss)
+
+    async def _run(self):
+        while True:
+            self.sample()
+            await asyncio.sleep(self.interval)
+
+    async def __aenter__(self):
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, *exc):
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self.sample()
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered) + 0.5)) - 1))]
+
+async def run_level(
+    call: Callable[[int], Awaitable[bool]], concurrency: int, count: int, pid: int
+) -> Dict[str, Any]:
+    """Runs `count` calls with at most `concurrency` in flight; call(i) returns success."""
+    limit = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    failures = 0
+
+    async def one(i: int):
+        nonlocal failures
+        async with limit:
+            start = time.perf_counter()
+            try:
+                ok = await call(i)
+            except Exception:
+                ok = False
+            latencies.append((time.perf_counter() - start) * 1000)
+            failures += 0 if ok else 1
+
+    async with ResourceSampler(pid) as sampler:
+        started = time.perf_counter()
+        await asyncio.gather(*[one(i) for i in range(count)])
+        wall = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "count": count,
+        "failures": failures,
+        "wall_seconds": round(wall, 3),
+        "throughput_per_s": round(count / wall, 3),
+        "p50_ms": round(percentile(latencies, 50), 1),
+        "p95_ms": round(percentile(latencies, 95), 1),
+        "p99_ms": round(percentile(latencies, 99), 1),
+        "peak_rss_mb": round(sampler.peak_rss_mb, 1),
+        "peak_sockets": sampler.peak_sockets,
+    }
+
+# --- Modes ---
+
+async def bench_graph(args, standin_port: int) -> List[Dict[str, Any]]:
+    from app.core.runtime import SCORED_STATUSES
+
+    runtime = build_runtime(standin_port)
+    config = bench_config()
+    levels = []
+    try:
+        async def mission(domain: str) -> bool:
+            state = await runtime.run_mission(domain, config, scoring_mode=args.scoring)
+            return state.get("status") in SCORED_STATUSES
+
+        await mission("warmup.example")
+        for level, concurrency in enumerate(args.concurrency):
+            count = args.missions or max(50, 4 * concurrency)
+            levels.append(await run_level(
+                lambda i: mission(f"acct-{level}-{i}.example"), concurrency, count, os.getpid()
+            ))
+            report_level(args, levels[-1])
+    finally:
+        await runtime.close()
+    return levels
+
+async def bench_api(args, standin_port: int, api_port: int, api_pid: int) -> List[Dict[str, Any]]:
+    config = bench_config().model_dump(mode="json")
+    url = f"http://127.0.0.1:{api_port}/api/v1/research/run"
+    levels = []
+    for level, concurrency in enumerate(args.concurrency):
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(limits=limits, timeout=120.0) as client:
+            async def mission(i: int) -> bool:
+                resp = await client.post(url, json={"domain": f"api-{level}-{i}.example", "config": config})
+                return resp.status_code == 200
+
+            await mission(-1) # Warm-up
+            count = args.missions or max(50, 4 * concurrency)
+            levels.append(await run_level(mission, concurrency, count, api_pid))
+            report_level(args, levels[-1])
+    return levels
+
+async def bench_crm(args, standin_port: int) -> List[Dict[str, Any]]:
+    runtime = build_runtime(standin_port)
+    levels = []
+    try:
+        for level, concurrency in enumerate(args.concurrency):
+            total = args.missions or 2000
+            chunk = -(-total // concurrency)
+
+            async def sync(i: int) -> bool:
+                domains = [f"crm-{level}-{j}.example" for j in range(i * chunk, min(total, (i + 1) * chunk))]
+                result = await runtime.hubspot.sync_companies({d: {"gtm360_fit_tier": "A"} for d in domains})
+                return not result["errors"] and result["updated"] == len(domains)
+
+            result = await run_level(sync, concurrency, concurrency, os.getpid())
+            # Report per company written, not per sync call
+            result["count"] = total
+            result["throughput_per_s"] = round(total / result["wall_seconds"], 3)
+            levels.append(result)
+            report_level(args, levels[-1])
+    finally:
+        await runtime.close()
+    return levels
+
+# --- Reporting ---
+
+COLUMNS = [
+    ("concurrency", "conc"), ("count", "n"), ("failures", "fail"), ("throughput_per_s", "per_s"),
+    ("p50_ms", "p50_ms"), ("p95_ms", "p95_ms"), ("p99_ms", "p99_ms"),
+    ("peak_rss_mb", "rss_mb"), ("peak_sockets", "sockets"),
+]
+
+def report_level(args, level: Dict[str, Any]):
+    if not getattr(args, "_header_done", False):
+        print(f"\n📊 {args.mode} benchmark (latency x{args.latency_scale}, error rate {args.error_rate})", file=sys.__stdout__)
+        print("  ".join(f"{title:>8}" for _, title in COLUMNS), file=sys.__stdout__)
+        args._header_done = True
+    print("  ".join(f"{str(level[key]):>8}" for key, _ in COLUMNS), file=sys.__stdout__, flush=True)
+
+def compare_to_baseline(mode: str, levels: List[Dict[str, Any]], baseline_path: str, max_regression: float) -> List[str]:
+    with open(baseline_path) as f:
+        data = json.load(f)
+    if data.get("mode") != mode:
+        return [f"baseline is a {data.get('mode')} run, not {mode}"]
+    baseline = {lv["concurrency"]: lv for lv in data["levels"]}
+    regressions = []
+    for level in levels:
+        base = baseline.get(level["concurrency"])
+        if not base:
+            continue
+        floor = base["throughput_per_s"] * (1 - max_regression)
+        if level["throughput_per_s"] < floor:
+            regressions.append(
+                f"concurrency {level['concurrency']}: {level['throughput_per_s']}/s "
+                f"< {floor:.2f}/s (baseline {base['throughput_per_s']}/s)"
+            )
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline research pipeline benchmark")
+    parser.add_argument("--mode", choices=["graph", "api", "crm"], default="graph")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated levels")
+    parser.add_argument("--missions", type=int, default=0, help="Missions per level (default max(50, 4 x concurrency))")
+    parser.add_argument("--scoring", choices=["single", "batched"], default="single", help="graph mode scoring path")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Multiplies every stand-in latency")
+    parser.add_argument("--error-rate", type=float, default=None, help="503 rate for every upstream (default per profile)")
+    parser.add_argument("--fixtures", default=FIXTURES_PATH)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--baseline", help="Results JSON to compare throughput against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Allowed throughput drop vs baseline")
+    parser.add_argument("--verbose", action="store_true", help="Keep the pipeline's own logs")
+    args = parser.parse_args(argv)
+    args.concurrency = [int(c) for c in args.concurrency.split(",")]
+
+    workdir = tempfile.mkdtemp(prefix="bench_")
+    env = bench_env(workdir)
+    os.environ.update(env)
+    profiles = scaled_profiles(args.latency_scale, args.error_rate)
+
+    spawn = multiprocessing.get_context("spawn")
+    standin_port = _free_port()
+    children = [spawn.Process(target=serve, args=(standin_port, profiles, args.fixtures, args.seed), daemon=True)]
+    children[0].start()
+    try:
+        _wait_for_port(standin_port)
+        # Pipeline logs go to /dev/null unless --verbose; the report goes to the real stdout
+        quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(open(os.devnull, "w"))
+        with quiet:
+            if args.mode == "api":
+                api_port = _free_port()
+                api = spawn.Process(target=serve_api, args=(api_port, standin_port, env, args.verbose), daemon=True)
+                api.start()
+                children.append(api)
+                _wait_for_port(api_port)
+                levels = asyncio.run(bench_api(args, standin_port, api_port, api.pid))
+            elif args.mode == "crm":
+                levels = asyncio.run(bench_crm(args, standin_port))
+            else:
+                levels = asyncio.run(bench_graph(args, standin_port))
+        stand_in_requests = httpx.get(f"http://127.0.0.1:{standin_port}/__stats").json()
+    finally:
+        for child in children:
+            child.terminate()
+            child.join(5)
+
+    print(f"\nStand-in requests served: {stand_in_requests}")
+    results = {
+        "mode": args.mode,
+        "scoring": args.scoring,
+        "latency_scale": args.latency_scale,
+        "error_rate": args.error_rate,
+        "levels": levels,
+        "stand_in_requests": stand_in_requests,
+    }
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Results written to {args.json}")
+
+    if args.baseline:
+        regressions = compare_to_baseline(args.mode, levels, args.baseline, args.max_regression)
+        if regressions:
+            print("❌ Throughput regression:\n  " + "\n  ".join(regressions))
+            return 1
+        print(f"✅ Within {args.max_regression:.0%} of baseline throughput")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
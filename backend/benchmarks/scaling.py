@@ -0,0 +1,137 @@
+"""
+Batch throughput as the CPU executor scales from inline to N worker processes.
+
+    cd backend
+    python -m benchmarks.scaling --domains 256 --workers 1,2,4,8
+    python -m benchmarks.scaling --page-chars 200000 --max-text-chars 20000 --json scaling.json
+
+Each level submits the same batch to a fresh ResearchRuntime's BatchScheduler (the /research/batch
+path) and waits for every result: first with CPU_EXECUTOR=inline, then CPU_EXECUTOR=process with
+CPU_WORKERS=1..N. Stand-in pages are padded to --page-chars so text extraction and evidence packing
+carry production-sized pages; signal extraction is off so packing (MinHash dedup) runs on every
+mission. Per level it reports domains/s, speedup over inline and how late a 10ms ticker on the
+event loop ran (the I/O of every mission in flight waits that long).
+Levels above available_cores() are skipped: a pool larger than the cores only adds contention.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+from benchmarks.run import _free_port, _wait_for_port, bench_config, bench_env, build_runtime, percentile
+from benchmarks.stand_ins import FIXTURES_PATH, scaled_profiles, serve
+
+TICK = 0.01
+
+async def _loop_lag(lags: List[float]):
+    """Records how late each 10ms tick fires: time the loop spent blocked on CPU work."""
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append((time.perf_counter() - started - TICK) * 1000)
+
+async def run_batch(standin_port: int, mode: str, workers: int, domains: List[str]) -> Dict[str, Any]:
+    from app.core.config import settings
+
+    settings.CPU_EXECUTOR = mode
+    settings.CPU_WORKERS = workers
+    runtime = build_runtime(standin_port)
+    config = bench_config()
+    lags: List[float] = []
+    try:
+        runtime.cpu.warm() # Worker start-up is not part of the batch
+        await runtime.run_mission("warmup.example", config)
+        ticker = asyncio.create_task(_loop_lag(lags))
+        started = time.perf_counter()
+        job = runtime.scheduler.submit(domains, config)
+        results = [r async for r in job.stream()]
+        wall = time.perf_counter() - started
+        ticker.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await ticker
+    finally:
+        await runtime.close()
+    return {
+        "mode": mode,
+        "workers": runtime.cpu.workers if mode == "process" else 0,
+        "domains": len(domains),
+        "failures": sum(1 for r in results if r["status"] != "SUCCESS"),
+        "wall_seconds": round(wall, 3),
+        "throughput_per_s": round(len(domains) / wall, 3),
+        "loop_lag_p99_ms": round(percentile(lags, 99), 1),
+        "loop_lag_max_ms": round(max(lags, default=0.0), 1),
+    }
+
+async def measure(args, standin_port: int) -> List[Dict[str, Any]]:
+    from app.core.executor import available_cores
+
+    cores = available_cores()
+    workers = [w for w in args.workers if w <= cores] or [1]
+    levels = []
+    for mode, n in [("inline", 0)] + [("process", w) for w in workers]:
+        domains = [f"scale-{mode}-{n}-{i}.example" for i in range(args.domains)]
+        levels.append(await run_batch(standin_port, mode, n, domains))
+    inline = levels[0]["throughput_per_s"]
+    for level in levels:
+        level["speedup"] = round(level["throughput_per_s"] / inline, 2) if inline else None
+    return levels
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="CPU executor scaling benchmark (batch path)")
+    parser.add_argument("--domains", type=int, default=128, help="Domains per batch")
+    parser.add_argument("--workers", default="1,2,4,8", help="Process pool sizes to measure")
+    parser.add_argument("--page-chars", type=int, default=100000, help="Pad stand-in pages to this size")
+    parser.add_argument("--max-text-chars", type=int, default=20000, help="FETCH_MAX_TEXT_CHARS")
+    parser.add_argument("--latency-scale", type=float, default=0.05)
+    parser.add_argument("--fixtures", default=FIXTURES_PATH)
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+    args.workers = [int(w) for w in args.workers.split(",")]
+
+    env = bench_env(tempfile.mkdtemp(prefix="bench_"))
+    # CPU is what is measured: rate limits out of the way, packing on every mission
+    env.update({
+        "SEARCH_RATE_PER_SECOND": "1000", "LLM_RATE_PER_SECOND": "1000", "SIGNAL_LLM_RATE_PER_SECOND": "1000",
+        "SIGNAL_EXTRACTION": "false", "RULE_PRESCORING": "false",
+        "FETCH_MAX_TEXT_CHARS": str(args.max_text_chars),
+    })
+    os.environ.update(env)
+
+    spawn = multiprocessing.get_context("spawn")
+    port = _free_port()
+    stand_ins = spawn.Process(
+        target=serve, args=(port, scaled_profiles(args.latency_scale, 0.0), args.fixtures, 7, args.page_chars), daemon=True
+    )
+    stand_ins.start()
+    try:
+        _wait_for_port(port)
+        quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(open(os.devnull, "w"))
+        with quiet:
+            levels = asyncio.run(measure(args, port))
+    finally:
+        stand_ins.terminate()
+        stand_ins.join(5)
+
+    from app.core.executor import available_cores
+
+    print(f"\n🧵 Batch scaling ({args.domains} domains, pages {args.page_chars} chars, {available_cores()} cores available)")
+    print(f"  {'mode':<8}{'workers':>8}{'per_s':>10}{'speedup':>9}{'lag_p99':>9}{'lag_max':>9}{'fail':>6}")
+    for level in levels:
+        print(
+            f"  {level['mode']:<8}{level['workers']:>8}{level['throughput_per_s']:>10.2f}{level['speedup']:>9.2f}"
+            f"{level['loop_lag_p99_ms']:>9.1f}{level['loop_lag_max_ms']:>9.1f}{level['failures']:>6}"
+        )
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"cores": available_cores(), "levels": levels}, f, indent=2)
+        print(f"💾 Results written to {args.json}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
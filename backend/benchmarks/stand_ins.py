@@ -0,0 +1,283 @@
+"""
+Local stand-ins for every upstream the research pipeline calls: Tavily, crawled sites, the Jina
+reader, HubSpot and Gemini. Responses are replayed from fixtures/upstreams.json over real sockets,
+with per-upstream latency (log-normal, median/p95) and 503 / 429 rates.
+
+The pipeline's HTTP clients are pointed here by RedirectTransport (see ResearchRuntime's
+transport_factory); Gemini goes through StandInLLM, which speaks the generateContent REST shape.
+"""
+import asyncio
+import json
+import math
+import random
+import re
+import zlib
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
+import httpx
+
+FIXTURES_PATH = __file__.rsplit("/", 1)[0] + "/fixtures/upstreams.json"
+
+TAVILY_HOST = "api.tavily.com"
+JINA_HOST = "r.jina.ai"
+HUBSPOT_HOST = "api.hubapi.com"
+GEMINI_HOST = "generativelanguage.googleapis.com"
+
+@dataclass
+class LatencyProfile:
+    median_ms: float = 50.0
+    p95_ms: float = 200.0
+    error_rate: float = 0.0 # Share of 503 responses
+    throttle_rate: float = 0.0 # Share of 429 responses (Retry-After: 0.2)
+
+    def sample_seconds(self, rng: random.Random) -> float:
+        # Log-normal through (median, p95): sigma = ln(p95/median) / z(0.95)
+        sigma = math.log(max(self.p95_ms, self.median_ms) / self.median_ms) / 1.645 if self.median_ms > 0 else 0.0
+        return max(0.0, rng.lognormvariate(math.log(max(self.median_ms, 1e-3)), sigma)) / 1000
+
+# Rough production shapes; scale them with --latency-scale for quick CI runs
+DEFAULT_PROFILES: Dict[str, LatencyProfile] = {
+    "tavily": LatencyProfile(median_ms=450, p95_ms=1500),
+    "web": LatencyProfile(median_ms=180, p95_ms=900, error_rate=0.02),
+    "jina": LatencyProfile(median_ms=900, p95_ms=2500),
+    "hubspot": LatencyProfile(median_ms=120, p95_ms=400),
+    "gemini": LatencyProfile(median_ms=1800, p95_ms=4500),
+}
+
+def scaled_profiles(scale: float, error_rate: Optional[float] = None) -> Dict[str, Dict[str, float]]:
+    profiles = {}
+    for name, p in DEFAULT_PROFILES.items():
+        profile = asdict(p)
+        profile["median_ms"] *= scale
+        profile["p95_ms"] *= scale
+        if error_rate is not None:
+            profile["error_rate"] = error_rate
+        profiles[name] = profile
+    return profiles
+
+def company_name(domain: str) -> str:
+    """'acct-3-17.example' -> 'Acct 3 17'"""
+    return " ".join(part.capitalize() for part in re.split(r"[-.]", domain.split(".")[0]))
+
+def _fill(value: Any, domain: str) -> Any:
+    if isinstance(value, str):
+        return value.replace("{domain}", domain).replace("{company}", company_name(domain))
+    if isinstance(value, list):
+        return [_fill(v, domain) for v in value]
+    if isinstance(value, dict):
+        return {k: _fill(v, domain) for k, v in value.items()}
+    return value
+
+FILLER_WORDS = (
+    "platform customers revenue teams pipeline forecast workflow data integration security analytics "
+    "growth pricing enterprise onboarding support partners roadmap release product insights automation"
+).split()
+
+def _filler(seed: str, chars: int) -> str:
+    """Deterministic per-page filler paragraphs (same url -> same text, so evidence ids stay stable)."""
+    rng = random.Random(seed)
+    paragraphs, size = [], 0
+    while size < chars:
+        paragraph = " ".join(rng.choice(FILLER_WORDS) for _ in range(40)).capitalize() + "."
+        paragraphs.append(f"<p>{paragraph}</p>")
+        size += len(paragraph) + 7
+    return "\n".join(paragraphs)
+
+# --- Client side ---
+
+class RedirectTransport(httpx.AsyncBaseTransport):
+    """
+    Sends every request to the stand-in server instead of the real host:
+    https://host/path?q -> http://127.0.0.1:<port>/<host>/path?q (method, headers and body unchanged).
+    """
+
+    def __init__(self, port: int, limits: httpx.Limits):
+        self.port = port
+        self._inner = httpx.AsyncHTTPTransport(limits=limits)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        original = request.url
+        request.url = httpx.URL(f"http://127.0.0.1:{self.port}/{original.host}{original.raw_path.decode()}")
+        request.headers["host"] = f"127.0.0.1:{self.port}"
+        response = await self._inner.handle_async_request(request)
+        request.url = original # Redirects and logs keep the real URL
+        return response
+
+    async def aclose(self):
+        await self._inner.aclose()
+
+class StandInLLM:
+    """Drop-in for ChatGoogleGenerativeAI.ainvoke: one generateContent POST through the given client."""
+
+    def __init__(self, client: httpx.AsyncClient, model: str):
+        self.client = client
+        self.url = f"https://{GEMINI_HOST}/v1beta/models/{model}:generateContent"
+
+    async def ainvoke(self, messages, config=None, **kwargs):
+        from langchain_core.messages import AIMessage
+
+        prompt = "\n".join(str(m.content) for m in messages)
+        resp = await self.client.post(self.url, json={"contents": [{"parts": [{"text": prompt}]}]}, timeout=60.0)
+        resp.raise_for_status()
+        data = resp.json()
+        usage = data.get("usageMetadata", {})
+        return AIMessage(
+            content=data["candidates"][0]["content"]["parts"][0]["text"],
+            usage_metadata={
+                "input_tokens": usage.get("promptTokenCount", 0),
+                "output_tokens": usage.get("candidatesTokenCount", 0),
+                "total_tokens": usage.get("totalTokenCount", 0),
+            },
+        )
+
+# --- Server side ---
+
+class StandInApp:
+    """ASGI app answering for all upstream hosts; the first path segment is the original host."""
+
+    def __init__(
+        self, fixtures: Dict[str, Any], profiles: Dict[str, Dict[str, float]], seed: int = 7, page_chars: int = 0
+    ):
+        self.fixtures = fixtures
+        self.page_chars = page_chars # Pad pages with filler text up to this size (realistic excerpt sizes)
+        self.profiles = {name: LatencyProfile(**p) for name, p in profiles.items()}
+        self.rng = random.Random(seed)
+        self.requests: Dict[str, int] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+
+        if scope["path"] == "/__stats":
+            return await self._send(send, 200, json.dumps(self.requests).encode(), "application/json")
+
+        host, _, path = scope["path"].lstrip("/").partition("/")
+        path = "/" + path
+        upstream = {
+            TAVILY_HOST: "tavily", JINA_HOST: "jina", HUBSPOT_HOST: "hubspot", GEMINI_HOST: "gemini",
+        }.get(host, "web")
+        self.requests[upstream] = self.requests.get(upstream, 0) + 1
+
+        profile = self.profiles[upstream]
+        await asyncio.sleep(profile.sample_seconds(self.rng))
+        roll = self.rng.random()
+        if roll < profile.throttle_rate:
+            return await self._send(send, 429, b'{"message":"rate limited"}', "application/json", {"retry-after": "0.2"})
+        if roll < profile.throttle_rate + profile.error_rate:
+            return await self._send(send, 503, b"upstream unavailable", "text/plain")
+
+        payload = json.loads(body) if body and upstream != "web" else {}
+        handler = getattr(self, f"_{upstream}")
+        status, content, content_type = handler(host, path, scope, payload)
+        await self._send(send, status, content, content_type)
+
+    async def _send(self, send, status: int, content: bytes, content_type: str, headers: Optional[Dict[str, str]] = None):
+        raw = [(b"content-type", content_type.encode()), (b"content-length", str(len(content)).encode())]
+        raw += [(k.encode(), v.encode()) for k, v in (headers or {}).items()]
+        await send({"type": "http.response.start", "status": status, "headers": raw})
+        await send({"type": "http.response.body", "body": content})
+
+    def _page_html(self, url: str) -> Optional[str]:
+        for page in self.fixtures["pages"]:
+            if page["match"] in url:
+                return page["html"]
+        return None
+
+    # Handlers: (host, path, scope, json body) -> (status, bytes, content type)
+    def _web(self, host, path, scope, payload):
+        html = self._page_html(f"{host}{path}")
+        if html is None:
+            return 404, b"<html><body><h1>Not found</h1></body></html>", "text/html; charset=utf-8"
+        # Third-party pages live on per-account hosts (news.<domain>.wire.example, <domain>.example-tools.com)
+        domain = re.sub(r"^news\.|\.(wire\.example|example-tools\.com)$", "", host)
+        html = _fill(html, domain)
+        if self.page_chars > len(html):
+            html = html.replace("</body>", _filler(f"{host}{path}", self.page_chars - len(html)) + "</body>")
+        return 200, html.encode(), "text/html; charset=utf-8"
+
+    def _jina(self, host, path, scope, payload):
+        target = path.lstrip("/")
+        html = self._page_html(target)
+        if html is None:
+            return 404, b"Not found", "text/plain"
+        domain = re.sub(r"^https?://", "", target).split("/")[0]
+        text = re.sub(r"<[^>]+>", "\n", _fill(html, domain))
+        return 200, re.sub(r"\n\s*\n+", "\n", text).encode(), "text/plain; charset=utf-8"
+
+    def _tavily(self, host, path, scope, payload):
+        query = payload.get("query", "")
+        match = re.search(r'site:(\S+)|"([^"]+)"', query)
+        domain = (match.group(1) or match.group(2)) if match else "example.com"
+        results: List[Dict[str, Any]] = []
+        for entry in self.fixtures["tavily"]:
+            if entry["match"] in query:
+                results = _fill(entry["results"], domain)
+                break
+        results = results[:payload.get("max_results", 5)]
+        return 200, json.dumps({"query": query, "results": results}).encode(), "application/json"
+
+    def _hubspot(self, host, path, scope, payload):
+        company = self.fixtures["hubspot"]["company"]
+        if path.endswith("/companies/search"):
+            filters = payload.get("filterGroups", [{}])[0].get("filters", [{}])
+            values = filters[0].get("values") or [filters[0].get("value", "")]
+            results = [
+                {"id": str(zlib.crc32(str(d).encode())), "properties": _fill(company, d)}
+                for d in values if not str(d).startswith("unknown")
+            ]
+            return 200, json.dumps({"total": len(results), "results": results}).encode(), "application/json"
+        if path.endswith("/companies/batch/update"):
+            inputs = payload.get("inputs", [])
+            return 200, json.dumps({"status": "COMPLETE", "results": inputs}).encode(), "application/json"
+        return 404, b'{"message":"not found"}', "application/json"
+
+    def _gemini(self, host, path, scope, payload):
+        prompt = payload["contents"][0]["parts"][0]["text"]
+        answer = self.fixtures["gemini"]["answer"]
+        domains = re.findall(r"=== ACCOUNT: (\S+) ===", prompt)
+        cited = re.findall(r"EVIDENCE ID: (ev_\w+)", prompt)
+        output_tokens = self.fixtures["gemini"]["output_tokens"] * max(1, len(domains))
+        if cited:
+            # Signal extraction: the fixture signals, citing the chunk's evidence
+            signals = [dict(s, evidence_ids=cited[:1]) for s in self.fixtures["gemini"]["signals"]]
+            text = json.dumps(signals)
+        else:
+            text = json.dumps({d: answer for d in domains} if domains else answer)
+        data = {
+            "candidates": [{"content": {"parts": [{"text": text}], "role": "model"}, "finishReason": "STOP"}],
+            "usageMetadata": {
+                "promptTokenCount": len(prompt) // 4,
+                "candidatesTokenCount": output_tokens,
+                "totalTokenCount": len(prompt) // 4 + output_tokens,
+            },
+        }
+        return 200, json.dumps(data).encode(), "application/json"
+
+def serve(
+    port: int,
+    profiles: Dict[str, Dict[str, float]],
+    fixtures_path: str = FIXTURES_PATH,
+    seed: int = 7,
+    page_chars: int = 0,
+):
+    """Process entry point: serves the stand-ins on 127.0.0.1:port until terminated."""
+    import uvicorn
+
+    with open(fixtures_path) as f:
+        fixtures = json.load(f)
+    uvicorn.run(
+        StandInApp(fixtures, profiles, seed, page_chars),
+        host="127.0.0.1", port=port, log_level="warning", backlog=4096, timeout_keep_alive=30,
+    )
@@ -0,0 +1,164 @@
+"""
+Cold start of a fresh process: time until ready, and latency of its first missions.
+
+    cd backend
+    python -m benchmarks.startup --runs 5
+    python -m benchmarks.startup --json startup.json --baseline startup_before.json
+
+Each run is a new interpreter (python -X importtime) that imports app.main, builds the runtime,
+prewarms (or not, for comparison: --no-prewarm runs are interleaved), then runs two missions
+against the stand-ins with rule pre-scoring off so both LLM providers are called. LLM clients are
+built for real on first use (SDK import included) and answered by the stand-in Gemini. Per variant
+it reports medians of:
+  import_s        import app.main and everything it pulls in
+  runtime_s       ResearchRuntime (pools, caches, graph compile)
+  prewarm_s       app.core.startup.prewarm
+  ready_s         import_s + runtime_s + prewarm_s: when /health turns healthy
+  first_mission_s / second_mission_s
+plus the slowest imported top-level packages (whole process, prewarm included).
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import multiprocessing
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+from benchmarks.run import _free_port, _wait_for_port, bench_config, bench_env, build_runtime
+from benchmarks.stand_ins import FIXTURES_PATH, scaled_profiles, serve
+
+METRICS = ("import_s", "runtime_s", "prewarm_s", "ready_s", "first_mission_s", "second_mission_s")
+
+def child(out_path: str, standin_port: int, warm: bool):
+    """One cold process (run with python -X importtime); writes its timings to out_path."""
+    started = time.perf_counter()
+    import app.main # noqa: F401 - the API entrypoint's full import graph
+    imported = time.perf_counter()
+    from app.core.startup import prewarm
+
+    async def run() -> Dict[str, float]:
+        timings = {"import_s": imported - started}
+        t = time.perf_counter()
+        runtime = build_runtime(standin_port, cold_llm=True)
+        timings["runtime_s"] = time.perf_counter() - t
+        t = time.perf_counter()
+        if warm:
+            prewarm(runtime)
+        timings["prewarm_s"] = time.perf_counter() - t
+        timings["ready_s"] = timings["import_s"] + timings["runtime_s"] + timings["prewarm_s"]
+        config = bench_config()
+        try:
+            for i, key in enumerate(("first_mission_s", "second_mission_s")):
+                t = time.perf_counter()
+                state = await runtime.run_mission(f"cold-{i}.example", config)
+                timings[key] = time.perf_counter() - t
+                timings[f"{key[:-2]}_status"] = state.get("status")
+        finally:
+            await runtime.close()
+        return timings
+
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        timings = asyncio.run(run())
+    with open(out_path, "w") as f:
+        json.dump(timings, f)
+
+def slowest_packages(importtime_log: str, top: int = 8) -> List[Dict[str, Any]]:
+    """Import time per top-level package (sum of its modules' own time), from python -X importtime output."""
+    totals: Dict[str, int] = {}
+    for line in importtime_log.splitlines():
+        if not line.startswith("import time:") or line.count("|") != 2:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue # Header line
+        package = name.strip().split(".")[0]
+        totals[package] = totals.get(package, 0) + int(self_us)
+    ranked = sorted(totals.items(), key=lambda kv: -kv[1])[:top]
+    return [{"package": p, "seconds": round(us / 1e6, 3)} for p, us in ranked]
+
+def run_child(standin_port: int, warm: bool) -> Dict[str, Any]:
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+        out_path = f.name
+    cmd = [sys.executable, "-X", "importtime", "-m", "benchmarks.startup", "--child", out_path,
+           "--port", str(standin_port)] + ([] if warm else ["--no-prewarm"])
+    proc = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+    if proc.returncode != 0:
+        raise RuntimeError(f"Cold start run failed:\n{proc.stderr[-2000:]}")
+    with open(out_path) as f:
+        timings = json.load(f)
+    os.unlink(out_path)
+    timings["packages"] = slowest_packages(proc.stderr)
+    return timings
+
+def summarize(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    summary = {key: round(statistics.median(r[key] for r in runs), 3) for key in METRICS}
+    summary["statuses"] = sorted({r["first_mission_status"] for r in runs} | {r["second_mission_status"] for r in runs})
+    summary["packages"] = runs[0]["packages"]
+    return summary
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Cold start benchmark")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh processes per variant")
+    parser.add_argument("--latency-scale", type=float, default=0.1)
+    parser.add_argument("--fixtures", default=FIXTURES_PATH)
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--baseline", help="Earlier results JSON to compare against")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--no-prewarm", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        child(args.child, args.port, warm=not args.no_prewarm)
+        return 0
+
+    env = bench_env(tempfile.mkdtemp(prefix="bench_"))
+    # Both LLM providers on the mission path; rate limits out of the way of a two-mission run
+    env.update({"RULE_PRESCORING": "false", "SEARCH_RATE_PER_SECOND": "1000", "LLM_RATE_PER_SECOND": "1000"})
+    os.environ.update(env)
+
+    spawn = multiprocessing.get_context("spawn")
+    port = _free_port()
+    stand_ins = spawn.Process(
+        target=serve, args=(port, scaled_profiles(args.latency_scale, 0.0), args.fixtures, 7), daemon=True
+    )
+    stand_ins.start()
+    runs: Dict[str, List[Dict[str, Any]]] = {"lazy": [], "prewarm": []}
+    try:
+        _wait_for_port(port)
+        # Interleaved so both variants see the same page-cache / CPU conditions
+        for _ in range(args.runs):
+            runs["lazy"].append(run_child(port, warm=False))
+            runs["prewarm"].append(run_child(port, warm=True))
+    finally:
+        stand_ins.terminate()
+        stand_ins.join(5)
+
+    result = {variant: summarize(r) for variant, r in runs.items()}
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    print(f"\n🧊 Cold start (median of {args.runs} fresh processes per variant)")
+    print(f"  {'':<18}" + "".join(f"{variant:>12}" for variant in result))
+    for key in METRICS:
+        line = f"  {key:<18}" + "".join(f"{result[v][key]:>12.3f}" for v in result)
+        if baseline and baseline.get("prewarm", {}).get(key):
+            line += f"   (baseline prewarm {baseline['prewarm'][key]:.3f})"
+        print(line)
+    print("  mission statuses: " + ", ".join(result["prewarm"]["statuses"]))
+    print("  slowest imports: " + ", ".join(f"{p['package']} {p['seconds']:.2f}s" for p in result["prewarm"]["packages"]))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"💾 Results written to {args.json}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,13 @@
+import os
+
+# Settings are read at import: required fields get placeholders, on-disk stores stay off
+for key, value in {
+    "SUPABASE_URL": "http://127.0.0.1",
+    "SUPABASE_KEY": "test",
+    "DOSSIER_CACHE_URL": "",
+    "FETCH_CACHE_DIR": "",
+    "LLM_CACHE_PATH": "",
+    "CRM_MIRROR_PATH": "",
+    "EVIDENCE_STORE_PATH": "",
+}.items():
+    os.environ.setdefault(key, value)
@@ -0,0 +1,22 @@
+import asyncio
+from app.core.concurrency import ProviderLimits
+
+def test_host_limit_is_shared_across_callers():
+    limits = ProviderLimits(per_host=2)
+    active = {"acme.com": 0, "other.com": 0}
+    peak = dict(active)
+
+    async def fetch(host: str):
+        async with limits.host(host):
+            active[host] += 1
+            peak[host] = max(peak[host], active[host])
+            await asyncio.sleep(0.01)
+            active[host] -= 1
+
+    async def scenario():
+        # Ten "missions" on one site, two on another
+        await asyncio.gather(*[fetch("acme.com") for _ in range(10)], *[fetch("other.com") for _ in range(2)])
+
+    asyncio.run(scenario())
+    assert peak == {"acme.com": 2, "other.com": 2}
+    assert limits._hosts == {} # Idle hosts are forgotten
@@ -0,0 +1,29 @@
+from datetime import datetime
+import pytest
+from app.models.contracts import AccountDossier, GTMDiagnosis, MetaInfo, Signal
+
+pytest.importorskip("pyarrow")
+from app.services.dossier_export import export_dossiers, find_export, query_export
+
+@pytest.fixture
+def export_path(tmp_path):
+    dossiers = [
+        AccountDossier(
+            domain=f"d{i}.com",
+            signals=[Signal(signal_type="FUNDING", label="l", value="v", confidence=0.5)],
+            gtm_diagnosis=GTMDiagnosis(fit_tier="AB"[i % 2], confidence=i / 10),
+            meta=MetaInfo(config_id="c", generated_at=datetime.now()),
+        )
+        for i in range(10)
+    ]
+    summary = export_dossiers(dossiers, str(tmp_path), "parquet", row_group_rows=4)
+    return find_export(str(tmp_path), summary["export_id"])
+
+@pytest.mark.parametrize("column", ["signals", "signal_types", "reasoning_bullets", "evidence_ids"])
+def test_sort_on_nested_column_is_rejected(export_path, column):
+    with pytest.raises(ValueError, match="not a scalar column"):
+        query_export(export_path, sort_by=column)
+
+def test_query_filters_and_sorts(export_path):
+    rows = query_export(export_path, fit_tiers=["B"], signal_types=["FUNDING"], limit=2, columns=["domain"])
+    assert rows == [{"domain": "d9.com"}, {"domain": "d7.com"}]
@@ -0,0 +1,64 @@
+import random
+from datetime import datetime
+import pytest
+from app.agents.evidence_packer import estimate_tokens, pack_evidence
+from app.models.contracts import EvidenceItem
+from app.models.evidence import Evidence
+
+QUERY = "revenue operations platform for sales leaders"
+
+def ev(n: int, excerpt: str, source_type: str = "NEWS", reliability: str = "HIGH") -> Evidence:
+    return Evidence.from_item(EvidenceItem(
+        evidence_id=f"e{n}", domain="acme.com", source_type=source_type, url=f"https://acme.com/{n}",
+        retrieved_at=datetime.now(), excerpt=excerpt, reliability=reliability,
+    ))
+
+def filler(seed: int, words: int = 110) -> str:
+    rng = random.Random(seed)
+    return " ".join(f"w{rng.randrange(10000)}" for _ in range(words))
+
+def test_near_duplicate_passage_is_dropped():
+    text = filler(1)
+    # Same boilerplate on two pages, one word apart (not an exact repeated line)
+    almost = text.replace(text.split()[50], "changed", 1)
+    packed = pack_evidence([ev(1, text), ev(2, almost), ev(3, filler(2))], QUERY, token_budget=10000)
+    assert packed.passages_total == 3
+    assert packed.duplicates_dropped == 1
+    assert packed.evidence_ids == ["e1", "e3"] # The first copy is kept
+    assert "changed" not in packed.text
+
+def test_distinct_passages_are_kept():
+    packed = pack_evidence([ev(1, filler(1)), ev(2, filler(2))], QUERY, token_budget=10000)
+    assert packed.duplicates_dropped == 0
+    assert packed.passages_used == 2
+
+def test_each_source_gets_its_best_passage_first():
+    # A very relevant page of five passages (each line is over 600 chars) and one big, barely relevant passage
+    relevant = [f"Revenue operations platform for sales leaders, part {i}. " + filler(i) for i in range(5)]
+    long_page = ev(1, "\n".join(relevant), source_type="HOMEPAGE")
+    other_page = ev(2, "Founded in 2015 in Berlin. " + filler(99, 300))
+    one_each = pack_evidence([long_page, other_page], QUERY, token_budget=10000)
+    # Room for one passage per source, not for a second one from the long page
+    budget = one_each.tokens - sum(estimate_tokens(line) for line in relevant[1:])
+    packed = pack_evidence([long_page, other_page], QUERY, token_budget=budget)
+    assert sorted(packed.evidence_ids) == ["e1", "e2"]
+    assert packed.passages_used == 2
+    assert "Founded in 2015" in packed.text
+    assert "part 0" in packed.text # The long page's best (first) passage
+
+def test_failed_fetches_are_skipped():
+    failed = ev(1, "Failed to fetch https://acme.com/1", reliability="LOW")
+    packed = pack_evidence([failed, ev(2, filler(2))], QUERY, token_budget=10000)
+    assert packed.evidence_ids == ["e2"]
+
+@pytest.mark.parametrize("token_budget", [10, 60, 150, 400, 1000, 3000])
+def test_never_exceeds_token_budget(token_budget):
+    rng = random.Random(token_budget)
+    items = [
+        ev(n, "\n".join(f"{QUERY if rng.random() < 0.3 else ''} {filler(n * 100 + line, rng.randint(5, 80))}"
+                        for line in range(rng.randint(1, 20))))
+        for n in range(6)
+    ]
+    packed = pack_evidence(items, QUERY, token_budget)
+    assert packed.tokens <= token_budget
+    assert estimate_tokens(packed.text) <= token_budget or packed.text == ""
@@ -0,0 +1,43 @@
+import asyncio
+import os
+from app.services.fetch_cache import FetchCache
+
+def test_corrupt_blob_is_restored_on_next_store(tmp_path):
+    cache = FetchCache(str(tmp_path))
+
+    async def scenario():
+        await cache.store("https://acme.com/", "<html>hello</html>", "https://acme.com/")
+        await cache.store("https://acme.com/?utm_source=x&page=1", "<html>hello</html>", "https://acme.com/")
+        content_hash = cache.conn.execute("SELECT content_hash FROM responses LIMIT 1").fetchone()[0]
+        with open(cache._blob_path(content_hash), "wb") as f:
+            f.write(b"not zlib")
+
+        assert await cache.lookup("https://acme.com/") is None
+        # Every entry on the broken blob is gone, and so is its size
+        assert await cache.lookup("https://acme.com/?page=1") is None
+        assert cache._total == 0
+
+        await cache.store("https://acme.com/", "<html>hello</html>", "https://acme.com/")
+        hit = await cache.lookup("https://acme.com/")
+        assert hit is not None and hit.content == "<html>hello</html>"
+        assert cache._total == cache.conn.execute("SELECT SUM(size) FROM blobs").fetchone()[0]
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        cache.close()
+
+def test_missing_blob_is_forgotten(tmp_path):
+    cache = FetchCache(str(tmp_path))
+
+    async def scenario():
+        await cache.store("https://acme.com/a", "body", "https://acme.com/a")
+        content_hash = cache.conn.execute("SELECT content_hash FROM responses").fetchone()[0]
+        os.remove(cache._blob_path(content_hash))
+        assert await cache.lookup("https://acme.com/a") is None
+        assert cache.conn.execute("SELECT COUNT(*) FROM blobs").fetchone()[0] == 0
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        cache.close()
@@ -0,0 +1,25 @@
+import pytest
+from app.services.fetcher import PageReader, page_text
+
+def html_text(html: str, max_chars: int = 5000) -> str:
+    return page_text(html.encode(), "utf-8", True, max_chars)
+
+@pytest.mark.parametrize("html, expected", [
+    ("<p>We build <b>things</b>.</p>", "We build things."),
+    ("<p>Acme&amp;Co   ships</p>", "Acme&Co ships"),
+    ("<ul><li>One</li><li>Two<br>Three</li></ul>", "One\nTwo\nThree"),
+    ("<div>Hi <script>var x = 1;</script>there</div><nav>Menu</nav>", "Hi there"),
+    ("<h1>Title</h1>\n\n  <p>\n  Body\n text </p>", "Title\nBody text"),
+])
+def test_text_extraction(html, expected):
+    assert html_text(html) == expected
+
+@pytest.mark.parametrize("chunk_bytes", [1, 7, 1000, 65536])
+def test_same_text_whatever_the_chunking(chunk_bytes):
+    html = ("<body>" + "<p>Café <b>résumé</b> &amp; more text</p>" * 500 + "</body>").encode()
+    reader = PageReader("utf-8", True, 2000)
+    for start in range(0, len(html), chunk_bytes):
+        if reader.feed(html[start:start + chunk_bytes]):
+            break
+    assert reader.text() == page_text(html, "utf-8", True, 2000)
+    assert len(reader.text()) == 2000
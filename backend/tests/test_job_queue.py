@@ -0,0 +1,64 @@
+import asyncio
+import time
+import pytest
+from app.models.contracts import ResearchConfig
+from app.services.job_queue import JobQueue
+
+CONFIG = ResearchConfig(config_id="c", proposition="p", persona="v", icp_ruleset_id="i")
+
+@pytest.fixture
+def queue(tmp_path):
+    q = JobQueue(str(tmp_path / "jobs.db"), lease_seconds=60, max_attempts=2)
+    yield q
+    q.close()
+
+def run(coro):
+    return asyncio.run(coro)
+
+def expire_lease(queue: JobQueue, job_id: str):
+    with queue._lock:
+        queue.conn.execute("UPDATE jobs SET lease_until = ? WHERE job_id = ?", (time.time() - 1, job_id))
+        queue.conn.commit()
+
+def test_claim_is_exclusive(queue):
+    job_id = run(queue.enqueue("a.com", CONFIG))
+    claimed = run(queue.claim("w1"))
+    assert claimed["job_id"] == job_id and claimed["attempts"] == 1
+    assert run(queue.claim("w2")) is None # Lease still held
+
+def test_expired_lease_is_reclaimed(queue):
+    job_id = run(queue.enqueue("a.com", CONFIG))
+    run(queue.claim("w1"))
+    expire_lease(queue, job_id)
+    claimed = run(queue.claim("w2"))
+    assert claimed["job_id"] == job_id and claimed["attempts"] == 2
+
+def test_fails_after_max_attempts(queue):
+    job_id = run(queue.enqueue("a.com", CONFIG))
+    for worker in ("w1", "w2"):
+        run(queue.claim(worker))
+        expire_lease(queue, job_id) # Worker died mid-mission
+    assert run(queue.claim("w3")) is None
+    job = run(queue.get(job_id))
+    assert job["status"] == "FAILED" and job["attempts"] == 2
+
+def test_fail_requeues_until_max_attempts(queue):
+    job_id = run(queue.enqueue("a.com", CONFIG))
+    job = run(queue.claim("w1"))
+    assert run(queue.fail(job_id, "w1", "boom", job["attempts"]))
+    assert run(queue.get(job_id))["status"] == "QUEUED"
+    job = run(queue.claim("w1"))
+    assert run(queue.fail(job_id, "w1", "boom", job["attempts"]))
+    assert run(queue.get(job_id))["status"] == "FAILED"
+
+def test_stale_worker_cannot_finish(queue):
+    job_id = run(queue.enqueue("a.com", CONFIG))
+    run(queue.claim("w1"))
+    expire_lease(queue, job_id)
+    run(queue.claim("w2"))
+    assert run(queue.complete(job_id, "w1", '{"domain": "stale"}')) is False
+    assert run(queue.fail(job_id, "w1", "late", 1)) is False
+    assert run(queue.get(job_id))["status"] == "RUNNING"
+    assert run(queue.complete(job_id, "w2", '{"domain": "a.com"}')) is True
+    job = run(queue.get(job_id))
+    assert job["status"] == "COMPLETE" and job["dossier"] == {"domain": "a.com"}
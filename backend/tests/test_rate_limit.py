@@ -0,0 +1,155 @@
+import asyncio
+import types
+import httpx
+import pytest
+from app.core import rate_limit
+from app.core.rate_limit import CircuitOpenError, RateLimiter, Upstream
+
+class FakeClock:
+    """Stands in for time.monotonic and asyncio.sleep: sleeping just moves the clock forward."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += max(0.0, seconds)
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit, "time", types.SimpleNamespace(monotonic=clock.monotonic))
+    monkeypatch.setattr(rate_limit.asyncio, "sleep", clock.sleep)
+    return clock
+
+def transport(*outcomes):
+    """fn for Upstream.call: each call returns the next status as a response, or raises it if it is an exception."""
+    calls = []
+
+    async def fn():
+        outcome = outcomes[len(calls)]
+        calls.append(outcome)
+        if isinstance(outcome, Exception):
+            raise outcome
+        status, headers = outcome if isinstance(outcome, tuple) else (outcome, {})
+        return httpx.Response(status, headers=headers)
+
+    fn.calls = calls
+    return fn
+
+class SdkError(Exception):
+    def __init__(self, message: str, code: int):
+        super().__init__(message)
+        self.code = code
+
+def run(coro):
+    return asyncio.run(coro)
+
+def test_429_slows_down_and_honours_retry_after(clock):
+    upstream = Upstream("t", rate=10, max_retries=2)
+    fn = transport((429, {"Retry-After": "3"}), 200)
+    assert run(upstream.call(fn)).status_code == 200
+    assert len(fn.calls) == 2
+    assert 3.0 in clock.sleeps
+    assert upstream.limiter.rate == pytest.approx(5 + 10 / 50) # Halved, then one additive step back
+    assert upstream.breaker.failures == 0 # Busy is not broken
+
+def test_retry_after_beyond_max_delay_returns_the_429(clock):
+    upstream = Upstream("t", rate=10, max_retries=2, max_retry_delay=5.0)
+    fn = transport((429, {"Retry-After": "60"}), 200)
+    assert run(upstream.call(fn)).status_code == 429
+    assert len(fn.calls) == 1
+
+def test_5xx_counts_towards_breaker_and_returns_last_response(clock):
+    upstream = Upstream("t", rate=10, max_retries=2, failure_threshold=10)
+    fn = transport(503, 502, 500)
+    assert run(upstream.call(fn)).status_code == 500
+    assert len(fn.calls) == 3
+    assert upstream.breaker.failures == 3
+    assert upstream.limiter.rate == 10 # 5xx never touches the rate
+
+    fn = transport(503, 200)
+    assert run(upstream.call(fn)).status_code == 200
+    assert upstream.breaker.failures == 0
+
+def test_transport_errors_are_retried_then_raised(clock):
+    upstream = Upstream("t", rate=10, max_retries=1, failure_threshold=10)
+    fn = transport(httpx.ConnectError("refused"), httpx.ReadTimeout("slow"))
+    with pytest.raises(httpx.ReadTimeout):
+        run(upstream.call(fn))
+    assert len(fn.calls) == 2
+    assert upstream.breaker.failures == 2
+    assert len(clock.sleeps) >= 1 # Backed off between attempts
+
+def test_throttle_exceptions_are_retried(clock):
+    upstream = Upstream("t", rate=10, max_retries=2)
+    fn = transport(SdkError("429 RESOURCE_EXHAUSTED: quota", 429), 200)
+    assert run(upstream.call(fn)).status_code == 200
+    assert len(fn.calls) == 2
+    assert upstream.breaker.failures == 0
+    assert upstream.limiter.rate < 10
+
+@pytest.mark.parametrize("error", [
+    SdkError("bad request", 400),
+    SdkError("invalid id 429abc", 400), # A "429" in the message is not a throttle
+    ValueError("parse error"),
+])
+def test_client_errors_are_not_retried(clock, error):
+    upstream = Upstream("t", rate=10, max_retries=2)
+    fn = transport(error, 200)
+    with pytest.raises(type(error)):
+        run(upstream.call(fn))
+    assert len(fn.calls) == 1
+    assert upstream.breaker.failures == 0
+    assert upstream.limiter.rate == 10
+
+def test_breaker_open_half_open_closed(clock):
+    upstream = Upstream("t", rate=100, max_retries=0, failure_threshold=2, reset_seconds=30.0)
+    breaker = upstream.breaker
+    for _ in range(2):
+        assert run(upstream.call(transport(503))).status_code == 503
+    assert breaker.state == "open"
+
+    fn = transport(200)
+    with pytest.raises(CircuitOpenError):
+        run(upstream.call(fn))
+    assert fn.calls == [] # Failed fast, upstream never called
+
+    clock.now += 30
+    assert breaker.state == "half_open"
+    assert run(upstream.call(transport(503))).status_code == 503 # Probe fails: open again
+    assert breaker.state == "open"
+
+    clock.now += 30
+    assert breaker.allow() # Only one probe at a time
+    assert not breaker.allow()
+    breaker.release_probe() # Probe abandoned, the next caller may try
+
+    assert run(upstream.call(transport(200))).status_code == 200
+    assert breaker.state == "closed"
+    assert breaker.failures == 0
+
+def test_aimd_decrease_and_increase(clock):
+    limiter = RateLimiter(rate=8)
+    limiter.throttle()
+    assert limiter.rate == 4
+    for _ in range(10):
+        limiter.throttle()
+    assert limiter.rate == pytest.approx(8 / 20) # Floored at min_rate
+
+    limiter.on_success()
+    assert limiter.rate == pytest.approx(8 / 20 + 8 / 50)
+    for _ in range(100):
+        limiter.on_success()
+    assert limiter.rate == 8 # Capped at max_rate
+
+def test_retry_after_pauses_the_bucket(clock):
+    limiter = RateLimiter(rate=10, burst=5)
+    limiter.throttle(retry_after=5.0)
+    started = clock.now
+    run(limiter.acquire())
+    assert clock.now - started >= 5.0
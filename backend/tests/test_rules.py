@@ -0,0 +1,58 @@
+from datetime import datetime
+import pytest
+from app.agents.rules import DEFAULT_RULESET, ICPRuleset, prescore
+from app.models.contracts import EvidenceItem
+from app.models.evidence import Evidence
+
+def ev(n: int, source_type: str, excerpt: str, reliability: str = "HIGH") -> Evidence:
+    return Evidence.from_item(EvidenceItem(
+        evidence_id=f"e{n}", domain="acme.com", source_type=source_type, url=f"https://acme.com/{n}",
+        retrieved_at=datetime.now(), excerpt=excerpt, reliability=reliability,
+    ))
+
+HIRING = ev(1, "CAREERS", "We are hiring a Head of Sales to lead the team.")
+FUNDING = ev(2, "NEWS", "Acme raised $20 million in Series B funding.")
+OWN_STACK = ev(3, "TECH_DETECT", "Uses Salesforce and Snowflake.")
+NEWS_STACK = ev(3, "NEWS", "Analysts say Salesforce dominates the CRM market.")
+FAILED = ev(4, "HOMEPAGE", "Failed to fetch https://acme.com", reliability="LOW")
+PARKED = ev(5, "HOMEPAGE", "This domain is for sale! Contact the owner.")
+GAMBLING = ev(6, "HOMEPAGE", "The best online casino bonuses.")
+
+COMPETITORS = ICPRuleset("test", competitor_domains=["ACME.com"]) # Matched case-insensitively
+NO_GAMBLING = ICPRuleset("test", disqualify_patterns={"Gambling": r"\bcasino\b"})
+
+@pytest.mark.parametrize("name, items, ruleset, tier, label", [
+    ("no evidence", [], DEFAULT_RULESET, "C", "Insufficient Evidence"),
+    ("only failed fetches", [FAILED], DEFAULT_RULESET, "C", "Insufficient Evidence"),
+    ("competitor", [HIRING, FUNDING], COMPETITORS, "D", "Disqualified - Competitor"),
+    ("parked homepage", [PARKED], DEFAULT_RULESET, "D", "Disqualified - Parked Domain"),
+    ("disqualify pattern", [GAMBLING, HIRING], NO_GAMBLING, "D", "Disqualified - Gambling"),
+    ("funded, hiring, own-source fit", [HIRING, FUNDING, OWN_STACK], DEFAULT_RULESET, "A", "High Fit - Funded & Hiring"),
+])
+def test_settled(name, items, ruleset, tier, label):
+    diagnosis, _ = prescore("acme.com", items, ruleset)
+    assert diagnosis is not None, name
+    assert (diagnosis.fit_tier, diagnosis.diagnosis_label) == (tier, label)
+    assert diagnosis.reasoning_bullets[-1].startswith("Settled by deterministic rules")
+
+@pytest.mark.parametrize("name, items, ruleset", [
+    ("fewer than min_sources", [HIRING], DEFAULT_RULESET),
+    ("fit only mentioned in news", [HIRING, FUNDING, NEWS_STACK], DEFAULT_RULESET),
+    ("no funding", [HIRING, OWN_STACK], DEFAULT_RULESET),
+    ("no exec hire", [FUNDING, OWN_STACK], DEFAULT_RULESET),
+    ("tier A settling off", [HIRING, FUNDING, OWN_STACK], ICPRuleset("test", settle_tier_a=False)),
+    ("failed fetch does not count as a source", [HIRING, FAILED], DEFAULT_RULESET),
+])
+def test_ambiguous_goes_to_llm(name, items, ruleset):
+    diagnosis, _ = prescore("acme.com", items, ruleset)
+    assert diagnosis is None, name
+
+def test_tier_a_cites_the_evidence_behind_it():
+    diagnosis, signals = prescore("acme.com", [HIRING, FUNDING, OWN_STACK], DEFAULT_RULESET)
+    assert diagnosis.evidence_ids == ["e1", "e2", "e3"]
+    assert {"EXEC_HIRE", "FUNDING", "GTM_TOOLING", "TECH_STACK"} <= {s.signal_type for s in signals}
+
+def test_signals_returned_for_ambiguous_accounts():
+    diagnosis, signals = prescore("acme.com", [HIRING], DEFAULT_RULESET)
+    assert diagnosis is None
+    assert [s.signal_type for s in signals] == ["EXEC_HIRE"]
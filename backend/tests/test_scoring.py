@@ -0,0 +1,118 @@
+import asyncio
+import json
+import re
+import types
+import pytest
+from app.agents.graph import ResearcherGraph
+from app.agents.scoring import BatchScorer, ScoringError
+from app.core.concurrency import ProviderLimits
+from app.core.rate_limit import Upstream
+from app.models.contracts import ResearchConfig, ResearcherState
+
+CONFIG = ResearchConfig(config_id="c", proposition="p", persona="v", icp_ruleset_id="icp")
+
+class StubLLM:
+    """Answers each prompt with answer(prompt, domains), domains being the accounts of a batch prompt."""
+
+    def __init__(self, answer):
+        self.answer = answer
+        self.prompts = []
+
+    async def ainvoke(self, messages, config=None):
+        prompt = messages[0].content
+        self.prompts.append(prompt)
+        return types.SimpleNamespace(content=self.answer(prompt, re.findall(r"=== ACCOUNT: (\S+) ===", prompt)))
+
+def diagnosis(tier: str) -> dict:
+    return {"fit_tier": tier, "diagnosis_label": f"Tier {tier}", "reasoning_bullets": [], "confidence": 0.8}
+
+def scorer(llm: StubLLM, max_batch: int = 8, max_wait: float = 10.0) -> BatchScorer:
+    upstream = Upstream("llm", rate=1000, burst=100, max_retries=0)
+    return BatchScorer(lambda: llm, ProviderLimits(), max_batch=max_batch, max_wait=max_wait, upstream=upstream)
+
+def test_mixed_batch_is_split_per_domain():
+    # Each account's tier is read from its own signals, so a mix-up would show
+    tiers = {"a.com": "A", "b.com": "C", "c.com": "D"}
+    llm = StubLLM(lambda prompt, domains: json.dumps({d: diagnosis(tiers[d]) for d in domains}))
+    batcher = scorer(llm, max_batch=3)
+
+    async def scenario():
+        return await asyncio.gather(*[batcher.score(d, "icp", f"signals of {d}") for d in tiers])
+
+    results = asyncio.run(scenario())
+    assert [r.fit_tier for r in results] == ["A", "C", "D"]
+    assert len(llm.prompts) == 1 # Full batch, one call
+    for domain in tiers:
+        assert f"signals of {domain}" in llm.prompts[0]
+
+def test_same_domain_goes_to_next_batch():
+    llm = StubLLM(lambda prompt, domains: json.dumps({d: diagnosis("B") for d in domains}))
+    batcher = scorer(llm, max_wait=0.01)
+
+    async def scenario():
+        return await asyncio.gather(batcher.score("a.com", "icp", "x"), batcher.score("a.com", "icp", "y"))
+
+    assert [r.fit_tier for r in asyncio.run(scenario())] == ["B", "B"]
+    assert len(llm.prompts) == 2 # Answers are keyed by domain
+
+def test_missing_or_invalid_entries_fail_alone():
+    answer = {"a.com": diagnosis("A"), "c.com": diagnosis("Z")} # b.com missing, c.com unknown tier
+    llm = StubLLM(lambda prompt, domains: json.dumps(answer))
+    batcher = scorer(llm, max_batch=3)
+
+    async def scenario():
+        return await asyncio.gather(
+            *[batcher.score(d, "icp", "s") for d in ("a.com", "b.com", "c.com")], return_exceptions=True
+        )
+
+    a, b, c = asyncio.run(scenario())
+    assert a.fit_tier == "A"
+    assert isinstance(b, ScoringError) and "missing" in str(b)
+    assert isinstance(c, ScoringError)
+
+def test_malformed_batch_answer_fails_every_account():
+    llm = StubLLM(lambda prompt, domains: "not json")
+    batcher = scorer(llm, max_batch=2)
+
+    async def scenario():
+        return await asyncio.gather(*[batcher.score(d, "icp", "s") for d in ("a.com", "b.com")], return_exceptions=True)
+
+    assert all(isinstance(r, ScoringError) for r in asyncio.run(scenario()))
+
+@pytest.mark.parametrize("batch_answer", [
+    lambda domains: json.dumps({}), # Account missing
+    lambda domains: json.dumps({d: {"fit_tier": "A", "confidence": "very"} for d in domains}), # Fails validation
+    lambda domains: "[]", # Not keyed by domain
+])
+def test_failed_batch_entry_falls_back_to_single_call(batch_answer):
+    def answer(prompt, domains):
+        return batch_answer(domains) if domains else json.dumps(diagnosis("B"))
+
+    llm = StubLLM(answer)
+    graph = ResearcherGraph(llm_factory=lambda model: llm)
+    graph.batch_scorer = scorer(llm, max_batch=1)
+    state = ResearcherState(domain="a.com", config=CONFIG, scoring_mode="batched")
+
+    result = asyncio.run(graph._score(state, "some signals"))
+    assert result.fit_tier == "B"
+    assert len(llm.prompts) == 2
+    assert "=== ACCOUNT: a.com ===" in llm.prompts[0] # Batched first...
+    assert "=== ACCOUNT:" not in llm.prompts[1] # ...then scored on its own
+
+def test_partial_batch_flushes_at_max_wait():
+    llm = StubLLM(lambda prompt, domains: json.dumps({d: diagnosis("A") for d in domains}))
+    batcher = scorer(llm, max_batch=8, max_wait=0.05)
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        task = asyncio.create_task(batcher.score("a.com", "icp", "s"))
+        await asyncio.sleep(0.01)
+        assert not task.done() and llm.prompts == [] # Still waiting for company
+        result = await task
+        return result, loop.time() - started
+
+    result, waited = asyncio.run(scenario())
+    assert result.fit_tier == "A"
+    assert len(llm.prompts) == 1
+    assert waited >= 0.05